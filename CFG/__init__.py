@@ -1 +1,4 @@
 # This file makes CFG a package.
+
+# Part of on-disk cache keys (see cfg_cache.py); bump when CFG construction changes.
+__version__ = "0.2.1"
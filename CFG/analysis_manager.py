@@ -0,0 +1,292 @@
+"""
+analysis_manager.py - Lazily computed, cached CFG analyses.
+
+An AnalysisManager is attached to one CFGBuilder (see
+CFGBuilder.get_analysis_manager). Analyses are computed on first request and
+cached. Every analysis declares what it depends on: other analyses, or the raw
+graph facts "nodes" and "edges". When the builder reports a change through
+new_node, _link_predecessor_to_successor or build, exactly the analyses that
+(transitively) depend on the changed fact are dropped.
+
+Built-in analyses (all keyed by node id):
+  successors      {id: [successor ids]}
+  predecessors    {id: [predecessor ids]}
+  reachability    set of ids reachable from the entry node
+  sccs            list of strongly connected components (lists of ids)
+  dominators      {id: immediate dominator id} for reachable nodes
+  prime_paths     result of builder.find_prime_paths()
+  metrics         node/edge counts, cyclomatic complexity, decisions, loops
+  canonical_form  (structural hash, canonical node order), see cfg_hash
+  source_index    SourceIndex from source lines to nodes, see source_index
+
+If a CFGAnalysisMemo is given, shape-only analyses registered with a
+`memo_kind` are looked up in it first, so isomorphic CFGs share results.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from CFG.cfg_hash import RESULT_IDS, RESULT_NODES, RESULT_PLAIN, canonical_form
+from CFG.source_index import SourceIndex
+
+GRAPH_FACTS = ("nodes", "edges")
+
+
+def _compute_successors(builder, manager) -> Dict[int, List[int]]:
+    successors = {}
+    for node_id, node in builder.nodes.items():
+        successors[node_id] = list(dict.fromkeys(s.id for s in builder.get_successors(node)))
+    return successors
+
+
+def _compute_predecessors(builder, manager) -> Dict[int, List[int]]:
+    successors = manager.get("successors")
+    predecessors: Dict[int, List[int]] = {node_id: [] for node_id in successors}
+    for node_id, succ_ids in successors.items():
+        for succ_id in succ_ids:
+            predecessors.setdefault(succ_id, []).append(node_id)
+    return predecessors
+
+
+def _compute_reachability(builder, manager) -> Set[int]:
+    if not builder.entry_node:
+        return set()
+    successors = manager.get("successors")
+    reached = {builder.entry_node.id}
+    stack = [builder.entry_node.id]
+    while stack:
+        for succ_id in successors.get(stack.pop(), ()):
+            if succ_id not in reached:
+                reached.add(succ_id)
+                stack.append(succ_id)
+    return reached
+
+
+def _compute_sccs(builder, manager) -> List[List[int]]:
+    return strongly_connected_components(manager.get("successors"))
+
+
+def strongly_connected_components(successors: Dict[Hashable, List[Hashable]]) -> List[List[Hashable]]:
+    """Iterative Tarjan; components are returned in reverse topological order."""
+    index_of: Dict[Hashable, int] = {}
+    lowlink: Dict[Hashable, int] = {}
+    on_stack: Set[Hashable] = set()
+    stack: List[Hashable] = []
+    components: List[List[Hashable]] = []
+    counter = 0
+
+    for root in successors:
+        if root in index_of:
+            continue
+        work = [(root, 0)]
+        while work:
+            node_id, child_pos = work.pop()
+            if child_pos == 0:
+                index_of[node_id] = lowlink[node_id] = counter
+                counter += 1
+                stack.append(node_id)
+                on_stack.add(node_id)
+            children = successors.get(node_id, [])
+            if child_pos < len(children):
+                work.append((node_id, child_pos + 1))
+                child = children[child_pos]
+                if child not in index_of:
+                    work.append((child, 0))
+                elif child in on_stack:
+                    lowlink[node_id] = min(lowlink[node_id], index_of[child])
+                continue
+            if lowlink[node_id] == index_of[node_id]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node_id:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node_id])
+    return components
+
+
+def _compute_dominators(builder, manager) -> Dict[int, int]:
+    """Cooper/Harvey/Kennedy iterative immediate dominators."""
+    if not builder.entry_node:
+        return {}
+    successors = manager.get("successors")
+    predecessors = manager.get("predecessors")
+    reachable = manager.get("reachability")
+    entry_id = builder.entry_node.id
+
+    postorder: List[int] = []
+    visited = {entry_id}
+    work = [(entry_id, iter(successors.get(entry_id, ())))]
+    while work:
+        node_id, children = work[-1]
+        for child in children:
+            if child not in visited:
+                visited.add(child)
+                work.append((child, iter(successors.get(child, ()))))
+                break
+        else:
+            work.pop()
+            postorder.append(node_id)
+    order = {node_id: i for i, node_id in enumerate(postorder)}
+
+    idom = {entry_id: entry_id}
+    changed = True
+    while changed:
+        changed = False
+        for node_id in reversed(postorder):
+            if node_id == entry_id:
+                continue
+            new_idom = None
+            for pred in predecessors.get(node_id, ()):
+                if pred not in idom or pred not in reachable:
+                    continue
+                if new_idom is None:
+                    new_idom = pred
+                    continue
+                a, b = pred, new_idom
+                while a != b:
+                    while order[a] < order[b]:
+                        a = idom[a]
+                    while order[b] < order[a]:
+                        b = idom[b]
+                new_idom = a
+            if new_idom is not None and idom.get(node_id) != new_idom:
+                idom[node_id] = new_idom
+                changed = True
+    return idom
+
+
+def _compute_prime_paths(builder, manager):
+    return builder.find_prime_paths()
+
+
+def _compute_canonical_form(builder, manager):
+    return canonical_form(builder)
+
+
+def _compute_source_index(builder, manager) -> SourceIndex:
+    return SourceIndex(builder)
+
+
+def _compute_metrics(builder, manager) -> Dict[str, int]:
+    successors = manager.get("successors")
+    sccs = manager.get("sccs")
+    node_count = len(successors)
+    edge_count = sum(len(s) for s in successors.values())
+    return {
+        "node_count": node_count,
+        "edge_count": edge_count,
+        "cyclomatic_complexity": edge_count - node_count + 2 if node_count else 0,
+        "decision_points": sum(1 for s in successors.values() if len(s) > 1),
+        "loops": sum(1 for c in sccs if len(c) > 1),
+    }
+
+
+class AnalysisManager:
+    """Caches analyses for one CFGBuilder and invalidates them on graph changes."""
+
+    def __init__(self, builder, memo=None):
+        self.builder = builder
+        self.memo = memo  # Optional CFGAnalysisMemo shared between managers
+        self._computations: Dict[str, Callable[[Any, "AnalysisManager"], Any]] = {}
+        self._dependencies: Dict[str, tuple] = {}
+        self._memo_kinds: Dict[str, Optional[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {fact: set() for fact in GRAPH_FACTS}
+        self._results: Dict[str, Any] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self.register("successors", _compute_successors, GRAPH_FACTS)
+        self.register("predecessors", _compute_predecessors, ("successors",))
+        self.register("reachability", _compute_reachability, ("successors",))
+        self.register("canonical_form", _compute_canonical_form, GRAPH_FACTS)
+        self.register("source_index", _compute_source_index, ("nodes",))
+        self.register("sccs", _compute_sccs, ("successors",), memo_kind=RESULT_IDS)
+        self.register("dominators", _compute_dominators, ("successors", "predecessors", "reachability"),
+                      memo_kind=RESULT_IDS)
+        self.register("prime_paths", _compute_prime_paths, ("successors",), memo_kind=RESULT_NODES)
+        self.register("metrics", _compute_metrics, ("successors", "sccs"), memo_kind=RESULT_PLAIN)
+
+        builder._graph_listeners.append(self._on_graph_changed)
+
+    def register(self, name: str, compute: Callable[[Any, "AnalysisManager"], Any],
+                 depends_on: Iterable[str] = GRAPH_FACTS, memo_kind: Optional[str] = None):
+        """
+        Registers (or replaces) an analysis. `compute(builder, manager)` may call
+        `manager.get(...)` for any analysis listed in `depends_on`. A `memo_kind`
+        (see cfg_hash) marks the analysis as depending only on the CFG shape.
+        """
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._dependents:
+                raise ValueError(f"Analysis '{name}' depends on unknown analysis '{dependency}'.")
+            if dependency == name or (name in self._computations and dependency in self._transitive_dependents(name)):
+                raise ValueError(f"Analysis '{name}' would depend on itself through '{dependency}'.")
+        if name in self._computations:
+            for old_dependency in self._dependencies[name]:
+                self._dependents[old_dependency].discard(name)
+            self.invalidate(name)
+        self._computations[name] = compute
+        self._dependencies[name] = depends_on
+        self._memo_kinds[name] = memo_kind
+        self._dependents.setdefault(name, set())
+        for dependency in depends_on:
+            self._dependents[dependency].add(name)
+
+    def get(self, name: str) -> Any:
+        if name in self._results:
+            self.hits += 1
+            return self._results[name]
+        if name not in self._computations:
+            raise KeyError(f"Unknown analysis '{name}'.")
+        self.misses += 1
+        compute = self._computations[name]
+        memo_kind = self._memo_kinds[name]
+        if self.memo is not None and memo_kind is not None:
+            result = self.memo.get(self.builder, name, lambda b: compute(b, self), memo_kind,
+                                   form=self.get("canonical_form"))
+        else:
+            result = compute(self.builder, self)
+        self._results[name] = result
+        return result
+
+    def is_cached(self, name: str) -> bool:
+        return name in self._results
+
+    def cached_analyses(self) -> List[str]:
+        return list(self._results.keys())
+
+    def _transitive_dependents(self, name: str) -> Set[str]:
+        affected: Set[str] = set()
+        stack = [name]
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        return affected
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drops one analysis (and everything derived from it), or all of them if name is None."""
+        if name is None:
+            self._results.clear()
+            return
+        self._results.pop(name, None)
+        for dependent in self._transitive_dependents(name):
+            self._results.pop(dependent, None)
+
+    def _on_graph_changed(self, kind: str):
+        if self._results:
+            self.invalidate(kind)
+
+    def detach(self):
+        """Stops listening to the builder and drops all cached results."""
+        if self._on_graph_changed in self.builder._graph_listeners:
+            self.builder._graph_listeners.remove(self._on_graph_changed)
+        if getattr(self.builder, "_analysis_manager", None) is self:
+            self.builder._analysis_manager = None
+        self._results.clear()
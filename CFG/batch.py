@@ -0,0 +1,347 @@
+"""
+batch.py - Repository-wide CFG and prime path analysis.
+
+Library use:
+
+    from CFG.batch import run_batch
+    summary = run_batch("path/to/repo", "cfg_results", workers=8)
+    print(summary.format_report())
+
+Command line:
+
+    python -m CFG.batch path/to/repo -o cfg_results -j 8
+
+Work is split in two phases over one process pool. First every file is
+parsed and its functions are indexed (one task per file). Then every function
+becomes its own task. Function tasks are submitted file by file, the file
+with the largest function first and each file's functions largest first, and
+idle workers keep pulling the next one from the shared queue, so one huge
+function does not leave the other workers idle at the end of the run, while
+a worker's consecutive tasks mostly come from the same file and reuse its
+parsed forest.
+
+Each function's result is appended to `results.jsonl` in the output directory
+as soon as it arrives; `summary.json` holds timings, failures and the slowest
+functions.
+
+With `cache_dir` (`--cache-dir`), file indexes and per-function results are
+stored in a CFGCache (see cfg_cache.py) keyed by the file's source text, so a
+rerun over unchanged files only reads them back.
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Allow running this file directly, like main_script.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from CFG.cfg_cache import CFGCache
+from CFG.cfg_forest import CFGForest
+
+SKIPPED_DIRECTORIES = {"__pycache__", ".git", ".hg", ".tox", ".nox", ".venv", "venv", "node_modules"}
+DEFAULT_PRIME_PATH_NODE_LIMIT = 60
+DEFAULT_SAMPLING_BUDGET = 2.0
+# Options that change a function's result, and therefore its cache key.
+_RESULT_OPTIONS = ("prime_path_node_limit", "sampling_budget", "include_paths", "max_walks")
+
+
+def discover_python_files(root: str) -> List[str]:
+    """All .py files under root (or root itself if it is a file), in sorted order."""
+    if os.path.isfile(root):
+        return [root]
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIPPED_DIRECTORIES and not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                found.append(os.path.join(dirpath, filename))
+    return found
+
+
+# --- Worker side -------------------------------------------------------------
+
+_forest_cache: Dict[str, Tuple[float, str, Optional[CFGForest]]] = {}
+_FOREST_CACHE_SIZE = 8
+_disk_caches: Dict[str, CFGCache] = {}
+
+
+def _load_source(path: str) -> Tuple[str, Optional[CFGForest]]:
+    """Per-process cache, so consecutive functions of one file are read and parsed once."""
+    mtime = os.path.getmtime(path)
+    cached = _forest_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    if len(_forest_cache) >= _FOREST_CACHE_SIZE:
+        _forest_cache.pop(next(iter(_forest_cache)))
+    _forest_cache[path] = (mtime, source, None)
+    return source, None
+
+
+def _load_forest(path: str) -> CFGForest:
+    source, forest = _load_source(path)
+    if forest is None:
+        forest = CFGForest(ast.parse(source, filename=path))
+        _forest_cache[path] = (_forest_cache[path][0], source, forest)
+    return forest
+
+
+def _disk_cache(options: Dict[str, Any]) -> Optional[CFGCache]:
+    directory = options.get("cache_dir")
+    if directory is None:
+        return None
+    if directory not in _disk_caches:
+        _disk_caches[directory] = CFGCache(directory)
+    return _disk_caches[directory]
+
+
+def _scope_sizes(forest: CFGForest) -> List[Tuple[str, int]]:
+    scopes = []
+    for qualname in forest:
+        entry = forest.entry(qualname)
+        if entry.lineno is not None and entry.end_lineno is not None:
+            size = entry.end_lineno - entry.lineno + 1
+        else:
+            size = len(forest.module.body)
+        scopes.append((qualname, size))
+    return scopes
+
+
+def _index_file(path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Phase 1 task: list the scopes of one file with a size estimate for scheduling."""
+    started = time.perf_counter()
+    cache = _disk_cache(options or {})
+    try:
+        if cache is not None:
+            source, _ = _load_source(path)
+            cached = cache.get_or_build(source, {"batch": "index"}, None)
+            scopes = cached.analysis("scopes", lambda _: _scope_sizes(_load_forest(path)))
+        else:
+            scopes = _scope_sizes(_load_forest(path))
+    except (SyntaxError, UnicodeDecodeError, OSError, ValueError) as e:
+        return {"file": path, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+    return {"file": path, "scopes": [tuple(scope) for scope in scopes], "seconds": time.perf_counter() - started}
+
+
+def _analyze_builder(builder, options: Dict[str, Any]) -> Dict[str, Any]:
+    from CFG.external_prime_paths import iter_prime_paths_external
+    from CFG.path_sampling import sample_prime_paths
+
+    result: Dict[str, Any] = {"metrics": builder.get_analysis_manager().get("metrics")}
+    node_limit = options.get("prime_path_node_limit", DEFAULT_PRIME_PATH_NODE_LIMIT)
+    if len(builder.nodes) <= node_limit:
+        paths = list(iter_prime_paths_external(builder, temp_dir=options.get("temp_dir")))
+        result["prime_paths_exact"] = True
+        result["prime_path_count"] = len(paths)
+    else:
+        sample = sample_prime_paths(builder, max_walks=options.get("max_walks", 10000),
+                                    time_budget=options.get("sampling_budget", DEFAULT_SAMPLING_BUDGET),
+                                    seed=0)
+        paths = sample.paths
+        result["prime_paths_exact"] = False
+        result["prime_path_count"] = len(paths)
+        result["estimated_prime_path_count"] = sample.estimated_total
+    if options.get("include_paths"):
+        result["prime_paths"] = [[node.id for node in path] for path in paths]
+    return result
+
+
+def analyze_function(path: str, qualname: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Phase 2 task: build one scope's CFG and run prime path analysis on it."""
+    record: Dict[str, Any] = {"file": path, "qualname": qualname}
+    started = time.perf_counter()
+    try:
+        cache = _disk_cache(options)
+        if cache is not None:
+            source, _ = _load_source(path)
+            key_options = {name: options.get(name) for name in _RESULT_OPTIONS}
+            key_options.update(batch="function", qualname=qualname)
+            cached = cache.get(source, key_options)
+            if cached is not None and cached.has_analysis("record"):
+                record.update(cached.analysis("record", None))
+                record["cached"] = True
+                record["seconds"] = time.perf_counter() - started
+                return record
+
+        forest = _load_forest(path)
+        entry = forest.entry(qualname)
+        record["kind"] = entry.kind
+        record["lineno"] = entry.lineno
+        builder = forest.get(qualname)
+        built = time.perf_counter()
+        record["build_seconds"] = built - started
+        record.update(_analyze_builder(builder, options))
+        record["analysis_seconds"] = time.perf_counter() - built
+
+        if cache is not None:
+            stored = {k: v for k, v in record.items() if k not in ("file", "qualname")}
+            cache.get_or_build(source, key_options, lambda: builder).analysis("record", lambda _: stored)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["traceback"] = traceback.format_exc()
+    record["seconds"] = time.perf_counter() - started
+    return record
+
+
+# --- Parent side -------------------------------------------------------------
+
+class BatchSummary:
+    """Timings, failures and slowest functions of one batch run."""
+    def __init__(self):
+        self.files = 0
+        self.functions = 0
+        self.failures: List[Dict[str, str]] = []
+        self.wall_seconds = 0.0
+        self.index_seconds = 0.0
+        self.task_seconds = 0.0
+        self.slowest: List[Dict[str, Any]] = []
+        self.results_path: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "functions": self.functions,
+            "failures": self.failures,
+            "wall_seconds": self.wall_seconds,
+            "index_seconds": self.index_seconds,
+            "task_seconds": self.task_seconds,
+            "slowest": self.slowest,
+            "results_path": self.results_path,
+        }
+
+    def format_report(self) -> str:
+        lines = [
+            "--- Batch CFG Analysis Summary ---",
+            f"Files: {self.files}  Functions: {self.functions}  Failures: {len(self.failures)}",
+            f"Wall time: {self.wall_seconds:.2f}s  (indexing {self.index_seconds:.2f}s, "
+            f"function tasks {self.task_seconds:.2f}s of worker time)",
+        ]
+        if self.slowest:
+            lines.append("Slowest functions:")
+            for item in self.slowest:
+                lines.append(f"  {item['seconds']:8.3f}s  {item['file']}::{item['qualname']}")
+        if self.failures:
+            lines.append("Failures:")
+            for failure in self.failures:
+                where = failure["file"] + (f"::{failure['qualname']}" if failure.get("qualname") else "")
+                lines.append(f"  {where}: {failure['error']}")
+        return "\n".join(lines)
+
+
+def _run_tasks(executor: Optional[ProcessPoolExecutor], func, argument_tuples: List[tuple]) -> Iterator[Any]:
+    if executor is None:
+        for args in argument_tuples:
+            yield func(*args)
+        return
+    futures = [executor.submit(func, *args) for args in argument_tuples]
+    for future in as_completed(futures):
+        yield future.result()
+
+
+def run_batch(root: str, output_dir: str, workers: Optional[int] = None,
+              prime_path_node_limit: int = DEFAULT_PRIME_PATH_NODE_LIMIT,
+              sampling_budget: float = DEFAULT_SAMPLING_BUDGET, include_paths: bool = False,
+              temp_dir: Optional[str] = None, slowest: int = 10,
+              cache_dir: Optional[str] = None) -> BatchSummary:
+    """
+    Analyzes every function of every .py file under `root`.
+
+    workers: process count; 0 or 1 runs everything in this process.
+    prime_path_node_limit: CFGs with more nodes get sampled prime paths
+        (see path_sampling) instead of exact enumeration.
+    cache_dir: on-disk CFGCache shared by all workers; unchanged files are
+        not rebuilt on the next run.
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    summary = BatchSummary()
+    summary.results_path = os.path.join(output_dir, "results.jsonl")
+    options = {
+        "prime_path_node_limit": prime_path_node_limit,
+        "sampling_budget": sampling_budget,
+        "include_paths": include_paths,
+        "temp_dir": temp_dir,
+        "cache_dir": cache_dir,
+    }
+
+    files = discover_python_files(root)
+    summary.files = len(files)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        function_tasks: List[Tuple[int, str, str]] = []
+        for indexed in _run_tasks(executor, _index_file, [(path, options) for path in files]):
+            summary.index_seconds += indexed["seconds"]
+            if "error" in indexed:
+                summary.failures.append({"file": indexed["file"], "error": indexed["error"]})
+                continue
+            for qualname, size in indexed["scopes"]:
+                function_tasks.append((size, indexed["file"], qualname))
+
+        # Largest first, so long tasks start early instead of straggling at the
+        # end, but grouped by file, so the workers' forest caches keep hitting.
+        largest_in_file: Dict[str, int] = {}
+        for size, path, _ in function_tasks:
+            largest_in_file[path] = max(size, largest_in_file.get(path, 0))
+        function_tasks.sort(key=lambda task: (-largest_in_file[task[1]], task[1], -task[0], task[2]))
+        timings = []
+        with open(summary.results_path, "w", encoding="utf-8") as results_file:
+            arguments = [(path, qualname, options) for _, path, qualname in function_tasks]
+            for record in _run_tasks(executor, analyze_function, arguments):
+                summary.functions += 1
+                summary.task_seconds += record["seconds"]
+                timings.append((record["seconds"], record["file"], record["qualname"]))
+                if "error" in record:
+                    summary.failures.append({"file": record["file"], "qualname": record["qualname"],
+                                             "error": record["error"]})
+                results_file.write(json.dumps(record) + "\n")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    timings.sort(reverse=True)
+    summary.slowest = [{"seconds": s, "file": f, "qualname": q} for s, f, q in timings[:slowest]]
+    summary.wall_seconds = time.perf_counter() - started
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary.to_dict(), f, indent=2)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build CFGs and prime paths for every function under a directory.")
+    parser.add_argument("root", help="Directory (or single .py file) to analyze")
+    parser.add_argument("-o", "--output", default="cfg_batch_output", help="Output directory")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--prime-path-node-limit", type=int, default=DEFAULT_PRIME_PATH_NODE_LIMIT,
+                        help="Sample prime paths instead of enumerating them above this many nodes")
+    parser.add_argument("--sampling-budget", type=float, default=DEFAULT_SAMPLING_BUDGET,
+                        help="Seconds of random-walk sampling per oversized function")
+    parser.add_argument("--include-paths", action="store_true", help="Write prime paths (node ids) per function")
+    parser.add_argument("--temp-dir", default=None, help="Directory for spilled prime path runs")
+    parser.add_argument("--slowest", type=int, default=10, help="How many slowest functions to report")
+    parser.add_argument("--cache-dir", default=None, help="Reuse CFGs and results of unchanged files from this cache")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.root, args.output, workers=args.workers,
+                        prime_path_node_limit=args.prime_path_node_limit,
+                        sampling_budget=args.sampling_budget, include_paths=args.include_paths,
+                        temp_dir=args.temp_dir, slowest=args.slowest, cache_dir=args.cache_dir)
+    print(summary.format_report())
+    print(f"Per-function results written to {summary.results_path}")
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+bytecode_frontend.py - Builds CFGs from compiled code objects with `dis`.
+
+The AST frontend (CFGBuilder.build) needs source text. This frontend works
+from a code object instead, e.g. one loaded from a .pyc file with load_pyc,
+and produces the same kind of CFGNode graph:
+
+  * one node per bytecode basic block, after an "Entry to <name>" node;
+  * blocks ending in a conditional jump are "condition" nodes. branch_node is
+    the edge taken when the value tested by the jump is true (for FOR_ITER:
+    when the iterator yields), else_node the other one;
+  * blocks ending in a return or raise are "return_statement" /
+    "raise_statement" nodes without successors;
+  * every `except`/`finally`/`with` handler gets a "try_block_start" node in
+    front of the code it protects, with branch_node to that code and
+    else_node to the handler block ("exception_handler_start"), like the
+    try nodes of the AST frontend. Compiler-generated cleanup blocks that
+    only re-raise are left out.
+
+When source is available (passed in, or found through linecache for the
+code object's file name) a block's statements are the source lines of its
+instructions; otherwise they are the instructions themselves. Edges skip
+over blocks that only jump, so such blocks never appear in the graph.
+
+Nested functions, classes and comprehensions are separate code objects; use
+iter_code_objects to reach them. Exception regions are read from the
+exception table (Python 3.11+); on older versions a SETUP_* instruction
+protects the code between it and its handler.
+"""
+
+import bisect
+import dis
+import importlib.util
+import linecache
+import marshal
+import types
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from CFG.cfg_node import CFGNode
+
+_JUMPS = frozenset(dis.hasjrel) | frozenset(dis.hasjabs) | frozenset(getattr(dis, "hasjump", ()))
+_RETURNS = frozenset(("RETURN_VALUE", "RETURN_CONST"))
+_RAISES = frozenset(("RAISE_VARARGS", "RERAISE"))
+# Instructions that carry no statement of their own.
+_SILENT = frozenset(("NOP", "RESUME", "CACHE", "EXTENDED_ARG", "JUMP_FORWARD", "JUMP_BACKWARD",
+                     "JUMP_ABSOLUTE", "JUMP_BACKWARD_NO_INTERRUPT", "JUMP", "JUMP_NO_INTERRUPT"))
+_HANDLER_START = "PUSH_EXC_INFO"
+
+
+def load_pyc(path: str) -> types.CodeType:
+    """The module code object stored in a .pyc file written by this Python version."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != importlib.util.MAGIC_NUMBER:
+        raise ValueError(f"{path} was not compiled by this Python version.")
+    return marshal.loads(data[16:])
+
+
+def iter_code_objects(code: types.CodeType) -> Iterator[Tuple[str, types.CodeType]]:
+    """(qualified name, code object) for `code` and every code object nested in it."""
+    stack = [code]
+    while stack:
+        current = stack.pop()
+        yield getattr(current, "co_qualname", current.co_name), current
+        stack.extend(reversed([const for const in current.co_consts if isinstance(const, types.CodeType)]))
+
+
+def _is_jump(instruction: dis.Instruction) -> bool:
+    return instruction.opcode in _JUMPS and not instruction.opname.startswith("SETUP_")
+
+
+def _is_conditional(instruction: dis.Instruction) -> bool:
+    return "IF" in instruction.opname or instruction.opname in ("FOR_ITER", "SEND")
+
+
+def _jumps_when_true(instruction: dis.Instruction) -> bool:
+    return "IF_TRUE" in instruction.opname or instruction.opname == "JUMP_IF_NOT_EXC_MATCH"
+
+
+def _lineno(instruction: dis.Instruction) -> Optional[int]:
+    positions = getattr(instruction, "positions", None)
+    if positions is not None:
+        return positions.lineno
+    return instruction.starts_line if isinstance(instruction.starts_line, int) else None
+
+
+def _exception_regions(code: types.CodeType, instructions: List[dis.Instruction]) -> Dict[int, Set[int]]:
+    """Handler offset -> offsets of the instructions it protects, directly or via cleanup handlers."""
+    offsets = [instruction.offset for instruction in instructions]
+    entries = getattr(dis.Bytecode(code), "exception_entries", None)
+    if entries is not None:
+        ranges = [(entry.start, entry.end, entry.target) for entry in entries]
+    else:
+        ranges = [(i.offset, i.argval, i.argval) for i in instructions if i.opname.startswith("SETUP_")]
+    handler_at: Dict[int, int] = {}
+    for start, end, target in ranges:
+        for offset in offsets[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)]:
+            handler_at[offset] = target
+
+    opnames = {instruction.offset: instruction.opname for instruction in instructions}
+    regions: Dict[int, Set[int]] = {}
+    for offset in offsets:
+        handler = handler_at.get(offset)
+        seen = set()
+        while handler is not None and handler not in seen:
+            seen.add(handler)
+            if opnames.get(handler) == _HANDLER_START or entries is None:
+                regions.setdefault(handler, set()).add(offset)
+            handler = handler_at.get(handler)
+    return regions
+
+
+def _statement_texts(block: List[dis.Instruction], source_lines: List[str]) -> List[str]:
+    instructions = [i for i in block if i.opname not in _SILENT]
+    if source_lines:
+        linenos = dict.fromkeys(_lineno(i) for i in instructions)
+        return [source_lines[n - 1].strip() for n in linenos if n is not None and 0 < n <= len(source_lines)]
+    return [f"{i.opname} {i.argrepr}".rstrip() for i in instructions]
+
+
+def _span(block: List[dis.Instruction]) -> Optional[Tuple[int, int, int, int]]:
+    for instruction in block:
+        positions = getattr(instruction, "positions", None)
+        if positions is not None and None not in positions and instruction.opname not in _SILENT:
+            return (positions.lineno, positions.col_offset, positions.end_lineno, positions.end_col_offset)
+    return None
+
+
+def build_from_code(builder, code: types.CodeType, graph_name: Optional[str] = None,
+                    source: Union[str, Sequence[str], None] = None) -> Dict[int, CFGNode]:
+    """
+    Builds `code`'s CFG into `builder` (a CFGBuilder), replacing any previous
+    graph, and returns builder.nodes. See the module docstring for the shape.
+    `source` may also be given as a list of lines, so that the code objects
+    of one module can share a single split.
+    """
+    if graph_name is None:
+        graph_name = getattr(code, "co_qualname", code.co_name)
+    if source is None:
+        source_lines = linecache.getlines(code.co_filename)
+    else:
+        source_lines = source.splitlines() if isinstance(source, str) else source
+    instructions = list(dis.get_instructions(code))
+
+    builder._reset_build_state()
+    builder.entry_node = builder.new_node(statements=[f"Entry to {graph_name}"], node_type="entry")
+
+    regions = _exception_regions(code, instructions)
+    leaders = {instructions[0].offset}
+    leaders.update(regions)
+    leaders.update(min(region) for region in regions.values())
+    for instruction, following in zip(instructions, instructions[1:] + [None]):
+        if _is_jump(instruction):
+            leaders.add(instruction.argval)
+        if following is not None and (_is_jump(instruction) or instruction.opname in _RETURNS | _RAISES):
+            leaders.add(following.offset)
+
+    blocks: List[List[dis.Instruction]] = []
+    for instruction in instructions:
+        if instruction.offset in leaders or not blocks:
+            blocks.append([])
+        blocks[-1].append(instruction)
+
+    # Region start offset -> [(try node, handler offset, region)], outermost first.
+    try_nodes: Dict[int, List[Tuple[CFGNode, int, Set[int]]]] = {}
+    for handler, region in sorted(regions.items(), key=lambda item: (min(item[1]), -len(item[1]))):
+        try_nodes.setdefault(min(region), []).append((handler, region))
+    nodes: Dict[int, CFGNode] = {}
+    for block in blocks:
+        offset, last = block[0].offset, block[-1]
+        try_nodes[offset] = [(builder.new_node(statements=["try"], node_type="try_block_start"), handler, region)
+                             for handler, region in try_nodes.get(offset, ())]
+        if _is_jump(last) and _is_conditional(last):
+            node_type = "condition"
+        elif last.opname in _RETURNS:
+            node_type = "return_statement"
+        elif last.opname in _RAISES:
+            node_type = "raise_statement"
+        elif block[0].opname == _HANDLER_START:
+            node_type = "exception_handler_start"
+        else:
+            node_type = "statement_block"
+        node = builder.new_node(statements=_statement_texts(block, source_lines), node_type=node_type)
+        node.span = _span(block)
+        nodes[offset] = node
+
+    # Blocks without statements that only jump or fall through are skipped over.
+    starts = [block[0].offset for block in blocks]
+    forward: Dict[int, int] = {}
+    for index, block in enumerate(blocks):
+        last = block[-1]
+        if nodes[starts[index]].has_statements or try_nodes[starts[index]] or last.opname in _RETURNS | _RAISES:
+            continue
+        if not _is_jump(last) and index + 1 < len(blocks):
+            forward[starts[index]] = starts[index + 1]
+        elif _is_jump(last) and not _is_conditional(last):
+            forward[starts[index]] = last.argval
+
+    def target(offset: Optional[int], source_offset: Optional[int]) -> Optional[CFGNode]:
+        """Block at `offset`, entered through the try nodes whose region the edge comes from outside of."""
+        seen = set()
+        while offset in forward and offset not in seen:
+            seen.add(offset)
+            offset = forward[offset]
+        for try_node, _, region in try_nodes.get(offset, ()):
+            if source_offset not in region:
+                return try_node
+        return nodes.get(offset)
+
+    for offset, chain in try_nodes.items():
+        for (try_node, handler, _), inner in zip(chain, chain[1:] + [None]):
+            try_node.span = nodes[offset].span
+            try_node.branch_node = inner[0] if inner else nodes[offset]
+            try_node.else_node = target(handler, None)
+
+    for index, block in enumerate(blocks):
+        offset, last = starts[index], block[-1]
+        node = nodes[offset]
+        fallthrough = target(starts[index + 1], offset) if index + 1 < len(blocks) else None
+        if last.opname in _RETURNS or last.opname in _RAISES:
+            continue
+        if not _is_jump(last):
+            node.next_node = fallthrough
+        elif not _is_conditional(last):
+            node.next_node = target(last.argval, offset)
+        elif _jumps_when_true(last):
+            node.branch_node, node.else_node = target(last.argval, offset), fallthrough
+        else:
+            node.branch_node, node.else_node = fallthrough, target(last.argval, offset)
+    builder.entry_node.next_node = target(starts[0], None)
+
+    # Handlers only reachable from other handlers' cleanup code are dropped with it.
+    reachable = set()
+    stack = [builder.entry_node]
+    while stack:
+        node = stack.pop()
+        if node.id in reachable:
+            continue
+        reachable.add(node.id)
+        stack.extend(builder.get_successors(node))
+    for node_id in [node_id for node_id in builder.nodes if node_id not in reachable]:
+        del builder.nodes[node_id]
+
+    builder._optimize_empty_blocks()
+    builder._renumber_nodes()
+    if builder.basic_blocks:
+        builder._coalesce_basic_blocks()
+    if builder._graph_listeners:
+        builder._notify_graph_changed("nodes")
+        builder._notify_graph_changed("edges")
+    return builder.nodes
+
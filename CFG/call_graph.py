@@ -0,0 +1,586 @@
+"""
+call_graph.py - Call graph, interprocedural CFGs and function summaries.
+
+A CallGraph covers one module or a whole package, with one CFGForest per
+module. Functions are named "<module>:<qualname>", the qualname following
+CFGForest's conventions (`pkg.util:helper`, `pkg.shapes:Shape.area`,
+`app:main.<locals>.inner`).
+
+    graph = CallGraph.from_package("path/to/pkg")
+    graph.callees("pkg.app:main")                  # direct calls resolved to local functions
+    graph.summary("pkg.util:helper")               # computed once per function
+    graph.interprocedural_path_count("pkg.app:main")
+    icfg = graph.interprocedural_cfg("pkg.app:main", depth=2)
+
+Call sites are found in the statements of each function's CFG nodes, so a
+call site is a (caller, CFG node) pair. Only direct calls are resolved, with
+Python's scoping rules as far as they can be read off the source:
+  f()             enclosing functions' local defs, then the module's
+                  functions and classes, then `from ... import f`
+                  (absolute or relative, to modules of the graph)
+  C()             C.__init__, if the class defines one
+  self.m()        m of the method's class or of a base class defined in the
+                  same module (also `cls.m()`; the first parameter's name)
+  C.m(), mod.f()  attributes of a local class or of an imported module
+Anything else (calls through variables, builtins, other packages) is left
+unresolved.
+
+Summaries hold per-function facts that do not depend on callers: exits
+(nodes without successors other than raise statements, reachable from the
+entry), raise statements, the number of acyclic paths (see count_paths) and
+the CFG metrics. They are cached by the structural hash
+of the function's AST (ScopeEntry.digest), so update_source keeps the ones of
+unchanged functions. interprocedural_path_count composes them bottom-up over
+the call graph: a call site counts as many paths as its callee has, each
+callee is counted once however many sites call it, and calls within a
+recursive cycle count as one path.
+
+interprocedural_cfg stitches callee graphs into the caller's at its call
+sites: the call node's successors become the callee's entry, and the callee's
+exits lead to what followed the call (several calls in one node are chained
+in evaluation order). Callees are inlined as fresh copies per call site, up
+to `depth` levels and never into themselves, so returns only go back to
+their own call site. The result is a read-only view like ExceptionalCFG
+(`nodes`, `entry_node`, `get_successors`), which external prime paths and
+path sampling accept.
+"""
+
+import ast
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from CFG.analysis_manager import strongly_connected_components
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_forest import MODULE_SCOPE, CFGForest
+from CFG.cfg_node import CFGNode, NodeKind, SourceText
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def function_name(module: str, qualname: str) -> str:
+    return f"{module}:{qualname}"
+
+
+def split_function_name(name: str) -> Tuple[str, str]:
+    module, _, qualname = name.rpartition(":")
+    return module, qualname
+
+
+class CallSite:
+    """One call in a function's CFG node, and the local function it calls (None if unresolved)."""
+
+    def __init__(self, caller: str, node: CFGNode, call: ast.Call, callee: Optional[str]):
+        self.caller = caller
+        self.node = node
+        self.call = call
+        self.callee = callee
+
+    def __repr__(self) -> str:
+        return f"CallSite({self.caller!r}, node={self.node.id}, callee={self.callee!r})"
+
+
+class FunctionSummary:
+    """Caller-independent facts about one function's CFG."""
+
+    def __init__(self, name: str, exits: int, raises: int, path_count: int, metrics: Dict[str, int]):
+        self.name = name
+        self.exits = exits
+        self.raises = raises
+        self.path_count = path_count
+        self.metrics = metrics
+
+    def __repr__(self) -> str:
+        return f"FunctionSummary({self.name!r}, exits={self.exits}, raises={self.raises}, paths={self.path_count})"
+
+
+def is_exit(builder, node: CFGNode) -> bool:
+    """Whether control leaves the function normally after the node."""
+    return not builder.get_successors(node) and node.kind is not NodeKind.RAISE_STATEMENT
+
+
+def count_paths(builder, weights: Optional[Dict[int, int]] = None) -> int:
+    """
+    Number of acyclic paths in the sense of Ball and Larus: back edges u -> h
+    of a depth-first search from the entry are dropped, and paths may start at
+    the entry or at a loop head h and end at an exit or at a node u, so the
+    paths of a loop body are counted once, not once per iteration. Paths are
+    node sequences; a path through node n counts `weights[n.id]` times
+    (default 1).
+    """
+    entry = builder.entry_node
+    if entry is None:
+        return 0
+    weights = weights or {}
+    # Iterative DFS: postorder, forward edges, and the ends of back edges.
+    postorder: List[CFGNode] = []
+    forward: Dict[int, List[CFGNode]] = {id(entry): []}
+    back_edge_sources = set()
+    loop_heads: Dict[int, CFGNode] = {}
+    state: Dict[int, int] = {id(entry): 1}  # 1: on the stack, 2: done
+    work = [(entry, iter(dict.fromkeys(builder.get_successors(entry))))]
+    while work:
+        node, children = work[-1]
+        for child in children:
+            if state.get(id(child)) == 1:
+                back_edge_sources.add(id(node))
+                loop_heads[id(child)] = child
+                continue
+            forward[id(node)].append(child)
+            if id(child) not in state:
+                state[id(child)] = 1
+                forward[id(child)] = []
+                work.append((child, iter(dict.fromkeys(builder.get_successors(child)))))
+                break
+        else:
+            work.pop()
+            state[id(node)] = 2
+            postorder.append(node)
+    paths: Dict[int, int] = {}
+    for node in postorder:
+        total = 1 if is_exit(builder, node) or id(node) in back_edge_sources else 0
+        total += sum(paths[id(child)] for child in forward[id(node)])
+        paths[id(node)] = total * weights.get(node.id, 1)
+    return paths[id(entry)] + sum(paths[head_id] for head_id in loop_heads)
+
+
+def _calls(node: CFGNode) -> Iterator[ast.Call]:
+    """Calls evaluated by the node's statements, arguments before the call they belong to."""
+    for text in node._statements or ():
+        if not isinstance(text, SourceText):
+            continue
+        for part in text.parts:
+            yield from _calls_in(part)
+
+
+def _calls_in(root: ast.AST) -> Iterator[ast.Call]:
+    # Postorder without descending into bodies that run later (functions,
+    # lambdas); class bodies run at once, so they are included.
+    stack: List[Tuple[ast.AST, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            if isinstance(node, ast.Call):
+                yield node
+            continue
+        stack.append((node, True))
+        if isinstance(node, _FUNCTION_TYPES):
+            children = node.decorator_list + node.args.defaults + [d for d in node.args.kw_defaults if d]
+        elif isinstance(node, ast.Lambda):
+            children = node.args.defaults + [d for d in node.args.kw_defaults if d]
+        else:
+            children = list(ast.iter_child_nodes(node))
+        stack.extend((child, False) for child in reversed(children))
+
+
+class _ModuleSymbols:
+    """What the names of one module refer to, per scope (function qualname or MODULE_SCOPE)."""
+
+    def __init__(self, module: str, forest: CFGForest, is_package: bool):
+        self.module = module
+        self.package = module if is_package else module.rpartition(".")[0]
+        self.defs: Dict[str, Dict[str, Tuple[str, str]]] = {MODULE_SCOPE: {}}  # name -> ("function"|"class", path)
+        self.imports: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {MODULE_SCOPE: {}}  # name -> (module, attr)
+        self.parent: Dict[str, str] = {}  # function qualname -> enclosing function scope
+        self.methods: Dict[str, Dict[str, str]] = {}  # class path -> method name -> qualname
+        self.bases: Dict[str, List[ast.expr]] = {}
+        self.class_scope: Dict[str, str] = {}  # class path -> scope it is defined in
+        self.method_class: Dict[str, Tuple[str, Optional[str]]] = {}  # method -> (class path, first parameter)
+
+        qualname_of = {id(forest.entry(name).ast_node): name for name in forest}
+        # (node, function scope, class path or None, prefix of names defined here)
+        stack: List[Tuple[ast.AST, str, Optional[str], str]] = [(forest.module, MODULE_SCOPE, None, "")]
+        while stack:
+            node, scope, class_path, prefix = stack.pop()
+            children = list(ast.iter_child_nodes(node))
+            if isinstance(node, (_FUNCTION_TYPES + (ast.Lambda,))) and id(node) in qualname_of:
+                qualname = qualname_of[id(node)]
+                self.parent[qualname] = scope
+                self.defs.setdefault(qualname, {})
+                self.imports.setdefault(qualname, {})
+                if class_path is not None and isinstance(node, _FUNCTION_TYPES):
+                    self.methods[class_path][node.name] = qualname
+                    params = node.args.posonlyargs + node.args.args
+                    self.method_class[qualname] = (class_path, params[0].arg if params else None)
+                elif isinstance(node, _FUNCTION_TYPES):
+                    self.defs[scope][node.name] = ("function", qualname)
+                body = node.body if isinstance(node.body, list) else [node.body]
+                outer = [child for child in children if not any(child is b for b in body)]
+                stack.extend((child, scope, class_path, prefix) for child in reversed(outer))
+                stack.extend((child, qualname, None, qualname + ".<locals>.") for child in reversed(body))
+                continue
+            if isinstance(node, ast.ClassDef):
+                path = prefix + node.name
+                if class_path is None:
+                    self.defs[scope][node.name] = ("class", path)
+                self.methods.setdefault(path, {})
+                self.bases[path] = node.bases
+                self.class_scope[path] = scope
+                outer = node.decorator_list + node.bases + [k.value for k in node.keywords]
+                stack.extend((child, scope, class_path, prefix) for child in reversed(outer))
+                stack.extend((child, scope, path, path + ".") for child in reversed(node.body))
+                continue
+            if isinstance(node, ast.Import) and class_path is None:
+                for alias in node.names:
+                    if alias.asname:
+                        self.imports[scope][alias.asname] = (alias.name, None)
+                    else:
+                        top = alias.name.partition(".")[0]
+                        self.imports[scope][top] = (top, None)
+            elif isinstance(node, ast.ImportFrom) and class_path is None:
+                source = self._absolute(node.module, node.level)
+                if source is not None:
+                    for alias in node.names:
+                        if alias.name != "*":
+                            self.imports[scope][alias.asname or alias.name] = (source, alias.name)
+            stack.extend((child, scope, class_path, prefix) for child in reversed(children))
+
+    def _absolute(self, module: Optional[str], level: int) -> Optional[str]:
+        if level == 0:
+            return module
+        parts = self.package.split(".") if self.package else []
+        if level - 1 > len(parts):
+            return None
+        base = parts[:len(parts) - (level - 1)]
+        if module:
+            base.append(module)
+        return ".".join(base) or None
+
+    def scope_chain(self, scope: str) -> Iterator[str]:
+        while True:
+            yield scope
+            if scope == MODULE_SCOPE:
+                return
+            scope = self.parent.get(scope, MODULE_SCOPE)
+
+
+class CallGraph:
+    """Direct calls between the functions of a set of modules, resolved lazily from their CFGs."""
+
+    def __init__(self, forests: Dict[str, CFGForest], packages: Tuple[str, ...] = ()):
+        """forests: module name -> its CFGForest; packages: which of the modules are packages (__init__.py)."""
+        self.forests = dict(forests)
+        self.packages = set(packages)
+        self._symbols: Dict[str, _ModuleSymbols] = {}
+        self._call_sites: Dict[str, List[CallSite]] = {}
+        self._summaries: Dict[str, Tuple[str, FunctionSummary]] = {}
+        self._path_counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_source(cls, code_string: str, module: str = "__main__",
+                    builder_factory=CFGBuilder) -> Optional["CallGraph"]:
+        forest = CFGForest.from_source(code_string, builder_factory=builder_factory)
+        if forest is None:
+            return None
+        return cls({module: forest})
+
+    @classmethod
+    def from_package(cls, root: str, builder_factory=CFGBuilder) -> "CallGraph":
+        """
+        Every module under root (a directory or a .py file), named by its path
+        relative to root; a root that is itself a package (has __init__.py)
+        contributes its name as the first component. Files that do not parse
+        are left out.
+        """
+        from .batch import discover_python_files
+
+        root = os.path.abspath(root)
+        base = os.path.dirname(root) if os.path.isfile(root) or \
+            os.path.isfile(os.path.join(root, "__init__.py")) else root
+        forests: Dict[str, CFGForest] = {}
+        packages = []
+        for path in discover_python_files(root):
+            parts = os.path.splitext(os.path.relpath(path, base))[0].split(os.sep)
+            if parts[-1] == "__init__":
+                parts.pop()
+                packages.append(".".join(parts))
+            try:
+                with open(path, encoding="utf-8") as f:
+                    tree = ast.parse(f.read(), filename=path)
+            except (SyntaxError, UnicodeDecodeError, ValueError, OSError):
+                continue
+            forests[".".join(parts)] = CFGForest(tree, builder_factory=builder_factory)
+        return cls(forests, tuple(packages))
+
+    def update_source(self, module: str, code_string: str):
+        """
+        Switches a module to an edited version (see CFGForest.update). Call
+        sites are resolved again; summaries of functions whose AST did not
+        change are kept.
+        """
+        result = self.forests[module].update_source(code_string)
+        if result is not None:
+            self._symbols.pop(module, None)
+            self._call_sites.clear()
+            self._path_counts.clear()
+        return result
+
+    # --- Functions and call sites ----------------------------------------------
+
+    def functions(self) -> List[str]:
+        """Every scope of every module with a CFG (module scopes included), module by module."""
+        return [function_name(module, qualname) for module, forest in self.forests.items() for qualname in forest]
+
+    def builder(self, name: str) -> CFGBuilder:
+        """The CFG of a function, built on first use."""
+        module, qualname = split_function_name(name)
+        return self.forests[module].get(qualname)
+
+    def _module_symbols(self, module: str) -> _ModuleSymbols:
+        symbols = self._symbols.get(module)
+        if symbols is None:
+            symbols = self._symbols[module] = _ModuleSymbols(module, self.forests[module], module in self.packages)
+        return symbols
+
+    def call_sites(self, name: str) -> List[CallSite]:
+        """The calls in a function's CFG, node by node in id order."""
+        sites = self._call_sites.get(name)
+        if sites is None:
+            module, qualname = split_function_name(name)
+            builder = self.builder(name)
+            sites = []
+            for node in builder.nodes.values():
+                for call in _calls(node):
+                    sites.append(CallSite(name, node, call, self._resolve_call(module, qualname, call.func)))
+            self._call_sites[name] = sites
+        return sites
+
+    def callees(self, name: str) -> List[str]:
+        return list(dict.fromkeys(site.callee for site in self.call_sites(name) if site.callee is not None))
+
+    def callers(self, name: str) -> List[str]:
+        """Functions calling `name`; builds the CFG of every function in the graph."""
+        return [caller for caller in self.functions() if name in self.callees(caller)]
+
+    def edges(self) -> Dict[str, List[str]]:
+        """Caller -> callees for every function in the graph."""
+        return {name: self.callees(name) for name in self.functions()}
+
+    # --- Name resolution -------------------------------------------------------
+
+    def _resolve_call(self, module: str, scope: str, func: ast.expr) -> Optional[str]:
+        if isinstance(func, ast.Name):
+            return self._callable(self._lookup(module, scope, func.id))
+        if not isinstance(func, ast.Attribute):
+            return None
+        value = func.value
+        if isinstance(value, ast.Name):
+            symbols = self._module_symbols(module)
+            for enclosing in symbols.scope_chain(scope):  # Closures in a method see its `self` too.
+                method = symbols.method_class.get(enclosing)
+                if method is not None:
+                    if method[1] == value.id:
+                        return self._method(module, method[0], func.attr)
+                    break
+        target = self._lookup_expr(module, scope, value)
+        if target is None:
+            return None
+        if target[0] == "class":
+            return self._method(target[1], target[2], func.attr)
+        if target[0] == "module":
+            return self._callable(self._top_level(target[1], func.attr))
+        return None
+
+    def _lookup_expr(self, module: str, scope: str, expr: ast.expr) -> Optional[Tuple[str, ...]]:
+        """What a Name or dotted Attribute refers to: ("class", module, path), ("module", name) or None."""
+        if isinstance(expr, ast.Name):
+            return self._lookup(module, scope, expr.id)
+        if isinstance(expr, ast.Attribute):
+            target = self._lookup_expr(module, scope, expr.value)
+            if target is not None and target[0] == "module":
+                return self._top_level(target[1], expr.attr)
+        return None
+
+    def _lookup(self, module: str, scope: str, name: str, depth: int = 0) -> Optional[Tuple[str, ...]]:
+        """
+        ("function", module, qualname), ("class", module, path) or
+        ("module", name) for a name used in a scope.
+        """
+        symbols = self._module_symbols(module)
+        for enclosing in symbols.scope_chain(scope):
+            kind_path = symbols.defs.get(enclosing, {}).get(name)
+            if kind_path is not None:
+                return (kind_path[0], module, kind_path[1])
+            imported = symbols.imports.get(enclosing, {}).get(name)
+            if imported is not None:
+                source, attr = imported
+                if attr is None:
+                    return ("module", source) if source in self.forests or self._is_package_prefix(source) else None
+                submodule = f"{source}.{attr}"
+                if submodule in self.forests:
+                    return ("module", submodule)
+                return self._top_level(source, attr, depth + 1)
+        return None
+
+    def _top_level(self, module: str, name: str, depth: int = 0) -> Optional[Tuple[str, ...]]:
+        """A module-level name of a module in the graph, following re-exports."""
+        if depth > 10:
+            return None
+        if module not in self.forests:
+            submodule = f"{module}.{name}"
+            return ("module", submodule) if submodule in self.forests or self._is_package_prefix(submodule) else None
+        target = self._lookup(module, MODULE_SCOPE, name, depth)
+        if target is None and f"{module}.{name}" in self.forests:
+            return ("module", f"{module}.{name}")
+        return target
+
+    def _is_package_prefix(self, module: str) -> bool:
+        prefix = module + "."
+        return any(name.startswith(prefix) for name in self.forests)
+
+    def _method(self, module: str, class_path: str, name: str, depth: int = 0) -> Optional[str]:
+        """A method of a class or, in order, of its bases defined in the same module."""
+        symbols = self._module_symbols(module)
+        if depth > 10 or class_path not in symbols.methods:
+            return None
+        qualname = symbols.methods[class_path].get(name)
+        if qualname is not None:
+            return function_name(module, qualname)
+        for base in symbols.bases[class_path]:
+            target = self._lookup_expr(module, symbols.class_scope[class_path], base)
+            if target is not None and target[0] == "class":
+                found = self._method(target[1], target[2], name, depth + 1)
+                if found is not None:
+                    return found
+        return None
+
+    def _callable(self, target: Optional[Tuple[str, ...]]) -> Optional[str]:
+        if target is None:
+            return None
+        if target[0] == "function":
+            return function_name(target[1], target[2])
+        if target[0] == "class":
+            return self._method(target[1], target[2], "__init__")
+        return None
+
+    # --- Summaries -------------------------------------------------------------
+
+    def summary(self, name: str) -> FunctionSummary:
+        """The function's summary, computed once per version of its AST."""
+        module, qualname = split_function_name(name)
+        digest = self.forests[module].entry(qualname).digest
+        cached = self._summaries.get(name)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        builder = self.builder(name)
+        reachable = builder.get_analysis_manager().get("reachability")
+        reached = [node for node in builder.nodes.values() if node.id in reachable]
+        summary = FunctionSummary(
+            name,
+            exits=sum(1 for node in reached if is_exit(builder, node)),
+            raises=sum(1 for node in reached if node.kind is NodeKind.RAISE_STATEMENT),
+            path_count=count_paths(builder),
+            metrics=builder.get_analysis_manager().get("metrics"),
+        )
+        self._summaries[name] = (digest, summary)
+        return summary
+
+    def interprocedural_path_count(self, name: str) -> int:
+        """
+        Acyclic entry-to-exit paths of the function with every call site
+        expanded into the paths of its callee (see module docstring).
+        """
+        if name in self._path_counts:
+            return self._path_counts[name]
+        # Every function reachable through calls, then their cycles callees first.
+        reachable = {name: None}
+        stack = [name]
+        while stack:
+            for callee in self.callees(stack.pop()):
+                if callee not in reachable:
+                    reachable[callee] = None
+                    stack.append(callee)
+        calls = {function: self.callees(function) for function in reachable}
+        for component in strongly_connected_components(calls):
+            members = set(component)
+            for function in component:
+                if function in self._path_counts:
+                    continue
+                weights: Dict[int, int] = {}
+                for site in self.call_sites(function):
+                    if site.callee is not None and site.callee not in members:
+                        weights[site.node.id] = weights.get(site.node.id, 1) * self._path_counts[site.callee]
+                if weights:
+                    self._path_counts[function] = count_paths(self.builder(function), weights)
+                else:
+                    self._path_counts[function] = self.summary(function).path_count
+        return self._path_counts[name]
+
+    # --- Interprocedural CFGs --------------------------------------------------
+
+    def interprocedural_cfg(self, name: str, depth: int = 1) -> "InterproceduralCFG":
+        return InterproceduralCFG(self, name, depth)
+
+
+class InterproceduralCFG:
+    """Read-only view of a function's CFG with its callees' CFGs inlined at their call sites."""
+
+    def __init__(self, call_graph: CallGraph, name: str, depth: int = 1):
+        self.call_graph = call_graph
+        self.name = name
+        self.depth = depth
+        self.nodes: Dict[int, CFGNode] = {}
+        self.exit_node: Optional[CFGNode] = None
+        self._successors: Dict[int, List[CFGNode]] = {}
+        self._origin: Dict[int, Tuple[str, CFGNode]] = {}
+        self.entry_node, _ = self._inline(name, (name,))
+
+    def _copy(self, function: str, node: CFGNode) -> CFGNode:
+        copy = CFGNode(len(self.nodes) + 1, list(node._statements or ()), node.kind)
+        copy.span = node.span
+        copy.condition_ast = node.condition_ast
+        copy.true_condition_label = node._true_condition_label
+        copy.false_condition_label = node._false_condition_label
+        self.nodes[copy.id] = copy
+        self._origin[copy.id] = (function, node)
+        return copy
+
+    def _inline(self, function: str, stack: Tuple[str, ...]) -> Tuple[CFGNode, List[CFGNode]]:
+        """Copies a function's graph (and, within depth, its callees'); returns its entry and exits."""
+        builder = self.call_graph.builder(function)
+        copies = {node.id: self._copy(function, node) for node in builder.nodes.values()}
+        exits = []
+        for node in builder.nodes.values():
+            copy = copies[node.id]
+            self._successors[copy.id] = list(dict.fromkeys(copies[s.id] for s in builder.get_successors(node)
+                                                           if builder.nodes.get(s.id) is s))
+            if is_exit(builder, node):
+                exits.append(copy)
+
+        if len(stack) <= self.depth:
+            sites: Dict[int, List[str]] = {}
+            for site in self.call_graph.call_sites(function):
+                if site.callee is not None and site.callee not in stack:
+                    sites.setdefault(site.node.id, []).append(site.callee)
+            for node_id, callees in sites.items():
+                call_node = copies[node_id]
+                continuation = self._successors[call_node.id]
+                ends = [call_node]
+                for callee in callees:
+                    entry, callee_exits = self._inline(callee, stack + (callee,))
+                    for end in ends:
+                        self._successors[end.id] = [entry]
+                    ends = callee_exits
+                for end in ends:
+                    self._successors[end.id] = list(continuation)
+                if call_node in exits and not continuation:
+                    # The caller returns after its last call: through the callee's exits.
+                    exits.remove(call_node)
+                    exits.extend(ends)
+        return copies[builder.entry_node.id], exits
+
+    def get_successors(self, node: CFGNode) -> List[CFGNode]:
+        return list(self._successors.get(node.id, ()))
+
+    def origin(self, node: CFGNode) -> Tuple[str, CFGNode]:
+        """The function a node was copied from and the node in that function's CFG."""
+        return self._origin[node.id]
+
+    def find_prime_paths(self) -> List[List[CFGNode]]:
+        from CFG.external_prime_paths import find_prime_paths_external
+        return find_prime_paths_external(self)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return f"InterproceduralCFG({self.name!r}, depth={self.depth}, {len(self.nodes)} nodes)"
@@ -1,11 +1,35 @@
 import ast
-from typing import List, Optional, Tuple, Union, Dict
+import copy
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from CFG.cfg_node import CFGNode # Import CFGNode from its actual file
-# from .ast_utils import negate_condition_ast # Will be imported within methods that need it
+from CFG.ast_utils import negate_condition_ast
+from CFG.cfg_node import CFGNode, NodeKind, SourceText, TERMINAL_KINDS # Import CFGNode from its actual file
 
 class CFGBuilder(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, basic_blocks: bool = False, expand_conditions: bool = False,
+                 factored_exceptions: bool = False, for_to_while: bool = False,
+                 prune_unreachable: bool = False):
+        """
+        basic_blocks: merge maximal straight-line runs of statement nodes into
+        single basic-block nodes after building (see _coalesce_basic_blocks).
+        expand_conditions: split `and`/`or` conditions into one condition node
+        per operand with short-circuit edges (see short_circuit.py).
+        factored_exceptions: give every try statement one shared exception
+        dispatch node and record its body as an ExceptionRegion (see
+        exception_edges.py).
+        for_to_while: rewrite `for` loops as `while` loops before building
+        (for_to_while_converter.py), on a copy-on-write version of the tree
+        being built; the same graph as building the source
+        convert_for_to_while_code returns.
+        prune_unreachable: remove nodes that cannot be reached before
+        analysis and record them in self.dead_code (see dead_code.py).
+        """
+        self.basic_blocks = basic_blocks
+        self.expand_conditions = expand_conditions
+        self.factored_exceptions = factored_exceptions
+        self.for_to_while = for_to_while
+        self.prune_unreachable = prune_unreachable
         self.nodes: Dict[int, CFGNode] = {}
         self.current_id: int = 0
         self.entry_node: Optional[CFGNode] = None
@@ -14,21 +38,59 @@ class CFGBuilder(ast.NodeVisitor):
         self._loop_exit_stack: List[CFGNode] = []
         self._loop_start_stack: List[CFGNode] = []
 
+        # Callbacks notified with "nodes" or "edges" when the graph changes (see AnalysisManager)
+        self._graph_listeners: List[Callable[[str], None]] = []
+        self._analysis_manager = None
+
+        # Set by basic-block builds: the per-statement graph the blocks were
+        # merged from, and block id -> its statement nodes in execution order.
+        self.statement_nodes: Optional[Dict[int, CFGNode]] = None
+        self.block_members: Optional[Dict[int, List[CFGNode]]] = None
+        self._statement_blocks: Dict[int, int] = {}
+        # Try bodies of factored-exception builds, innermost first.
+        self.exception_regions: List[Any] = []
+        # DeadCode findings of builds with prune_unreachable.
+        self.dead_code: List[Any] = []
+        self._unbuilt_statements: List[Tuple[List[ast.AST], int]] = []
+
+        # Statement handlers of this builder class by AST type (see _statement_handler).
+        self._handlers: Dict[type, Tuple] = _HANDLER_TABLES.setdefault(type(self), {})
+
+    def _notify_graph_changed(self, kind: str):
+        for listener in self._graph_listeners:
+            listener(kind)
+
+    def get_analysis_manager(self, memo=None):
+        """
+        Returns the AnalysisManager attached to this builder, creating it on first use.
+        Cached analyses are invalidated automatically when the graph changes.
+        An optional CFGAnalysisMemo lets isomorphic CFGs share results.
+        """
+        if self._analysis_manager is None:
+            from .analysis_manager import AnalysisManager
+            self._analysis_manager = AnalysisManager(self)
+        if memo is not None:
+            self._analysis_manager.memo = memo
+        return self._analysis_manager
+
     def _new_id(self) -> int:
         self.current_id += 1
         return self.current_id
 
-    def new_node(self, statements: Optional[List[str]] = None, node_type: str = "statement_block") -> CFGNode:
-        node_id = self._new_id()
-        node = CFGNode(node_id, statements=statements, node_type=node_type)
+    def new_node(self, statements: Optional[List[Union[str, SourceText]]] = None,
+                 node_type: Union[str, NodeKind] = NodeKind.STATEMENT_BLOCK) -> CFGNode:
+        self.current_id = node_id = self.current_id + 1
+        node = CFGNode(node_id, statements, node_type)
         self.nodes[node_id] = node
+        if self._graph_listeners:
+            self._notify_graph_changed("nodes")
         return node
 
     def _link_predecessor_to_successor(self, pred_node: Optional[CFGNode], succ_node: Optional[CFGNode], link_type: str = "next"):
         if not pred_node or not succ_node:
             return
         # Prevent linking FROM terminal nodes
-        if pred_node.node_type in ("return_statement", "break_statement", "continue_statement", "raise_statement"):
+        if pred_node.kind in TERMINAL_KINDS:
             return
 
         if link_type == "next":
@@ -37,13 +99,34 @@ class CFGBuilder(ast.NodeVisitor):
             pred_node.branch_node = succ_node
         elif link_type == "else":
             pred_node.else_node = succ_node
+        if self._graph_listeners:
+            self._notify_graph_changed("edges")
 
-    def build(self, ast_root: ast.AST, graph_name: str = "cfg") -> Dict[int, CFGNode]:
+    def _reset_build_state(self):
+        """Forgets the previous graph and the scratch state used while building it."""
         self.nodes = {}
         self.current_id = 0
+        self.entry_node = None
         self._loop_exit_stack = []
         self._loop_start_stack = []
         self.exit_node = None
+        self.exception_regions = []
+        self.statement_nodes = None
+        self.block_members = None
+        self._statement_blocks = {}
+        self.dead_code = []
+        self._unbuilt_statements = []
+
+    def build(self, ast_root: ast.AST, graph_name: str = "cfg") -> Dict[int, CFGNode]:
+        """
+        Builds the CFG of a module, function or single statement. With
+        for_to_while, the graph is built from a rewritten version of
+        ast_root; ast_root itself is not modified.
+        """
+        self._reset_build_state()
+        if self.for_to_while:
+            from for_to_while_converter import convert_for_to_while_ast
+            ast_root = convert_for_to_while_ast(ast_root)
 
         self.entry_node = self.new_node(statements=[f"Entry to {graph_name}"], node_type="entry")
 
@@ -53,10 +136,41 @@ class CFGBuilder(ast.NodeVisitor):
             self.visit(ast_root, self.entry_node)
 
         self._optimize_empty_blocks()
+        if self.prune_unreachable:
+            from .dead_code import prune_unreachable
+            self.dead_code = prune_unreachable(self)
         self._renumber_nodes() # New call added here
+        if self.expand_conditions:
+            from .short_circuit import expand_short_circuits
+            expand_short_circuits(self)
+        if self.basic_blocks:
+            self._coalesce_basic_blocks()
+        if self._graph_listeners:
+            self._notify_graph_changed("nodes")
+            self._notify_graph_changed("edges")
         return self.nodes
 
-    def build_cfg(self, code_string: str, graph_name: str = "cfg") -> Optional[CFGNode]:
+    def build_code(self, code, graph_name: Optional[str] = None, source=None) -> Dict[int, CFGNode]:
+        """Builds the CFG of a compiled code object (bytecode frontend, see bytecode_frontend.py)."""
+        from .bytecode_frontend import build_from_code
+        return build_from_code(self, code, graph_name=graph_name, source=source)
+
+    def build_cfg(self, code_string: str, graph_name: str = "cfg", frontend: str = "ast") -> Optional[CFGNode]:
+        """
+        Builds the CFG of a module's source. frontend="bytecode" compiles it and
+        builds from the bytecode instead of the AST.
+        """
+        if frontend == "bytecode":
+            try:
+                code = compile(code_string, f"<{graph_name}>", "exec")
+            except SyntaxError as e:
+                print(f"Syntax error in input code: {e}")
+                return None
+            self.build_code(code, graph_name=graph_name, source=code_string)
+            return self.entry_node
+        if frontend != "ast":
+            raise ValueError(f"Unknown frontend: {frontend!r}")
+
         from .ast_utils import parse_code_to_ast
 
         ast_tree = parse_code_to_ast(code_string)
@@ -66,219 +180,325 @@ class CFGBuilder(ast.NodeVisitor):
         self.build(ast_tree, graph_name=graph_name)
         return self.entry_node
 
-    def _process_statement_list_in_block(self, stmt_list: List[ast.AST], current_source_nodes: List[CFGNode]) -> List[CFGNode]:
-        active_source_nodes = list(current_source_nodes)
-        skip_next_iteration = False
+    # --- Reentrant builds ------------------------------------------------------
 
-        for stmt_idx, stmt_ast in enumerate(stmt_list):
-            if skip_next_iteration:
-                skip_next_iteration = False
-                continue
+    def _scratch_builder(self) -> "CFGBuilder":
+        """A builder of this class with these options, but with its own graph and build state."""
+        scratch = copy.copy(self)
+        scratch._graph_listeners = []
+        scratch._analysis_manager = None
+        scratch._reset_build_state()
+        return scratch
 
-            if not active_source_nodes:
-                 # All prior paths terminated or no initial sources.
-                 # If subsequent stmts in stmt_list exist, they are unreachable from original current_source_nodes.
-                 # The main build() method is responsible for iterating all top-level statements if ast_root is Module.
-                 # This function correctly returns empty list if all paths from current_source_nodes terminate.
-                break
+    def build_result(self, ast_root: ast.AST, graph_name: str = "cfg"):
+        """
+        Like build(), but builds in a scratch copy of this builder and returns
+        the graph as a CFGResult; this builder is left untouched, so it can be
+        shared between threads (see cfg_result.py).
+        """
+        from .cfg_result import CFGResult
+        scratch = self._scratch_builder()
+        scratch.build(ast_root, graph_name=graph_name)
+        return CFGResult(scratch, graph_name)
+
+    def build_cfg_result(self, code_string: str, graph_name: str = "cfg", frontend: str = "ast"):
+        """Thread-safe build_cfg(): the module's CFGResult, or None if the source does not parse."""
+        from .cfg_result import CFGResult
+        scratch = self._scratch_builder()
+        if scratch.build_cfg(code_string, graph_name=graph_name, frontend=frontend) is None:
+            return None
+        return CFGResult(scratch, graph_name)
+
+    # --- Explicit-stack construction -----------------------------------------
+    #
+    # Compound statements nest blocks inside blocks. Instead of recursing,
+    # their construction is written as generators ("steps") that yield a
+    # nested steps generator whenever they need a block built and receive its
+    # loose ends back. _run_steps drives them with an explicit stack, so
+    # nesting depth is limited only by memory, and the order in which nodes
+    # are created (hence their ids) is the same as a recursive walk.
+
+    def _run_steps(self, steps: Iterator) -> Any:
+        stack = [steps]
+        value = None
+        while stack:
+            try:
+                nested = stack[-1].send(value)
+            except StopIteration as finished:
+                stack.pop()
+                value = finished.value
+                continue
+            stack.append(nested)
+            value = None
+        return value
+
+    # --- Statement dispatch ----------------------------------------------------
+    #
+    # Looking up `visit_<Type>` by name for every statement (and checking for
+    # subclass overrides) costs more than building most statement nodes, so
+    # each builder class resolves a statement type once and keeps the result
+    # in a table shared by its instances.
+
+    def _statement_handler(self, stmt_type: type) -> Tuple:
+        """
+        (steps, extra_args, visitor, owned, joins_successor, node_kind) for
+        statements of `stmt_type`: `steps(self, stmt, source, *extra_args)` is
+        the steps generator of a built-in compound statement, otherwise
+        `visitor(self, stmt, source)` builds it directly. `owned` means the
+        handler only returns nodes it created, without repeats;
+        joins_successor marks If/Match, whose successor statement _block_steps
+        links itself. node_kind is set when the statement is built as a single
+        node holding its own text, which _block_steps then creates inline.
+        """
+        handler = self._handlers.get(stmt_type)
+        if handler is not None:
+            return handler
+        cls = type(self)
+        joins_successor = issubclass(stmt_type, (ast.If, ast.Match))
+        step = _STEP_METHODS.get(stmt_type)
+        if step is not None and getattr(cls, step[0]) is getattr(CFGBuilder, step[0]):
+            handler = (getattr(cls, step[1]), step[2], None, True, joins_successor, None)
+        elif cls.visit is not CFGBuilder.visit:
+            handler = (None, (), cls.visit, False, joins_successor, None)  # A subclass overrides visit; respect it.
+        else:
+            visitor = _visitor_function(cls, stmt_type)
+            owned = visitor is _visitor_function(CFGBuilder, stmt_type)
+            node_kind = None
+            if owned and all(getattr(cls, name) is getattr(CFGBuilder, name) for name in _INLINED_METHODS):
+                node_kind = _SINGLE_NODE_KINDS.get(stmt_type)
+                if node_kind is None and visitor is CFGBuilder.generic_visit_statement_node:
+                    node_kind = NodeKind.from_type_name(_STATEMENT_NODE_TYPES.get(stmt_type, "statement_block"))
+            handler = (None, (), visitor, owned, joins_successor, node_kind)
+        self._handlers[stmt_type] = handler
+        return handler
 
-            current_iteration_next_active_sources = []
+    def _process_statement_list_in_block(self, stmt_list: List[ast.AST], current_source_nodes: List[CFGNode]) -> List[CFGNode]:
+        return self._run_steps(self._block_steps(stmt_list, current_source_nodes))
 
-            live_sources_for_current_stmt = []
-            if active_source_nodes:
+    def _block_steps(self, stmt_list: List[ast.AST], current_source_nodes: List[CFGNode]):
+        active_source_nodes = list(current_source_nodes)
+        handlers = self._handlers
+        nodes = self.nodes
+        stmt_count = len(stmt_list)
+        stmt_idx = 0
+
+        while stmt_idx < stmt_count and active_source_nodes:
+            stmt_ast = stmt_list[stmt_idx]
+            stmt_idx += 1
+            stmt_type = type(stmt_ast)
+            steps, extra_args, visitor, owned, joins_successor, node_kind = \
+                handlers.get(stmt_type) or self._statement_handler(stmt_type)
+
+            # Terminal sources (return, break, ...) are carried over unchanged; the
+            # statement is built after each live one.
+            if len(active_source_nodes) == 1:
+                source_node = active_source_nodes[0]
+                if source_node.kind in TERMINAL_KINDS:
+                    stmt_idx -= 1
+                    break  # All paths leading to this point terminated.
+                if node_kind is not None:
+                    # Most statements: what the built-in visitor would do, inlined.
+                    if node_kind is NodeKind.EXPRESSION_STATEMENT and isinstance(stmt_ast.value, ast.Call):
+                        node_kind = NodeKind.FUNCTION_CALL
+                    self.current_id = node_id = self.current_id + 1
+                    stmt_node = nodes[node_id] = CFGNode(node_id, [SourceText("{}", stmt_ast)], node_kind)
+                    source_node.next_node = stmt_node
+                    if self._graph_listeners:
+                        self._notify_graph_changed("nodes")
+                        self._notify_graph_changed("edges")
+                    active_source_nodes = [stmt_node]
+                    continue
+                live_sources_for_current_stmt = active_source_nodes
+                current_iteration_next_active_sources = []
+            else:
+                current_iteration_next_active_sources = []
+                live_sources_for_current_stmt = []
                 for source_node in active_source_nodes:
-                    if source_node.node_type in ("return_statement", "break_statement", "continue_statement", "raise_statement"):
+                    if source_node.kind in TERMINAL_KINDS:
                         current_iteration_next_active_sources.append(source_node)
                     else:
                         live_sources_for_current_stmt.append(source_node)
+                if not live_sources_for_current_stmt:
+                    # All paths leading to this point terminated; the remaining
+                    # statements are unreachable from them.
+                    active_source_nodes = list(dict.fromkeys(current_iteration_next_active_sources))
+                    stmt_idx -= 1
+                    break
 
-            if not live_sources_for_current_stmt:
-                # All paths leading to this point terminated.
-                # Any remaining terminal nodes from previous iterations are carried over.
-                active_source_nodes = list(dict.fromkeys(current_iteration_next_active_sources))
-                continue # Effectively, remaining stmts in this list are unreachable from these specific prior paths.
-
-            # Determine if current statement is If/Match and has a successor
-            is_if_match_with_successor = False
-            successor_ast_node = None
-            if isinstance(stmt_ast, (ast.If, ast.Match)) and (stmt_idx + 1 < len(stmt_list)):
-                is_if_match_with_successor = True
-                successor_ast_node = stmt_list[stmt_idx + 1]
-                # Do NOT create CFGNode for successor_ast_node here.
-
-            loose_ends_from_current_stmt_processing = []
-            for source_node_for_stmt in live_sources_for_current_stmt:
-                # Visit the current statement (If, Match, or other)
-                # For If/Match, self.visit will handle their internal logic and return loose ends.
-                # For other statements, it processes them and returns the next active node(s).
-                returned_nodes = self.visit(stmt_ast, source_node_for_stmt)
-                if returned_nodes:
-                    loose_ends_from_current_stmt_processing.extend(returned_nodes)
-
-            # Deduplicate loose ends from processing the current statement across its live sources
-            loose_ends_from_current_stmt_processing = list(dict.fromkeys(loose_ends_from_current_stmt_processing))
-
-            if is_if_match_with_successor and successor_ast_node:
-                # Create the CFGNode for the successor *after* If/Match has been processed
-                successor_text = ast.unparse(successor_ast_node).strip()
+            if len(live_sources_for_current_stmt) == 1:
+                if steps is not None:
+                    loose_ends_from_current_stmt_processing = yield steps(self, stmt_ast, live_sources_for_current_stmt[0], *extra_args)
+                else:
+                    loose_ends_from_current_stmt_processing = visitor(self, stmt_ast, live_sources_for_current_stmt[0])
+                if not loose_ends_from_current_stmt_processing:
+                    loose_ends_from_current_stmt_processing = []
+                # Owned loose ends are disjoint from the carried terminal nodes, so
+                # the common single-source case never needs deduplication.
+                loose_ends_unique = owned
+            else:
+                loose_ends_from_current_stmt_processing = []
+                for source_node_for_stmt in live_sources_for_current_stmt:
+                    if steps is not None:
+                        returned_nodes = yield steps(self, stmt_ast, source_node_for_stmt, *extra_args)
+                    else:
+                        returned_nodes = visitor(self, stmt_ast, source_node_for_stmt)
+                    if returned_nodes:
+                        loose_ends_from_current_stmt_processing.extend(returned_nodes)
+                # Deduplicate loose ends from processing the statement across its live sources.
+                loose_ends_from_current_stmt_processing = list(dict.fromkeys(loose_ends_from_current_stmt_processing))
+                loose_ends_unique = True
+
+            if joins_successor and stmt_idx < stmt_count:
+                # An If/Match followed by another statement: the successor's node is
+                # created after the If/Match has been processed, its non-terminal
+                # loose ends are linked to it, and its turn in the loop is skipped.
+                successor_ast_node = stmt_list[stmt_idx]
+                stmt_idx += 1
+                successor_text = SourceText("{}", successor_ast_node)
                 successor_type = self._determine_node_type_from_ast(successor_ast_node)
                 actual_successor_node = self.new_node(statements=[successor_text], node_type=successor_type)
 
                 next_active_sources_after_if_match = []
                 was_successor_linked = False
-                if not loose_ends_from_current_stmt_processing: # Implicit fall-through if If/Match had no explicit loose ends
-                    # This case might be rare if If/Match always produces some end (e.g. condition node itself if orelse is missing)
-                    # However, if truly empty, it implies a direct path not taken through the branches,
-                    # which logically would go to the actual_successor_node.
-                    # This should ideally be handled by the If/Match visit methods returning appropriate loose ends.
-                    # For safety, if no loose ends, we can consider the actual_successor_node as a potential next step if no path explicitly led to it.
-                    # This part might need refinement based on how visit_If/visit_Match return values in edge cases.
-                    pass # Covered by later logic to add actual_successor_node if it's the next logical step
-
                 for node in loose_ends_from_current_stmt_processing:
-                    if node.node_type in ("return_statement", "break_statement", "continue_statement", "raise_statement"):
+                    if node.kind in TERMINAL_KINDS:
                         next_active_sources_after_if_match.append(node)
                     else:
-                        # Link non-terminal loose ends from If/Match to the actual_successor_node
                         self._link_predecessor_to_successor(node, actual_successor_node)
                         was_successor_linked = True
 
-                # Add actual_successor_node to next_active_sources if it was linked,
-                # or if it's the direct fall-through from an empty If/Match,
-                # or if no paths explicitly led to it but it's the next statement.
+                # The successor becomes active if any path reached it, or if the
+                # If/Match had no loose ends at all.
                 if was_successor_linked or not loose_ends_from_current_stmt_processing:
-                     # If any path linked to it, or if the If/Match block had no specific divergent paths (e.g. all paths returned/broke)
-                     # but a successor statement exists, it should become active.
                     next_active_sources_after_if_match.append(actual_successor_node)
-
-                # Ensure no duplicates if actual_successor_node was already added (e.g. via a path through if/match)
-                current_iteration_next_active_sources.extend(list(dict.fromkeys(next_active_sources_after_if_match)))
-                skip_next_iteration = True # Successor node processed, skip its turn in the main loop
-            else:
-                # Not an If/Match with a successor, or successor_ast_node was None
-                # Simply add all collected loose ends from processing stmt_ast
+                current_iteration_next_active_sources.extend(dict.fromkeys(next_active_sources_after_if_match))
+            elif current_iteration_next_active_sources:
                 current_iteration_next_active_sources.extend(loose_ends_from_current_stmt_processing)
-                skip_next_iteration = False
+            else:
+                current_iteration_next_active_sources = loose_ends_from_current_stmt_processing
 
-            active_source_nodes = list(dict.fromkeys(current_iteration_next_active_sources))
+            if loose_ends_unique:
+                active_source_nodes = current_iteration_next_active_sources
+            else:
+                active_source_nodes = list(dict.fromkeys(current_iteration_next_active_sources))
+        if stmt_idx < stmt_count and self.prune_unreachable:
+            # No path reaches the rest of the block, so it gets no nodes.
+            self._unbuilt_statements.append((stmt_list, stmt_idx))
         return active_source_nodes
 
     def visit(self, stmt_ast: ast.AST, source_node: CFGNode) -> Union[List[CFGNode], None]:
-        method_name = 'visit_' + stmt_ast.__class__.__name__
-        visitor_method = getattr(self, method_name, self.generic_visit_statement_node)
-
-        if visitor_method.__name__ != 'generic_visit_statement_node':
-            return visitor_method(stmt_ast, source_node)
-        else:
-            return self.generic_visit_statement_node(stmt_ast, source_node)
+        visitor = _VISITORS.get((type(self), type(stmt_ast)))
+        if visitor is None:
+            visitor = _VISITORS[type(self), type(stmt_ast)] = _visitor_function(type(self), type(stmt_ast))
+        return visitor(self, stmt_ast, source_node)
 
     def generic_visit_statement_node(self, stmt_ast: ast.AST, source_node: CFGNode) -> List[CFGNode]:
-        stmt_text = ast.unparse(stmt_ast).strip()
+        stmt_text = SourceText("{}", stmt_ast)
         node_type = self._determine_node_type_from_ast(stmt_ast)
         current_stmt_node = self.new_node(statements=[stmt_text], node_type=node_type)
         self._link_predecessor_to_successor(source_node, current_stmt_node)
         return [current_stmt_node]
 
     def _determine_node_type_from_ast(self, stmt_ast: ast.AST) -> str:
-        if isinstance(stmt_ast, (ast.Assign, ast.AugAssign, ast.AnnAssign)): return "assignment"
+        node_type = _STATEMENT_NODE_TYPES.get(type(stmt_ast))
+        if node_type is not None:
+            return node_type
         if isinstance(stmt_ast, ast.Expr):
             if isinstance(stmt_ast.value, ast.Call): return "function_call"
             return "expression_statement"
-        if isinstance(stmt_ast, ast.Pass): return "pass_statement"
-        if isinstance(stmt_ast, ast.Return): return "return_statement"
-        if isinstance(stmt_ast, ast.Break): return "break_statement"
-        if isinstance(stmt_ast, ast.Continue): return "continue_statement"
-        if isinstance(stmt_ast, ast.If): return "condition"
-        if isinstance(stmt_ast, (ast.For, ast.While)): return "condition"
-        if isinstance(stmt_ast, ast.FunctionDef): return "function_definition"
-        if isinstance(stmt_ast, ast.Match): return "match_dispatcher"
         return "statement_block"
 
     def visit_Expr(self, ast_node: ast.Expr, source_node: CFGNode) -> List[CFGNode]:
-        expr_text = ast.unparse(ast_node).strip()
-        node_type = "expression_statement"
+        expr_text = SourceText("{}", ast_node)
+        node_type = NodeKind.EXPRESSION_STATEMENT
         if isinstance(ast_node.value, ast.Call):
-            node_type = "function_call"
+            node_type = NodeKind.FUNCTION_CALL
         current_expr_node = self.new_node(statements=[expr_text], node_type=node_type)
         self._link_predecessor_to_successor(source_node, current_expr_node)
         return [current_expr_node]
 
     def visit_Assign(self, ast_node: ast.Assign, source_node: CFGNode) -> List[CFGNode]:
-        assign_text = ast.unparse(ast_node).strip()
-        current_assign_node = self.new_node(statements=[assign_text], node_type="assignment")
+        assign_text = SourceText("{}", ast_node)
+        current_assign_node = self.new_node(statements=[assign_text], node_type=NodeKind.ASSIGNMENT)
         self._link_predecessor_to_successor(source_node, current_assign_node)
         return [current_assign_node]
 
     def visit_AugAssign(self, ast_node: ast.AugAssign, source_node: CFGNode) -> List[CFGNode]:
-        aug_assign_text = ast.unparse(ast_node).strip()
-        current_aug_assign_node = self.new_node(statements=[aug_assign_text], node_type="assignment")
+        aug_assign_text = SourceText("{}", ast_node)
+        current_aug_assign_node = self.new_node(statements=[aug_assign_text], node_type=NodeKind.ASSIGNMENT)
         self._link_predecessor_to_successor(source_node, current_aug_assign_node)
         return [current_aug_assign_node]
 
     def visit_AnnAssign(self, ast_node: ast.AnnAssign, source_node: CFGNode) -> List[CFGNode]:
-        ann_assign_text = ast.unparse(ast_node).strip()
-        current_ann_assign_node = self.new_node(statements=[ann_assign_text], node_type="assignment")
+        ann_assign_text = SourceText("{}", ast_node)
+        current_ann_assign_node = self.new_node(statements=[ann_assign_text], node_type=NodeKind.ASSIGNMENT)
         self._link_predecessor_to_successor(source_node, current_ann_assign_node)
         return [current_ann_assign_node]
 
     def visit_Pass(self, ast_node: ast.Pass, source_node: CFGNode) -> List[CFGNode]:
-        pass_node = self.new_node(statements=["pass"], node_type="pass_statement")
+        pass_node = self.new_node(statements=["pass"], node_type=NodeKind.PASS_STATEMENT)
+        pass_node.span = _keyword_span(ast_node)
         self._link_predecessor_to_successor(source_node, pass_node)
         return [pass_node]
 
     def visit_Return(self, ast_node: ast.Return, source_node: CFGNode) -> List[CFGNode]:
-        return_text = ast.unparse(ast_node).strip()
-        return_node = self.new_node(statements=[return_text], node_type="return_statement")
+        return_text = SourceText("{}", ast_node)
+        return_node = self.new_node(statements=[return_text], node_type=NodeKind.RETURN_STATEMENT)
         self._link_predecessor_to_successor(source_node, return_node)
         return [return_node]
 
     def visit_If(self, ast_node: ast.If, source_node: CFGNode) -> List[CFGNode]:
-        condition_text = ast.unparse(ast_node.test).strip()
-        if_condition_node = self.new_node(statements=[f"if {condition_text}"], node_type="condition")
+        return self._run_steps(self._if_steps(ast_node, source_node))
+
+    def _if_steps(self, ast_node: ast.If, source_node: CFGNode):
+        if_condition_node = self.new_node(statements=[SourceText("if {}", ast_node.test)], node_type=NodeKind.CONDITION)
         self._link_predecessor_to_successor(source_node, if_condition_node)
 
-        from .ast_utils import negate_condition_ast
-        if_condition_node.true_condition_label = condition_text
+        if_condition_node.condition_ast = ast_node.test
+        if_condition_node.true_condition_label = SourceText("{}", ast_node.test)
         negated_test_ast = negate_condition_ast(ast_node.test)
-        if_condition_node.false_condition_label = ast.unparse(negated_test_ast).strip() if negated_test_ast else f"not ({condition_text})"
+        if_condition_node.false_condition_label = SourceText("{}", negated_test_ast) if negated_test_ast else SourceText("not ({})", ast_node.test)
 
-        true_branch_entry_placeholder = self.new_node(node_type="statement_block")
+        true_branch_entry_placeholder = self.new_node()
         self._link_predecessor_to_successor(if_condition_node, true_branch_entry_placeholder, link_type="branch")
-        true_branch_loose_ends = self._process_statement_list_in_block(ast_node.body, [true_branch_entry_placeholder])
+        true_branch_loose_ends = yield self._block_steps(ast_node.body, [true_branch_entry_placeholder])
 
         false_branch_loose_ends = []
         if ast_node.orelse:
-            false_branch_entry_placeholder = self.new_node(node_type="statement_block")
+            false_branch_entry_placeholder = self.new_node()
             self._link_predecessor_to_successor(if_condition_node, false_branch_entry_placeholder, link_type="else")
-            false_branch_loose_ends = self._process_statement_list_in_block(ast_node.orelse, [false_branch_entry_placeholder])
+            false_branch_loose_ends = yield self._block_steps(ast_node.orelse, [false_branch_entry_placeholder])
         else:
             false_branch_loose_ends.append(if_condition_node)
 
-        all_loose_ends = true_branch_loose_ends + false_branch_loose_ends
-        return list(dict.fromkeys(all_loose_ends)) if all_loose_ends else []
+        # Each branch only returns nodes created inside it, so the two lists are disjoint.
+        return true_branch_loose_ends + false_branch_loose_ends
 
     def _visit_loop_generic(self, ast_node: Union[ast.For, ast.While], source_node: CFGNode, loop_type: str) -> List[CFGNode]:
+        return self._run_steps(self._loop_steps(ast_node, source_node, loop_type))
+
+    def _loop_steps(self, ast_node: Union[ast.For, ast.While], source_node: CFGNode, loop_type: str):
         if isinstance(ast_node, ast.For):
-            target_text = ast.unparse(ast_node.target).strip()
-            iter_text = ast.unparse(ast_node.iter).strip()
-            condition_text = f"for {target_text} in {iter_text}"
+            condition_text = SourceText("for {} in {}", ast_node.target, ast_node.iter)
         else:
-            condition_text = f"while {ast.unparse(ast_node.test).strip()}"
+            condition_text = SourceText("while {}", ast_node.test)
 
-        loop_condition_node = self.new_node(statements=[condition_text], node_type="condition")
+        loop_condition_node = self.new_node(statements=[condition_text], node_type=NodeKind.CONDITION)
+        if isinstance(ast_node, ast.While):
+            loop_condition_node.condition_ast = ast_node.test
         self._link_predecessor_to_successor(source_node, loop_condition_node)
 
-        loop_body_entry_placeholder = self.new_node(node_type="statement_block")
+        loop_body_entry_placeholder = self.new_node()
         self._link_predecessor_to_successor(loop_condition_node, loop_body_entry_placeholder, link_type="branch")
 
-        loop_exit_node_for_breaks = self.new_node(statements=[f"exit_point_after_{loop_type}_{loop_condition_node.id}"], node_type="statement_block")
+        loop_exit_node_for_breaks = self.new_node(statements=[f"exit_point_after_{loop_type}_{loop_condition_node.id}"])
         self._loop_exit_stack.append(loop_exit_node_for_breaks)
         self._loop_start_stack.append(loop_condition_node)
 
-        body_loose_ends = self._process_statement_list_in_block(ast_node.body, [loop_body_entry_placeholder])
+        body_loose_ends = yield self._block_steps(ast_node.body, [loop_body_entry_placeholder])
 
         for end_node in body_loose_ends:
-            if end_node.node_type not in ("break_statement", "continue_statement", "return_statement"):
+            if end_node.kind not in _JUMP_KINDS:
                 self._link_predecessor_to_successor(end_node, loop_condition_node)
 
         self._loop_exit_stack.pop()
@@ -287,7 +507,7 @@ class CFGBuilder(ast.NodeVisitor):
         self._link_predecessor_to_successor(loop_condition_node, loop_exit_node_for_breaks, link_type="else")
 
         if ast_node.orelse:
-            orelse_loose_ends = self._process_statement_list_in_block(ast_node.orelse, [loop_exit_node_for_breaks])
+            orelse_loose_ends = yield self._block_steps(ast_node.orelse, [loop_exit_node_for_breaks])
             return orelse_loose_ends
         else:
             return [loop_exit_node_for_breaks]
@@ -300,6 +520,7 @@ class CFGBuilder(ast.NodeVisitor):
 
     def visit_Break(self, ast_node: ast.Break, source_node: CFGNode) -> List[CFGNode]:
         break_node = self.new_node(statements=["break"], node_type="break_statement")
+        break_node.span = _keyword_span(ast_node)
         self._link_predecessor_to_successor(source_node, break_node)
         if self._loop_exit_stack:
             self._link_predecessor_to_successor(break_node, self._loop_exit_stack[-1])
@@ -309,6 +530,7 @@ class CFGBuilder(ast.NodeVisitor):
 
     def visit_Continue(self, ast_node: ast.Continue, source_node: CFGNode) -> List[CFGNode]:
         continue_node = self.new_node(statements=["continue"], node_type="continue_statement")
+        continue_node.span = _keyword_span(ast_node)
         self._link_predecessor_to_successor(source_node, continue_node)
         if self._loop_start_stack:
             self._link_predecessor_to_successor(continue_node, self._loop_start_stack[-1])
@@ -317,81 +539,89 @@ class CFGBuilder(ast.NodeVisitor):
         return [continue_node]
 
     def visit_Try(self, ast_node: ast.Try, source_node: CFGNode) -> List[CFGNode]:
+        return self._run_steps(self._try_steps(ast_node, source_node))
+
+    def _try_steps(self, ast_node: ast.Try, source_node: CFGNode):
         try_entry_node = self.new_node(statements=["try"], node_type="try_block_start")
+        try_entry_node.span = _keyword_span(ast_node, "try")
         self._link_predecessor_to_successor(source_node, try_entry_node)
 
-        body_loose_ends = self._process_statement_list_in_block(ast_node.body, [try_entry_node])
+        body_loose_ends = yield self._block_steps(ast_node.body, [try_entry_node])
+        dispatch_node = self._new_exception_region(try_entry_node) if self.factored_exceptions else None
         post_try_merge_node = self.new_node(statements=[], node_type="statement_block")
+        # Only this method sees post_try_merge_node, so these are the only nodes that can link to it.
+        merge_predecessors: List[CFGNode] = []
 
         finally_entry_node = None
         if ast_node.finalbody:
             finally_entry_node = self.new_node(statements=["finally"], node_type="finally_block_start")
             for end_node in body_loose_ends:
-                if end_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                if end_node.kind not in _JUMP_KINDS:
                      self._link_predecessor_to_successor(end_node, finally_entry_node)
 
-            current_finally_loose_ends = self._process_statement_list_in_block(ast_node.finalbody, [finally_entry_node])
+            if dispatch_node is not None:
+                dispatch_node.add_case_branch("finally", finally_entry_node)
+            current_finally_loose_ends = yield self._block_steps(ast_node.finalbody, [finally_entry_node])
             for fend_node in current_finally_loose_ends:
                  self._link_predecessor_to_successor(fend_node, post_try_merge_node)
+                 merge_predecessors.append(fend_node)
             body_loose_ends = current_finally_loose_ends
         else:
             for end_node in body_loose_ends:
-                if end_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                if end_node.kind not in _JUMP_KINDS:
                     self._link_predecessor_to_successor(end_node, post_try_merge_node)
+                    merge_predecessors.append(end_node)
 
         handler_overall_loose_ends = []
         for handler in ast_node.handlers:
             handler_text = "except"
             if handler.type:
-                handler_text += f" {ast.unparse(handler.type).strip()}"
-            if handler.name:
+                handler_text = SourceText("except {}" + (f" as {handler.name}" if handler.name else ""), handler.type)
+            elif handler.name:
                 handler_text += f" as {handler.name}"
 
             handler_entry = self.new_node(statements=[handler_text], node_type="exception_handler_start")
-            self._link_predecessor_to_successor(try_entry_node, handler_entry, link_type="else")
+            if handler_entry.span is None:
+                handler_entry.span = _keyword_span(handler, "except")
+            if dispatch_node is not None:
+                dispatch_node.add_case_branch(handler_entry.statements[0], handler_entry)
+            else:
+                self._link_predecessor_to_successor(try_entry_node, handler_entry, link_type="else")
 
-            current_handler_loose_ends = self._process_statement_list_in_block(handler.body, [handler_entry])
+            current_handler_loose_ends = yield self._block_steps(handler.body, [handler_entry])
 
             if ast_node.finalbody and finally_entry_node:
                 for hend_node in current_handler_loose_ends:
-                    if hend_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                    if hend_node.kind not in _JUMP_KINDS:
                         self._link_predecessor_to_successor(hend_node, finally_entry_node)
             else:
                 for hend_node in current_handler_loose_ends:
-                     if hend_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                     if hend_node.kind not in _JUMP_KINDS:
                         self._link_predecessor_to_successor(hend_node, post_try_merge_node)
+                        merge_predecessors.append(hend_node)
             handler_overall_loose_ends.extend(current_handler_loose_ends)
 
         if ast_node.orelse:
             orelse_entry_node = self.new_node(statements=["orelse"], node_type="else_block_start")
             self._link_predecessor_to_successor(try_entry_node, orelse_entry_node, link_type="else")
 
-            current_orelse_loose_ends = self._process_statement_list_in_block(ast_node.orelse, [orelse_entry_node])
+            current_orelse_loose_ends = yield self._block_steps(ast_node.orelse, [orelse_entry_node])
 
             if ast_node.finalbody and finally_entry_node:
                 for oend_node in current_orelse_loose_ends:
-                     if oend_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                     if oend_node.kind not in _JUMP_KINDS:
                         self._link_predecessor_to_successor(oend_node, finally_entry_node)
             else:
                 for oend_node in current_orelse_loose_ends:
-                    if oend_node.node_type not in ("return_statement", "break_statement", "continue_statement"):
+                    if oend_node.kind not in _JUMP_KINDS:
                         self._link_predecessor_to_successor(oend_node, post_try_merge_node)
+                        merge_predecessors.append(oend_node)
             handler_overall_loose_ends.extend(current_orelse_loose_ends)
 
-        final_loose_ends = [n for n in body_loose_ends + handler_overall_loose_ends if n.node_type in ("return_statement", "break_statement", "continue_statement")]
+        final_loose_ends = [n for n in body_loose_ends + handler_overall_loose_ends if n.kind in _JUMP_KINDS]
 
-        is_post_try_merge_used = False
-        for node in self.nodes.values():
-            if node.next_node == post_try_merge_node or \
-               node.branch_node == post_try_merge_node or \
-               node.else_node == post_try_merge_node:
-                is_post_try_merge_used = True
-                break
-            if hasattr(node, 'case_branches'):
-                for _, target_n in node.case_branches:
-                    if target_n == post_try_merge_node:
-                        is_post_try_merge_used = True; break
-                if is_post_try_merge_used: break
+        is_post_try_merge_used = any(post_try_merge_node in (node.next_node, node.branch_node, node.else_node)
+                                     for node in merge_predecessors)
 
         if is_post_try_merge_used and post_try_merge_node not in final_loose_ends:
             final_loose_ends.append(post_try_merge_node)
@@ -399,19 +629,32 @@ class CFGBuilder(ast.NodeVisitor):
              pass
         return list(dict.fromkeys(final_loose_ends))
 
+    def _new_exception_region(self, try_entry_node: CFGNode) -> CFGNode:
+        """
+        Records the try body just built (every node created after the try node)
+        as an ExceptionRegion and returns its dispatch node, which the try node
+        reaches through branch_node and which gets one case per handler.
+        """
+        from .exception_edges import ExceptionRegion
+        members = [self.nodes[i] for i in range(try_entry_node.id + 1, self.current_id + 1) if i in self.nodes]
+        dispatch_node = self.new_node(statements=["exception dispatch"], node_type="exception_dispatch")
+        self._link_predecessor_to_successor(try_entry_node, dispatch_node, link_type="branch")
+        try_entry_node.true_condition_label = "exception"
+        self.exception_regions.append(ExceptionRegion(try_entry_node, dispatch_node, members))
+        return dispatch_node
+
     def visit_Raise(self, ast_node: ast.Raise, source_node: CFGNode) -> List[CFGNode]:
-        raise_text = ast.unparse(ast_node).strip()
+        raise_text = SourceText("{}", ast_node)
         raise_node = self.new_node(statements=[raise_text], node_type="raise_statement")
         self._link_predecessor_to_successor(source_node, raise_node)
         return [raise_node]
 
     def visit_Match(self, ast_node: ast.Match, source_node: CFGNode) -> Union[List[CFGNode], None]:
-        match_subject_text = ast.unparse(ast_node.subject).strip()
-        match_dispatcher_node = self.new_node(statements=[f"match {match_subject_text}"], node_type="match_dispatcher")
-        self._link_predecessor_to_successor(source_node, match_dispatcher_node)
+        return self._run_steps(self._match_steps(ast_node, source_node))
 
-        if not hasattr(match_dispatcher_node, 'case_branches'):
-            match_dispatcher_node.case_branches = []
+    def _match_steps(self, ast_node: ast.Match, source_node: CFGNode):
+        match_dispatcher_node = self.new_node(statements=[SourceText("match {}", ast_node.subject)], node_type="match_dispatcher")
+        self._link_predecessor_to_successor(source_node, match_dispatcher_node)
 
         collected_loose_ends_from_all_cases: List[CFGNode] = []
         wildcard_case_exists = False
@@ -436,20 +679,22 @@ class CFGBuilder(ast.NodeVisitor):
                 node_stmts = ["pass"] if (case_block.body and isinstance(case_block.body[0], ast.Pass)) else []
                 node_type = "pass_statement" if node_stmts else "statement_block"
                 case_body_target_node = self.new_node(statements=node_stmts, node_type=node_type)
-                match_dispatcher_node.case_branches.append((case_label_text, case_body_target_node))
+                if node_stmts:
+                    case_body_target_node.span = _keyword_span(case_block.body[0])
+                match_dispatcher_node.add_case_branch(case_label_text, case_body_target_node)
                 collected_loose_ends_from_all_cases.append(case_body_target_node)
             else:
                 first_stmt_ast = case_block.body[0]
                 remaining_stmts_ast = case_block.body[1:]
 
-                first_stmt_text = ast.unparse(first_stmt_ast).strip()
+                first_stmt_text = SourceText("{}", first_stmt_ast)
                 first_stmt_node_type = self._determine_node_type_from_ast(first_stmt_ast)
                 actual_first_stmt_node = self.new_node(statements=[first_stmt_text], node_type=first_stmt_node_type)
 
-                match_dispatcher_node.case_branches.append((case_label_text, actual_first_stmt_node))
+                match_dispatcher_node.add_case_branch(case_label_text, actual_first_stmt_node)
 
                 if remaining_stmts_ast:
-                    case_body_loose_ends = self._process_statement_list_in_block(remaining_stmts_ast, [actual_first_stmt_node])
+                    case_body_loose_ends = yield self._block_steps(remaining_stmts_ast, [actual_first_stmt_node])
                     collected_loose_ends_from_all_cases.extend(case_body_loose_ends)
                 else:
                     if actual_first_stmt_node.node_type not in ("return_statement", "break_statement", "continue_statement", "raise_statement"):
@@ -467,6 +712,8 @@ class CFGBuilder(ast.NodeVisitor):
     def _renumber_nodes(self):
         if not self.nodes:
             return
+        if len(self.nodes) == self.current_id:
+            return  # Nothing was removed: the ids are already 1..current_id in order.
 
         # 1. Collect all current node objects
         all_existing_nodes = list(self.nodes.values())
@@ -476,7 +723,7 @@ class CFGBuilder(ast.NodeVisitor):
         # It's important if the entry node (id=1) was optimized out and
         # then re-added, or for any other case where original IDs matter for order.
         # However, given typical CFG construction, simple sorting by original ID is robust.
-        all_existing_nodes.sort(key=lambda node: node.id)
+        all_existing_nodes.sort(key=_node_id)
 
         # 3. Create a new empty dictionary for the re-numbered nodes
         new_nodes_map = {}
@@ -507,77 +754,186 @@ class CFGBuilder(ast.NodeVisitor):
              self.current_id = current_new_id - 1
 
     def _optimize_empty_blocks(self):
+        """
+        Removes empty statement blocks that only fall through to `next_node`,
+        pointing their predecessors at what follows them.
+
+        Equivalent to repeating "mark every removable block, redirect edges one
+        step, delete the marked blocks" until nothing changes, but each round
+        only looks at the blocks still left and at the edges into the blocks it
+        removes: successor chains are resolved with a union-find over the blocks
+        marked so far (with path compression), and edges are redirected through
+        a predecessor index built once. A round ends with blocks left over only
+        when empty blocks form a cycle, so there is usually a single round.
+        """
         if not self.entry_node:
             return
+        entry, exit_node = self.entry_node, self.exit_node
+        # Removability does not change while edges are redirected: a redirected
+        # edge always gets a new target, never None.
+        candidates = [
+            node for node in self.nodes.values()
+            if node.kind is NodeKind.STATEMENT_BLOCK and not node._statements
+            and node is not entry and node is not exit_node
+            and node.next_node is not None and node.branch_node is None
+            and node.else_node is None and not node._case_branches
+        ]
+        if not candidates:
+            return
+        candidate_ids = {node.id for node in candidates}
+        candidate_nodes = set(candidates)
 
-        while True:
-            made_change_this_pass = False
-            nodes_to_remove_map: Dict[int, CFGNode] = {}
-
-            for node_id, current_node in list(self.nodes.items()):
-                if node_id in nodes_to_remove_map:
-                    continue
-
-                is_optimizable = (
-                    current_node.node_type == "statement_block" and
-                    not current_node.statements and
-                    current_node.id != self.entry_node.id and
-                    (self.exit_node is None or current_node.id != self.exit_node.id) and
-                    current_node.next_node is not None and
-                    current_node.branch_node is None and
-                    current_node.else_node is None and
-                    not current_node.case_branches
-                )
-
-                if is_optimizable:
-                    ultimate_successor = current_node.next_node
-                    path_traversed = {current_node.id, ultimate_successor.id if ultimate_successor else -1}
-
-                    temp_next_in_chain = ultimate_successor
-                    while temp_next_in_chain and temp_next_in_chain.id in nodes_to_remove_map:
-                        temp_next_in_chain = nodes_to_remove_map[temp_next_in_chain.id]
-                        if temp_next_in_chain is None or temp_next_in_chain.id in path_traversed :
-                            ultimate_successor = None
-                            break
-                        ultimate_successor = temp_next_in_chain
-                        if ultimate_successor:
-                             path_traversed.add(ultimate_successor.id)
-
-                    if ultimate_successor:
-                        nodes_to_remove_map[current_node.id] = ultimate_successor
-                        made_change_this_pass = True
-
-            if not made_change_this_pass:
+        # target id -> [(predecessor, slot)], slot being an attribute name or a case index.
+        predecessors: Dict[int, List[Tuple[CFGNode, Union[str, int]]]] = {}
+        for node in self.nodes.values():
+            if node.next_node in candidate_nodes:
+                predecessors.setdefault(node.next_node.id, []).append((node, "next_node"))
+            if node.branch_node in candidate_nodes:
+                predecessors.setdefault(node.branch_node.id, []).append((node, "branch_node"))
+            if node.else_node in candidate_nodes:
+                predecessors.setdefault(node.else_node.id, []).append((node, "else_node"))
+            if node._case_branches:
+                for index, (_, target) in enumerate(node._case_branches):
+                    if target in candidate_nodes:
+                        predecessors.setdefault(target.id, []).append((node, index))
+
+        while candidates:
+            # Marked block id -> replacement. `parent` is the union-find over the
+            # marked blocks; a block marked with itself as replacement is its own root.
+            replacements: Dict[int, CFGNode] = {}
+            parent: Dict[int, CFGNode] = {}
+            remaining = []
+
+            def find(node: CFGNode) -> CFGNode:
+                root = node
+                while root.id in parent and parent[root.id] is not root:
+                    root = parent[root.id]
+                while node is not root:
+                    node, parent[node.id] = parent[node.id], root
+                return root
+
+            for node in candidates:
+                successor = node.next_node
+                if successor.id in replacements:
+                    successor = find(successor)
+                    if successor is node or successor.id in replacements:
+                        # The chain leads back into itself: keep this block for now.
+                        remaining.append(node)
+                        continue
+                replacements[node.id] = parent[node.id] = successor
+
+            if not replacements:
                 break
 
-            for p_node in self.nodes.values():
-                if p_node.id in nodes_to_remove_map:
-                    continue
-
-                if p_node.next_node and p_node.next_node.id in nodes_to_remove_map:
-                    p_node.next_node = nodes_to_remove_map[p_node.next_node.id]
-
-                if p_node.branch_node and p_node.branch_node.id in nodes_to_remove_map:
-                    p_node.branch_node = nodes_to_remove_map[p_node.branch_node.id]
-
-                if p_node.else_node and p_node.else_node.id in nodes_to_remove_map:
-                    p_node.else_node = nodes_to_remove_map[p_node.else_node.id]
-
-                if hasattr(p_node, 'case_branches') and p_node.case_branches:
-                    updated_case_branches = []
-                    branch_changed_in_p_node = False
-                    for label, target_node in p_node.case_branches:
-                        if target_node and target_node.id in nodes_to_remove_map:
-                            updated_case_branches.append((label, nodes_to_remove_map[target_node.id]))
-                            branch_changed_in_p_node = True
-                        else:
-                            updated_case_branches.append((label, target_node))
-                    if branch_changed_in_p_node:
-                        p_node.case_branches = updated_case_branches
-
-            for node_id_to_remove in nodes_to_remove_map.keys():
-                if node_id_to_remove in self.nodes:
-                    del self.nodes[node_id_to_remove]
+            for removed_id, replacement in replacements.items():
+                for p_node, slot in predecessors.pop(removed_id, ()):
+                    if p_node.id in replacements or self.nodes.get(p_node.id) is not p_node:
+                        continue
+                    if isinstance(slot, int):
+                        label, target = p_node.case_branches[slot]
+                        if target is None or target.id != removed_id:
+                            continue
+                        p_node.case_branches[slot] = (label, replacement)
+                    else:
+                        target = getattr(p_node, slot)
+                        if target is None or target.id != removed_id:
+                            continue
+                        setattr(p_node, slot, replacement)
+                    # Edges moved onto a block removed in this same round are left
+                    # dangling, as a one-step redirect always did.
+                    if replacement.id in candidate_ids and replacement.id not in replacements:
+                        predecessors.setdefault(replacement.id, []).append((p_node, slot))
+
+            for removed_id in replacements:
+                del self.nodes[removed_id]
+            candidates = remaining
+
+    def _coalesce_basic_blocks(self):
+        """
+        Replaces self.nodes with basic blocks: maximal runs of nodes where each
+        node only falls through (`next_node`) to the following one and that
+        following node has no other predecessor. Entry and exit stay blocks of
+        their own. A block node holds its members' statements in order, the
+        first member's span and the node type, condition and outgoing edges of
+        its last member, so the branch structure is unchanged.
+
+        The per-statement nodes are left untouched in self.statement_nodes, and
+        self.block_members maps each block id to them. Like cfg_to_dict, only
+        edges between nodes in self.nodes are carried over.
+        """
+        statement_nodes = self.nodes
+        entry, exit_node = self.entry_node, self.exit_node
+        predecessor_count: Dict[int, int] = dict.fromkeys(statement_nodes, 0)
+        for node in statement_nodes.values():
+            for successor in self.get_successors(node):
+                if successor.id in predecessor_count and statement_nodes[successor.id] is successor:
+                    predecessor_count[successor.id] += 1
+
+        def falls_into(node: CFGNode) -> Optional[CFGNode]:
+            """The next member of node's block, if any."""
+            successor = node.next_node
+            if (successor is None or node is entry or successor is node or successor is entry
+                    or successor is exit_node or node.branch_node is not None or node.else_node is not None
+                    or node.case_branches or predecessor_count.get(successor.id) != 1
+                    or statement_nodes[successor.id] is not successor):
+                return None
+            return successor
+
+        continued = {successor.id for successor in map(falls_into, statement_nodes.values()) if successor}
+        runs: List[List[CFGNode]] = []
+        block_of: Dict[int, int] = {}
+        # Block heads in id order; nodes left over afterwards form straight-line cycles.
+        heads = [node for node in statement_nodes.values() if node.id not in continued]
+        heads.extend(node for node in statement_nodes.values() if node.id in continued)
+        for head in heads:
+            if head.id in block_of:
+                continue
+            run = []
+            node = head
+            while node is not None and node.id not in block_of:
+                block_of[node.id] = len(runs) + 1
+                run.append(node)
+                node = falls_into(node)
+            runs.append(run)
+
+        blocks: Dict[int, CFGNode] = {}
+        for block_id, run in enumerate(runs, 1):
+            first, last = run[0], run[-1]
+            statements = [text for member in run for text in (member._statements or ())]
+            block = CFGNode(block_id, statements=statements, node_type=last.node_type)
+            block.span = first.span
+            block.condition_ast = last.condition_ast
+            block.mcdc_requirements = last.mcdc_requirements
+            block.true_condition_label = last._true_condition_label
+            block.false_condition_label = last._false_condition_label
+            blocks[block_id] = block
+
+        def block_for(target: Optional[CFGNode]) -> Optional[CFGNode]:
+            if target is None or statement_nodes.get(target.id) is not target:
+                return None
+            return blocks[block_of[target.id]]
+
+        for block_id, run in enumerate(runs, 1):
+            block, last = blocks[block_id], run[-1]
+            block.next_node = block_for(last.next_node)
+            block.branch_node = block_for(last.branch_node)
+            block.else_node = block_for(last.else_node)
+            for label, target in last.case_branches:
+                block.add_case_branch(label, block_for(target))
+
+        self.statement_nodes = statement_nodes
+        self.block_members = {block_id: run for block_id, run in enumerate(runs, 1)}
+        self._statement_blocks = block_of
+        self.nodes = blocks
+        self.current_id = len(blocks)
+        self.entry_node = block_for(entry)
+        self.exit_node = block_for(exit_node)
+
+    def block_of(self, statement_node: CFGNode) -> Optional[CFGNode]:
+        """The basic block holding a node of self.statement_nodes (basic-block builds only)."""
+        if self.block_members is None or self.statement_nodes.get(statement_node.id) is not statement_node:
+            return None
+        return self.nodes.get(self._statement_blocks[statement_node.id])
 
     def find_prime_paths(self) -> List[List[CFGNode]]:
         """
@@ -754,7 +1110,7 @@ class CFGBuilder(ast.NodeVisitor):
                     label_text = current_node.false_condition_label
                 edge_definitions.append(f"    {node_id_str} -> {current_node.else_node.id} [label=\"{self._escape_label(label_text)}\"];")
 
-            if current_node.node_type == "match_dispatcher" and hasattr(current_node, 'case_branches') and current_node.case_branches:
+            if current_node.case_branches:
                 for i, (case_label, target_node) in enumerate(current_node.case_branches):
                     if target_node:
                         escaped_case_label = case_label.replace('\\', '\\\\').replace('"', '\\"')
@@ -774,3 +1130,55 @@ class CFGBuilder(ast.NodeVisitor):
         dot_lines.extend(sorted(list(set(edge_definitions))))
         dot_lines.append("}")
         return "\n".join(dot_lines)
+
+
+# Compound statement type -> (visitor it implements, steps generator, extra arguments); see _run_steps.
+_STEP_METHODS = {
+    ast.If: ("visit_If", "_if_steps", ()),
+    ast.For: ("visit_For", "_loop_steps", ("for",)),
+    ast.While: ("visit_While", "_loop_steps", ("while",)),
+    ast.Try: ("visit_Try", "_try_steps", ()),
+    ast.Match: ("visit_Match", "_match_steps", ()),
+}
+
+# Statement types whose node type does not depend on their contents (ast.Expr does).
+_STATEMENT_NODE_TYPES = {
+    ast.Assign: "assignment", ast.AugAssign: "assignment", ast.AnnAssign: "assignment",
+    ast.Pass: "pass_statement", ast.Return: "return_statement",
+    ast.Break: "break_statement", ast.Continue: "continue_statement",
+    ast.If: "condition", ast.For: "condition", ast.While: "condition",
+    ast.FunctionDef: "function_definition", ast.Match: "match_dispatcher",
+}
+# Statements built as one node of a fixed kind holding their text (ast.Expr is a
+# function_call or an expression_statement); see CFGBuilder._statement_handler.
+_SINGLE_NODE_KINDS = {
+    ast.Assign: NodeKind.ASSIGNMENT, ast.AugAssign: NodeKind.ASSIGNMENT, ast.AnnAssign: NodeKind.ASSIGNMENT,
+    ast.Return: NodeKind.RETURN_STATEMENT, ast.Raise: NodeKind.RAISE_STATEMENT,
+    ast.Expr: NodeKind.EXPRESSION_STATEMENT,
+}
+# Methods whose behaviour _block_steps inlines for single-node statements.
+_INLINED_METHODS = ("new_node", "_link_predecessor_to_successor", "_determine_node_type_from_ast")
+# Kinds of loose ends that jump elsewhere instead of falling through to what follows a block.
+_JUMP_KINDS = frozenset((NodeKind.RETURN_STATEMENT, NodeKind.BREAK_STATEMENT, NodeKind.CONTINUE_STATEMENT))
+
+_node_id = attrgetter("id")
+
+# Builder class -> statement type -> handler; see CFGBuilder._statement_handler.
+_HANDLER_TABLES: Dict[type, Dict[type, Tuple]] = {}
+# (builder class, statement type) -> visitor function; see CFGBuilder.visit.
+_VISITORS: Dict[Tuple[type, type], Callable] = {}
+
+
+def _keyword_span(ast_node: ast.AST, keyword: Optional[str] = None) -> Optional[Tuple[int, int, int, int]]:
+    """Span of a statement without an expression to render, or of just its leading keyword."""
+    lineno = getattr(ast_node, "lineno", None)
+    if lineno is None:
+        return None
+    if keyword is not None:
+        return (lineno, ast_node.col_offset, lineno, ast_node.col_offset + len(keyword))
+    return (lineno, ast_node.col_offset, ast_node.end_lineno, ast_node.end_col_offset)
+
+
+def _visitor_function(cls: type, stmt_type: type) -> Callable:
+    """The `visit_<Type>` function of `cls` for a statement type, or its generic_visit_statement_node."""
+    return getattr(cls, "visit_" + stmt_type.__name__, None) or cls.generic_visit_statement_node
@@ -0,0 +1,250 @@
+"""
+cfg_cache.py - Content-addressed on-disk cache for built CFGs and analyses.
+
+Entries are keyed by a SHA-256 of the source text, the builder options, the
+tool version (CFG.__version__) and the serialization format, so an edited
+file, a different option, a new release or a format change never sees a
+stale entry. Each entry is one JSON file holding
+the serialized CFG (see cfg_serialization) and any derived analyses that were
+stored with it, such as prime paths and metrics.
+
+The cache is safe to share between worker processes:
+  * entries are written to a temporary file and moved into place with
+    os.replace, so readers see either the old entry or the complete new one;
+  * a hit refreshes the entry's mtime, which is the LRU clock;
+  * when the total size exceeds `max_bytes`, the oldest entries are removed
+    under an exclusive lock file (fcntl, where available) until the cache is
+    back under 90% of the limit. Entries deleted by another process are
+    treated as misses.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction still works, just without the cross-process lock
+    fcntl = None
+
+import CFG
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import CFGNode
+from CFG.cfg_serialization import FORMAT_VERSION, cfg_from_dict, cfg_to_dict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_LOW_WATERMARK = 0.9
+
+
+def cache_key(source: str, options: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps({
+        "source": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+        "options": options or {},
+        "version": CFG.__version__,
+        "format": FORMAT_VERSION,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedCFG:
+    """
+    One cache entry. The CFG is deserialized only when `builder` is accessed,
+    so reading stored analyses never pays for rebuilding the graph.
+    """
+    def __init__(self, cache: "CFGCache", key: str, data: Dict[str, Any],
+                 builder: Optional[CFGBuilder] = None, hit: bool = False):
+        self.cache = cache
+        self.key = key
+        self.hit = hit
+        self._data = data
+        self._builder = builder
+
+    @property
+    def builder(self) -> Optional[CFGBuilder]:
+        if self._builder is None and self._data.get("cfg") is not None:
+            self._builder = cfg_from_dict(self._data["cfg"])
+        return self._builder
+
+    def has_analysis(self, name: str) -> bool:
+        return name in self._data["analyses"]
+
+    def analysis(self, name: str, compute: Callable[[Optional[CFGBuilder]], Any]) -> Any:
+        """Stored result of `name`, or `compute(builder)` stored for next time (must be JSON-compatible)."""
+        analyses = self._data["analyses"]
+        if name not in analyses:
+            analyses[name] = compute(self.builder)
+            self.cache._write(self.key, self._data)
+        return analyses[name]
+
+    def prime_paths(self) -> List[List[CFGNode]]:
+        id_paths = self.analysis("prime_paths", lambda b: [[n.id for n in p] for p in b.find_prime_paths()])
+        nodes = self.builder.nodes
+        return [[nodes[node_id] for node_id in path] for path in id_paths]
+
+    def metrics(self) -> Dict[str, int]:
+        return self.analysis("metrics", lambda b: b.get_analysis_manager().get("metrics"))
+
+
+class CFGCache:
+    """Size-bounded LRU cache of CFGs in `directory`, shared safely between processes."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._approx_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError):
+            # Corrupt or concurrently evicted entry: drop it and rebuild.
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return data
+
+    def _write(self, key: str, data: Dict[str, Any]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            size = os.path.getsize(temp_path)
+            try:
+                size -= os.path.getsize(path)  # Overwriting an entry only adds the difference.
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._total_size()
+            else:
+                self._approx_bytes += size
+            over_limit = self._approx_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        try:
+            shards = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            try:
+                entries.extend(e for e in os.scandir(shard.path) if e.name.endswith(".json"))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _total_size(self) -> int:
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self):
+        lock_path = os.path.join(self.directory, ".lock")
+        with open(lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                stats = []
+                for entry in self._entries():
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    stats.append((st.st_mtime, st.st_size, entry.path))
+                stats.sort()
+                total = sum(size for _, size, _ in stats)
+                # The running total is approximate (other processes write too):
+                # only evict when the directory really is over the limit.
+                target = int(self.max_bytes * _LOW_WATERMARK) if total > self.max_bytes else total
+                for _, size, path in stats:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                with self._lock:
+                    self._approx_bytes = total
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, source: str, options: Optional[Dict[str, Any]] = None) -> Optional[CachedCFG]:
+        """Cached entry for this source and options, or None."""
+        key = cache_key(source, options)
+        data = self._read(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            return None
+        return CachedCFG(self, key, data, hit=True)
+
+    def get_or_build(self, source: str, options: Optional[Dict[str, Any]],
+                     build: Optional[Callable[[], Optional[CFGBuilder]]]) -> Optional[CachedCFG]:
+        """
+        Returns the cached entry, or calls `build()` and stores its CFG. `build`
+        may be None for entries that only hold analyses. Returns None if the
+        build fails.
+        """
+        cached = self.get(source, options)
+        if cached is not None:
+            return cached
+        builder = build() if build is not None else None
+        if build is not None and builder is None:
+            return None
+        key = cache_key(source, options)
+        data = {"cfg": cfg_to_dict(builder) if builder is not None else None, "analyses": {}}
+        self._write(key, data)
+        return CachedCFG(self, key, data, builder=builder)
+
+    def build_cfg(self, code_string: str, graph_name: str = "cfg") -> Optional[CachedCFG]:
+        """Cached equivalent of CFGBuilder().build_cfg(code_string, graph_name)."""
+        def build():
+            builder = CFGBuilder()
+            return builder if builder.build_cfg(code_string, graph_name=graph_name) else None
+        return self.get_or_build(code_string, {"graph_name": graph_name}, build)
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._approx_bytes = 0
@@ -0,0 +1,262 @@
+"""
+cfg_forest.py - Lazily built per-function CFGs for a whole module.
+
+CFGBuilder.build only walks the statements it is given, so a nested `def` or
+`class` shows up as a single node of its enclosing CFG. A CFGForest indexes
+every scope of a module by qualified name, following the same conventions
+as Python's `__qualname__`:
+
+    <module>                    module-level statements
+    helper                      top-level function
+    Outer.method                method
+    Outer.Inner.method          method of a nested class
+    helper.<locals>.inner       function nested in a function
+    helper.<locals>.<lambda>    lambda
+
+Repeated names (redefinitions, several lambdas in one scope) get a `#2`,
+`#3`, ... suffix in source order. Indexing only walks the AST; a scope's CFG
+is built the first time it is requested.
+
+update() re-indexes the forest from an edited version of the module. Each
+scope is compared with its previous version by a structural hash of its AST
+(positions excluded); unchanged scopes keep their builder and CFGNode
+objects, re-anchored to the new AST and its positions (a scope that moved
+or was reformatted keeps a correct source_index), and only changed or new
+scopes are rebuilt, again on demand.
+"""
+
+import ast
+import hashlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import SourceText
+
+MODULE_SCOPE = "<module>"
+
+
+class ScopeEntry:
+    """One indexed scope: where it is and, once requested, its CFG."""
+    def __init__(self, qualname: str, kind: str, ast_node: ast.AST):
+        self.qualname = qualname
+        self.kind = kind          # "module", "function", "async_function", "method" or "lambda"
+        self.ast_node = ast_node
+        self.lineno: Optional[int] = getattr(ast_node, "lineno", None)
+        self.end_lineno: Optional[int] = getattr(ast_node, "end_lineno", None)
+        self.builder: Optional[CFGBuilder] = None
+        self._digest: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Structural hash of the scope's AST; ignores line and column positions."""
+        if self._digest is None:
+            dumped = ast.dump(self.ast_node, include_attributes=False)
+            self._digest = hashlib.sha256(f"{self.kind}:{dumped}".encode("utf-8")).hexdigest()
+        return self._digest
+
+    def build_target(self) -> ast.AST:
+        """The AST handed to CFGBuilder.build for this scope."""
+        if isinstance(self.ast_node, ast.Lambda):
+            body = ast.Return(value=self.ast_node.body)
+            ast.copy_location(body, self.ast_node.body)
+            return ast.Module(body=[body], type_ignores=[])
+        return self.ast_node
+
+    def __repr__(self) -> str:
+        state = "built" if self.builder is not None else "not built"
+        return f"ScopeEntry({self.qualname!r}, kind={self.kind!r}, line={self.lineno}, {state})"
+
+
+def _reanchor(builder: CFGBuilder, old_root: ast.AST, new_root: ast.AST):
+    """
+    Points a kept builder at a structurally identical new AST: statement
+    parts and condition ASTs are swapped for their new counterparts, and node
+    spans are moved to the new positions.
+    """
+    counterpart: Dict[int, ast.AST] = {}
+    starts: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    ends: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    # Equal digests mean equal shapes, so both walks visit matching nodes in step.
+    for old, new in zip(ast.walk(old_root), ast.walk(new_root)):
+        counterpart[id(old)] = new
+        if getattr(old, "end_lineno", None) is not None:
+            # The outermost node starting (ending) at a position wins; walks are breadth-first.
+            starts.setdefault((old.lineno, old.col_offset), (new.lineno, new.col_offset))
+            ends.setdefault((old.end_lineno, old.end_col_offset), (new.end_lineno, new.end_col_offset))
+    line_shift = getattr(new_root, "lineno", 0) - getattr(old_root, "lineno", 0)
+
+    def moved(span):
+        lineno, col, end_lineno, end_col = span
+        start = starts.get((lineno, col), (lineno + line_shift, col))
+        end = ends.get((end_lineno, end_col))
+        if end is None:  # Keyword spans end inside their statement.
+            if end_lineno == lineno:
+                end = (start[0], start[1] + end_col - col)
+            else:
+                end = (end_lineno + start[0] - lineno, end_col)
+        return start + end
+
+    nodes = list(builder.nodes.values())
+    if builder.statement_nodes is not None:
+        nodes.extend(builder.statement_nodes.values())
+    for finding in builder.dead_code:
+        nodes.extend(finding.nodes)
+        finding.unbuilt = [counterpart.get(id(stmt), stmt) for stmt in finding.unbuilt]
+    for node in nodes:
+        for text in [*(node._statements or ()), node._true_condition_label, node._false_condition_label]:
+            if isinstance(text, SourceText):
+                text.parts = tuple(counterpart.get(id(part), part) for part in text.parts)
+        if node.condition_ast is not None:
+            node.condition_ast = counterpart.get(id(node.condition_ast), node.condition_ast)
+        if node.span is not None:
+            node.span = moved(node.span)
+    if builder._analysis_manager is not None:
+        builder._analysis_manager.invalidate("source_index")
+
+
+class ForestUpdate:
+    """What CFGForest.update changed, by qualified name."""
+    def __init__(self):
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.changed: List[str] = []
+        self.unchanged: List[str] = []
+
+    @property
+    def rebuilt(self) -> List[str]:
+        """Scopes whose CFG must be (re)built: changed and added ones."""
+        return self.changed + self.added
+
+    def __repr__(self) -> str:
+        return (f"ForestUpdate(added={self.added}, removed={self.removed}, "
+                f"changed={self.changed}, unchanged={len(self.unchanged)})")
+
+
+class CFGForest:
+    """Index of every function, method and lambda of a module, with CFGs built on demand."""
+
+    def __init__(self, module: ast.Module, builder_factory: Callable[[], CFGBuilder] = CFGBuilder):
+        self.module = module
+        self._builder_factory = builder_factory
+        self._entries: Dict[str, ScopeEntry] = {}
+        self._index()
+
+    @classmethod
+    def from_source(cls, code_string: str, builder_factory: Callable[[], CFGBuilder] = CFGBuilder) -> Optional["CFGForest"]:
+        from .ast_utils import parse_code_to_ast
+
+        tree = parse_code_to_ast(code_string)
+        if tree is None:
+            print("Error: Could not parse code string into AST for CFG forest.")
+            return None
+        return cls(tree, builder_factory=builder_factory)
+
+    def update(self, module: ast.Module) -> ForestUpdate:
+        """
+        Switches the forest to an edited version of its module. Builders of
+        scopes whose AST is structurally unchanged are kept, and they and
+        their entries now point at the new AST nodes and positions; changed
+        and new scopes are rebuilt the next time they are requested.
+        """
+        previous = self._entries
+        self.module = module
+        self._entries = {}
+        self._index()
+        result = ForestUpdate()
+        for qualname, entry in self._entries.items():
+            old = previous.get(qualname)
+            if old is None:
+                result.added.append(qualname)
+            elif old.kind == entry.kind and old.digest == entry.digest:
+                entry.builder = old.builder
+                if entry.builder is not None:
+                    _reanchor(entry.builder, old.ast_node, entry.ast_node)
+                result.unchanged.append(qualname)
+            else:
+                result.changed.append(qualname)
+        result.removed = [qualname for qualname in previous if qualname not in self._entries]
+        return result
+
+    def update_source(self, code_string: str) -> Optional[ForestUpdate]:
+        """update() from source text; returns None (and keeps the old forest) on a syntax error."""
+        from .ast_utils import parse_code_to_ast
+
+        tree = parse_code_to_ast(code_string)
+        if tree is None:
+            print("Error: Could not parse code string into AST for CFG forest.")
+            return None
+        return self.update(tree)
+
+    def _add(self, qualname: str, kind: str, ast_node: ast.AST) -> str:
+        unique = qualname
+        counter = 2
+        while unique in self._entries:
+            unique = f"{qualname}#{counter}"
+            counter += 1
+        self._entries[unique] = ScopeEntry(unique, kind, ast_node)
+        return unique
+
+    def _index(self):
+        self._add(MODULE_SCOPE, "module", self.module)
+        # (node, prefix for names defined here, whether the enclosing scope is a class)
+        stack = [(child, "", False) for child in reversed(self.module.body)]
+        while stack:
+            node, prefix, in_class = stack.pop()
+            deferred = []
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if in_class:
+                    kind = "method"
+                else:
+                    kind = "async_function" if isinstance(node, ast.AsyncFunctionDef) else "function"
+                qualname = self._add(prefix + node.name, kind, node)
+                outer = list(node.decorator_list) + list(node.args.defaults)
+                outer += [d for d in node.args.kw_defaults if d is not None]
+                deferred += [(child, prefix, in_class) for child in outer]
+                deferred += [(child, qualname + ".<locals>.", False) for child in node.body]
+            elif isinstance(node, ast.Lambda):
+                qualname = self._add(prefix + "<lambda>", "lambda", node)
+                outer = list(node.args.defaults) + [d for d in node.args.kw_defaults if d is not None]
+                deferred += [(child, prefix, in_class) for child in outer]
+                deferred.append((node.body, qualname + ".<locals>.", False))
+            elif isinstance(node, ast.ClassDef):
+                outer = list(node.decorator_list) + list(node.bases) + [k.value for k in node.keywords]
+                deferred += [(child, prefix, in_class) for child in outer]
+                deferred += [(child, prefix + node.name + ".", True) for child in node.body]
+            else:
+                deferred += [(child, prefix, in_class) for child in ast.iter_child_nodes(node)]
+            stack.extend(reversed(deferred))
+
+    def __contains__(self, qualname: str) -> bool:
+        return qualname in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __getitem__(self, qualname: str) -> CFGBuilder:
+        return self.get(qualname)
+
+    def names(self, kind: Optional[str] = None) -> List[str]:
+        return [name for name, entry in self._entries.items() if kind is None or entry.kind == kind]
+
+    def entry(self, qualname: str) -> ScopeEntry:
+        if qualname not in self._entries:
+            raise KeyError(f"No function or scope named '{qualname}' in this module.")
+        return self._entries[qualname]
+
+    def get(self, qualname: str) -> CFGBuilder:
+        """Returns the builder holding the CFG of `qualname`, building it on first access."""
+        entry = self.entry(qualname)
+        if entry.builder is None:
+            builder = self._builder_factory()
+            builder.build(entry.build_target(), graph_name=qualname)
+            entry.builder = builder
+        return entry.builder
+
+    def is_built(self, qualname: str) -> bool:
+        return self.entry(qualname).builder is not None
+
+    def built_names(self) -> List[str]:
+        return [name for name, entry in self._entries.items() if entry.builder is not None]
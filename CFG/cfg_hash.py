@@ -0,0 +1,178 @@
+"""
+cfg_hash.py - Canonical structural hashing of CFGs and an analysis memo.
+
+Many functions have CFGs of exactly the same shape (getters, validators,
+generated code). canonical_form() numbers the nodes of a built CFG in a
+deterministic depth-first order from the entry node (following next, branch,
+else and case edges in that order) and hashes the node kinds and the edge
+slots between them. Statement text and case labels are ignored, so two CFGs
+with the same hash differ only in what their nodes say, not in how control
+flows between them.
+
+CFGAnalysisMemo uses that hash as a key. Results are stored as templates in
+which every node reference is replaced by its canonical index, and are
+remapped onto the nodes of the next isomorphic CFG that asks for them.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from CFG.cfg_node import CFGNode
+
+RESULT_NODES = "nodes"   # Result contains CFGNode objects
+RESULT_IDS = "ids"       # Every int in the result is a node id
+RESULT_PLAIN = "plain"   # Result does not refer to nodes at all
+
+
+def _ordered_successors(node: CFGNode) -> List[CFGNode]:
+    targets = [node.next_node, node.branch_node, node.else_node]
+    targets.extend(target for _, target in node.case_branches)
+    return [t for t in targets if t is not None]
+
+
+def canonical_order(builder) -> List[CFGNode]:
+    """Nodes in canonical order: DFS preorder from the entry, then unreached nodes by id."""
+    order: List[CFGNode] = []
+    seen = set()
+    nodes = builder.nodes
+    roots = [builder.entry_node] if builder.entry_node else []
+    roots.extend(nodes.values())
+    for root in roots:
+        if root is None or root.id in seen or root.id not in nodes:
+            continue
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.id in seen or node.id not in nodes:
+                continue
+            seen.add(node.id)
+            order.append(node)
+            stack.extend(reversed(_ordered_successors(node)))
+    return order
+
+
+def canonical_form(builder) -> Tuple[str, List[CFGNode]]:
+    """Returns (structural hash, canonical node order) for a built CFG."""
+    order = canonical_order(builder)
+    index_of = {node.id: i for i, node in enumerate(order)}
+
+    def ref(target: Optional[CFGNode]) -> str:
+        if target is None:
+            return "-"
+        return str(index_of.get(target.id, "?"))
+
+    parts = []
+    for node in order:
+        cases = ",".join(ref(target) for _, target in node.case_branches)
+        parts.append(f"{node.node_type}|{ref(node.next_node)}|{ref(node.branch_node)}|{ref(node.else_node)}|{cases}")
+    digest = hashlib.sha256(";".join(parts).encode("utf-8")).hexdigest()
+    return digest, order
+
+
+def structural_hash(builder) -> str:
+    return canonical_form(builder)[0]
+
+
+class _NodeRef:
+    """Placeholder for the node at a canonical index inside a stored template."""
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+def _convert(value: Any, leaf: Callable[[Any], Any], is_leaf: Callable[[Any], bool]) -> Any:
+    if is_leaf(value):
+        return leaf(value)
+    if isinstance(value, list):
+        return [_convert(v, leaf, is_leaf) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_convert(v, leaf, is_leaf) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return type(value)(_convert(v, leaf, is_leaf) for v in value)
+    if isinstance(value, dict):
+        return {_convert(k, leaf, is_leaf): _convert(v, leaf, is_leaf) for k, v in value.items()}
+    return value
+
+
+def _is_id(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class CFGAnalysisMemo:
+    """
+    LRU memo of analysis results keyed by (structural hash, analysis name).
+
+    `result_kind` tells the memo how a result refers to the graph:
+      RESULT_NODES - CFGNode objects anywhere inside lists/tuples/sets/dicts
+      RESULT_IDS   - every int is a node id
+      RESULT_PLAIN - stored as is (containers are copied on the way out)
+    Only analyses that depend purely on the CFG shape may be memoized.
+
+    One memo can be shared between threads: lookups and stores are locked,
+    computations are not (two threads missing the same key both compute it).
+    """
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, builder, name: str, compute: Callable[[Any], Any], result_kind: str = RESULT_NODES,
+            form: Optional[Tuple[str, List[CFGNode]]] = None) -> Any:
+        """
+        Returns the memoized result of `compute(builder)` for this CFG shape,
+        computing and storing it on a miss. `form` may pass a precomputed
+        canonical_form(builder).
+        """
+        digest, order = form if form is not None else canonical_form(builder)
+        key = (digest, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            return self._instantiate(entry, order)
+
+        result = compute(builder)
+        template = (result_kind, self._templatize(result, result_kind, order))
+        with self._lock:
+            self._entries[key] = template
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def prime_paths(self, builder) -> List[List[CFGNode]]:
+        return self.get(builder, "prime_paths", lambda b: b.find_prime_paths(), RESULT_NODES)
+
+    @staticmethod
+    def _templatize(result: Any, result_kind: str, order: List[CFGNode]) -> Any:
+        if result_kind == RESULT_PLAIN:
+            return _convert(result, None, lambda v: False)
+        index_of = {node.id: i for i, node in enumerate(order)}
+        if result_kind == RESULT_IDS:
+            return _convert(result, lambda v: _NodeRef(index_of[v]), _is_id)
+        return _convert(result, lambda v: _NodeRef(index_of[v.id]), lambda v: isinstance(v, CFGNode))
+
+    @staticmethod
+    def _instantiate(entry: Tuple[str, Any], order: List[CFGNode]) -> Any:
+        result_kind, template = entry
+        if result_kind == RESULT_PLAIN:
+            return _convert(template, None, lambda v: False)
+        is_ref = lambda v: isinstance(v, _NodeRef)
+        if result_kind == RESULT_IDS:
+            return _convert(template, lambda ref: order[ref.index].id, is_ref)
+        return _convert(template, lambda ref: order[ref.index], is_ref)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
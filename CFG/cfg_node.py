@@ -1,15 +1,120 @@
-from typing import List, Optional, Tuple
+import ast
+from enum import IntEnum
+from typing import Any, List, Optional, Tuple, Union
+
+
+class SourceText:
+    """
+    Statement or label text that is rendered from AST parts only when it is
+    first read: `template.format(*(ast.unparse(part).strip() for part in parts))`.
+    Builds that never look at statement text skip ast.unparse entirely.
+    """
+    __slots__ = ("template", "parts")
+
+    def __init__(self, template: str, *parts: ast.AST):
+        self.template = template
+        self.parts = parts
+
+    def render(self) -> str:
+        return self.template.format(*(ast.unparse(part).strip() for part in self.parts))
+
+    @property
+    def span(self) -> Optional[Tuple[int, int, int, int]]:
+        """(lineno, col_offset, end_lineno, end_col_offset) covering all parts, if they carry positions."""
+        first, last = self.parts[0], self.parts[-1]
+        try:
+            lineno, end_lineno = first.lineno, last.end_lineno
+        except AttributeError:
+            return None
+        if lineno is None or end_lineno is None:
+            return None
+        return (lineno, first.col_offset, end_lineno, last.end_col_offset)
+
+    def __repr__(self) -> str:
+        return f"SourceText({self.template!r}, {len(self.parts)} parts)"
+
+
+def _render(text: Union[str, SourceText, None]) -> Optional[str]:
+    return text.render() if isinstance(text, SourceText) else text
+
+
+class NodeKind(IntEnum):
+    """
+    Interned node kinds. CFGNode.kind holds one of these; CFGNode.node_type
+    still reads and accepts the historical strings (the lower-case member
+    names), so `node.node_type == "condition"` keeps working.
+    """
+    STATEMENT_BLOCK = 0
+    ENTRY = 1
+    EXIT = 2
+    CONDITION = 3
+    ASSIGNMENT = 4
+    FUNCTION_CALL = 5
+    EXPRESSION_STATEMENT = 6
+    PASS_STATEMENT = 7
+    RETURN_STATEMENT = 8
+    BREAK_STATEMENT = 9
+    CONTINUE_STATEMENT = 10
+    RAISE_STATEMENT = 11
+    FUNCTION_DEFINITION = 12
+    MATCH_DISPATCHER = 13
+    TRY_BLOCK_START = 14
+    FINALLY_BLOCK_START = 15
+    EXCEPTION_HANDLER_START = 16
+    ELSE_BLOCK_START = 17
+    MERGE_POINT = 18
+    OTHER = 19  # Any other node_type string; the string itself is kept on the node
+
+    @property
+    def type_name(self) -> str:
+        return _KIND_NAMES[self]
+
+    @classmethod
+    def from_type_name(cls, node_type: str) -> "NodeKind":
+        return _KINDS_BY_NAME.get(node_type, cls.OTHER)
+
+
+_KIND_NAMES = [kind.name.lower() for kind in NodeKind]
+_KINDS_BY_NAME = {name: NodeKind(i) for i, name in enumerate(_KIND_NAMES) if NodeKind(i) is not NodeKind.OTHER}
+
+# Kinds after which control does not fall through to the next statement.
+TERMINAL_KINDS = frozenset((NodeKind.RETURN_STATEMENT, NodeKind.BREAK_STATEMENT,
+                            NodeKind.CONTINUE_STATEMENT, NodeKind.RAISE_STATEMENT))
+
+_NO_CASES: Tuple = ()
+
 
 class CFGNode:
     """
     Represents a node in the Control Flow Graph.
     This version uses direct links (next_node, branch_node, else_node)
     for simpler CFG structures.
+
+    Nodes use __slots__ so large CFGs stay compact: every field is declared
+    below, and arbitrary attributes can no longer be attached. The statement
+    list and case branches are only allocated when a node has some.
     """
-    def __init__(self, id: int, statements: Optional[List[str]] = None, node_type: str = "statement_block"):
+    __slots__ = ("id", "kind", "_type_name", "_statements", "span",
+                 "next_node", "branch_node", "else_node", "_case_branches",
+                 "condition_ast", "mcdc_requirements",
+                 "_true_condition_label", "_false_condition_label")
+
+    def __init__(self, id: int, statements: Optional[List[Union[str, SourceText]]] = None,
+                 node_type: Union[str, NodeKind] = NodeKind.STATEMENT_BLOCK):
         self.id: int = id
-        self.statements: List[str] = statements if statements is not None else []
-        self.node_type: str = node_type
+        # Entries may be SourceText placeholders; the `statements` property renders them on access.
+        self._statements: Optional[List[Union[str, SourceText]]] = statements if statements else None
+        # Same as the node_type setter, inlined: every node goes through here.
+        if node_type.__class__ is NodeKind:
+            self.kind: NodeKind = node_type
+            self._type_name: Optional[str] = None
+        else:
+            self.kind = _KINDS_BY_NAME.get(node_type, NodeKind.OTHER)
+            self._type_name = node_type if self.kind is NodeKind.OTHER else None
+        # Source position of the first statement, when it was built from an AST.
+        self.span: Optional[Tuple[int, int, int, int]] = None
+        if statements and isinstance(statements[0], SourceText):
+            self.span = statements[0].span
 
         # Core CFG links
         self.next_node: Optional[CFGNode] = None      # For sequential flow
@@ -19,13 +124,93 @@ class CFGNode:
                                                       # Or 'else' block for try-except-else
                                                       # Or start of first exception handler for try-except
 
-        # Specific for Match-Case statements
-        # Stores tuples of (case_label_str, target_CFGNode_for_that_case_body)
-        self.case_branches: List[Tuple[str, CFGNode]] = []
+        # Specific for Match-Case statements: (case_label_str, target_CFGNode_for_that_case_body)
+        # tuples. None until the first case is added; see the case_branches property.
+        self._case_branches: Optional[List[Tuple[str, CFGNode]]] = None
+
+        # Condition nodes created from an `if`/`while` test keep the test expression,
+        # so analyses (e.g. MC/DC) can inspect its boolean structure.
+        self.condition_ast: Optional[ast.expr] = None
+        # Filled in by CFG.mcdc.attach_mcdc_requirements for condition nodes.
+        self.mcdc_requirements: Optional[Any] = None
+
+        # Edge labels of `if` conditions (str or SourceText, rendered on access).
+        self._true_condition_label: Union[str, SourceText, None] = None
+        self._false_condition_label: Union[str, SourceText, None] = None
 
         # Note: Predecessors are not explicitly stored in this node version to keep it simple.
         # This affects some types of graph analysis but simplifies construction.
 
+    @property
+    def node_type(self) -> str:
+        if self._type_name is not None:
+            return self._type_name
+        return _KIND_NAMES[self.kind]
+
+    @node_type.setter
+    def node_type(self, value: Union[str, NodeKind]):
+        if isinstance(value, NodeKind):
+            self.kind, self._type_name = value, None
+        else:
+            self.kind = _KINDS_BY_NAME.get(value, NodeKind.OTHER)
+            self._type_name = value if self.kind is NodeKind.OTHER else None
+
+    @property
+    def statements(self) -> List[str]:
+        pending = self._statements
+        if pending is None:
+            pending = self._statements = []
+            return pending
+        for i, text in enumerate(pending):
+            if isinstance(text, SourceText):
+                pending[i] = text.render()
+        return pending
+
+    @statements.setter
+    def statements(self, value: List[Union[str, SourceText]]):
+        self._statements = value
+
+    @property
+    def has_statements(self) -> bool:
+        """Whether the node has any statement, without rendering their text."""
+        return bool(self._statements)
+
+    @property
+    def case_branches(self) -> Union[List[Tuple[str, "CFGNode"]], Tuple]:
+        """
+        The node's case branches. Nodes without any return a shared empty
+        tuple; use add_case_branch() (or assign a list) to add the first one.
+        """
+        cases = self._case_branches
+        return cases if cases is not None else _NO_CASES
+
+    @case_branches.setter
+    def case_branches(self, value: List[Tuple[str, "CFGNode"]]):
+        self._case_branches = value
+
+    def add_case_branch(self, label: str, target: Optional["CFGNode"]):
+        if self._case_branches is None:
+            self._case_branches = []
+        self._case_branches.append((label, target))
+
+    @property
+    def true_condition_label(self) -> Optional[str]:
+        label = self._true_condition_label = _render(self._true_condition_label)
+        return label
+
+    @true_condition_label.setter
+    def true_condition_label(self, value: Union[str, SourceText, None]):
+        self._true_condition_label = value
+
+    @property
+    def false_condition_label(self) -> Optional[str]:
+        label = self._false_condition_label = _render(self._false_condition_label)
+        return label
+
+    @false_condition_label.setter
+    def false_condition_label(self, value: Union[str, SourceText, None]):
+        self._false_condition_label = value
+
     def __repr__(self) -> str:
         next_id = self.next_node.id if self.next_node else None
         branch_id = self.branch_node.id if self.branch_node else None
@@ -0,0 +1,105 @@
+"""
+cfg_result.py - Finished CFGs, separate from the builder that made them.
+
+A CFGBuilder keeps its graph and its per-build scratch state (id counter,
+loop stacks, exception regions) on the instance, and build() resets both, so
+one builder can only build one CFG at a time. CFGBuilder.build_result and
+build_cfg_result instead build into a private scratch copy of the builder
+(same class and options, fresh state) and return that copy's graph as a
+CFGResult. The configured builder itself is never modified, so one instance
+can serve any number of threads; its statement dispatch tables are shared by
+every builder of its class either way.
+
+    builder = CFGBuilder(basic_blocks=True)      # shared, e.g. a module global
+    result = builder.build_cfg_result(source)    # safe from any thread
+    print(result.to_dot())
+
+A CFGResult quacks like a built CFGBuilder for reading (`nodes`,
+`entry_node`, `exit_node`, `get_successors`, `block_of`, ...), so prime
+paths, ExceptionalCFG, canonical_form and the serializers accept it. Nothing
+builds into it again; `nodes` is a read-only mapping. Like a builder's, its
+analysis manager is meant to be used from one thread at a time; a
+CFGAnalysisMemo can be shared between threads.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from CFG.cfg_node import CFGNode
+
+
+class CFGResult:
+    """The CFG of one build, with read-only access to its nodes."""
+
+    def __init__(self, builder, graph_name: str = "cfg"):
+        # The scratch builder the CFG was built in; nothing else refers to it.
+        self._builder = builder
+        self.graph_name = graph_name
+        self._lock = threading.Lock()
+
+    @property
+    def nodes(self) -> Mapping[int, CFGNode]:
+        return MappingProxyType(self._builder.nodes)
+
+    @property
+    def entry_node(self) -> Optional[CFGNode]:
+        return self._builder.entry_node
+
+    @property
+    def exit_node(self) -> Optional[CFGNode]:
+        return self._builder.exit_node
+
+    @property
+    def current_id(self) -> int:
+        """Highest node id handed out by the build."""
+        return self._builder.current_id
+
+    @property
+    def statement_nodes(self) -> Optional[Mapping[int, CFGNode]]:
+        """The per-statement graph of a basic-block build (see CFGBuilder._coalesce_basic_blocks)."""
+        nodes = self._builder.statement_nodes
+        return MappingProxyType(nodes) if nodes is not None else None
+
+    @property
+    def block_members(self) -> Optional[Mapping[int, List[CFGNode]]]:
+        members = self._builder.block_members
+        return MappingProxyType(members) if members is not None else None
+
+    @property
+    def exception_regions(self) -> Tuple[Any, ...]:
+        return tuple(self._builder.exception_regions)
+
+    @property
+    def dead_code(self) -> Tuple[Any, ...]:
+        return tuple(self._builder.dead_code)
+
+    @property
+    def options(self) -> Dict[str, bool]:
+        builder = self._builder
+        return {"basic_blocks": builder.basic_blocks, "expand_conditions": builder.expand_conditions,
+                "factored_exceptions": builder.factored_exceptions, "for_to_while": builder.for_to_while,
+                "prune_unreachable": builder.prune_unreachable}
+
+    def block_of(self, statement_node: CFGNode) -> Optional[CFGNode]:
+        return self._builder.block_of(statement_node)
+
+    def get_successors(self, node: CFGNode) -> List[CFGNode]:
+        return self._builder.get_successors(node)
+
+    def find_prime_paths(self) -> List[List[CFGNode]]:
+        return self._builder.find_prime_paths()
+
+    def to_dot(self, show_statement_text: bool = True) -> str:
+        return self._builder.to_dot(show_statement_text=show_statement_text)
+
+    def get_analysis_manager(self, memo=None):
+        """The AnalysisManager of this CFG (see CFGBuilder.get_analysis_manager)."""
+        with self._lock:
+            return self._builder.get_analysis_manager(memo)
+
+    def __len__(self) -> int:
+        return len(self._builder.nodes)
+
+    def __repr__(self) -> str:
+        return f"CFGResult({self.graph_name!r}, {len(self)} nodes)"
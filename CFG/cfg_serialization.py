@@ -0,0 +1,104 @@
+"""
+cfg_serialization.py - Plain-dict (JSON-compatible) form of a built CFG.
+
+cfg_to_dict() captures everything CFGBuilder produces: node ids, kinds,
+statements, source spans, the next/branch/else links, case branches, edge
+labels and the source text of condition expressions, and in basic-block
+builds the per-statement nodes of every block. cfg_from_dict() restores an
+equivalent CFGBuilder whose analyses (find_prime_paths, to_dot,
+source_index, ...) give the same results as the original.
+"""
+
+import ast
+from typing import Any, Dict, List
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import CFGNode
+
+FORMAT_VERSION = 2
+
+
+def _link_id(node):
+    return node.id if node is not None else None
+
+
+def _node_to_dict(node: CFGNode) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "id": node.id,
+        "type": node.node_type,
+        "statements": list(node.statements),
+        "next": _link_id(node.next_node),
+        "branch": _link_id(node.branch_node),
+        "else": _link_id(node.else_node),
+    }
+    if node.case_branches:
+        data["cases"] = [[label, _link_id(target)] for label, target in node.case_branches]
+    true_label = node.true_condition_label
+    false_label = node.false_condition_label
+    if true_label is not None:
+        data["true_label"] = true_label
+    if false_label is not None:
+        data["false_label"] = false_label
+    if node.condition_ast is not None:
+        data["condition"] = ast.unparse(node.condition_ast)
+    if node.span is not None:
+        data["span"] = list(node.span)
+    return data
+
+
+def cfg_to_dict(builder: CFGBuilder) -> Dict[str, Any]:
+    nodes = []
+    for node in builder.nodes.values():
+        data = _node_to_dict(node)
+        if builder.block_members is not None:
+            # Statement node ids are their own id space, linked among themselves.
+            data["members"] = [_node_to_dict(member) for member in builder.block_members.get(node.id, ())]
+        nodes.append(data)
+    return {
+        "format": FORMAT_VERSION,
+        "entry": _link_id(builder.entry_node),
+        "exit": _link_id(builder.exit_node),
+        "current_id": builder.current_id,
+        "nodes": nodes,
+    }
+
+
+def _nodes_from_dicts(items: List[Dict[str, Any]]) -> Dict[int, CFGNode]:
+    nodes: Dict[int, CFGNode] = {}
+    for item in items:
+        node = CFGNode(item["id"], statements=list(item["statements"]), node_type=item["type"])
+        if "true_label" in item:
+            node.true_condition_label = item["true_label"]
+        if "false_label" in item:
+            node.false_condition_label = item["false_label"]
+        if "condition" in item:
+            node.condition_ast = ast.parse(item["condition"], mode="eval").body
+        if "span" in item:
+            node.span = tuple(item["span"])
+        nodes[node.id] = node
+    for item in items:
+        node = nodes[item["id"]]
+        node.next_node = nodes.get(item["next"]) if item["next"] is not None else None
+        node.branch_node = nodes.get(item["branch"]) if item["branch"] is not None else None
+        node.else_node = nodes.get(item["else"]) if item["else"] is not None else None
+        for label, target_id in item.get("cases", ()):
+            node.add_case_branch(label, nodes.get(target_id))
+    return nodes
+
+
+def cfg_from_dict(data: Dict[str, Any]) -> CFGBuilder:
+    if data.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported CFG serialization format: {data.get('format')!r}")
+    builder = CFGBuilder()
+    nodes = _nodes_from_dicts(data["nodes"])
+    if any("members" in item for item in data["nodes"]):
+        members = [member for item in data["nodes"] for member in item["members"]]
+        builder.statement_nodes = _nodes_from_dicts(members)
+        builder.block_members = {item["id"]: [builder.statement_nodes[m["id"]] for m in item.get("members", ())]
+                                 for item in data["nodes"]}
+        builder._statement_blocks = {m["id"]: item["id"] for item in data["nodes"] for m in item.get("members", ())}
+    builder.nodes = nodes
+    builder.current_id = data["current_id"]
+    builder.entry_node = nodes.get(data["entry"]) if data["entry"] is not None else None
+    builder.exit_node = nodes.get(data["exit"]) if data["exit"] is not None else None
+    return builder
@@ -0,0 +1,468 @@
+"""
+cfg_store.py - Struct-of-arrays storage for a built CFG.
+
+A CFGStore keeps a whole CFG in a handful of flat arrays indexed by node
+position (0 .. node_count - 1) instead of one Python object per node:
+
+    kinds                 NodeKind per node
+    next/branch/else_     target position, or -1
+    case_offsets          case edges of node i are case_targets/case_labels
+                          [case_offsets[i]:case_offsets[i + 1]]
+    statement_offsets     same layout for statement text
+    true_labels/...       string-table index, or -1
+    spans                 four ints per node (lineno, col, end_lineno, end_col), -1 if unknown
+
+All text (statements, labels, condition source, unknown node_type names)
+lives once in a string table. Analyses can work on positions directly
+(successor_positions) or through NodeView objects, thin read-only views
+that look like CFGNode. A store also quacks like a built CFGBuilder
+(`nodes`, `entry_node`, `exit_node`, `get_successors`), so read-only
+analyses such as canonical_form, iter_prime_paths_external and
+sample_prime_paths accept it unchanged.
+
+to_bytes()/from_bytes() give a compact binary form. Like cfg_to_dict, a
+store only keeps edges between nodes that are in `builder.nodes`.
+
+publish() copies a store into a multiprocessing.shared_memory block, so
+worker processes can use it without unpickling a graph of CFGNode objects:
+
+    block = store.publish()                 # in the parent
+    ...submit(work, block.name)...
+    with CFGStore.attach(name) as store:    # in a worker: no copy
+        paths = store.find_prime_paths()
+    block.close(); block.unlink()           # in the parent, when done
+
+An attached store's arrays are read-only memoryviews into the block, and
+strings are decoded on first use. The layout is the store's own arrays at
+8-byte aligned offsets in native byte order, which is all processes on one
+machine need. The publishing process owns the block; workers attach from
+processes started by multiprocessing, which share its resource tracker.
+"""
+
+import ast
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import CFGNode, NodeKind
+
+NO_NODE = -1
+_MAGIC = b"CFGS"
+_FORMAT_VERSION = 1
+# (attribute, typecode) of every array, in serialization order.
+_ARRAYS = (
+    ("node_ids", "i"), ("kinds", "B"), ("type_names", "i"),
+    ("next", "i"), ("branch", "i"), ("else_", "i"),
+    ("case_offsets", "I"), ("case_targets", "i"), ("case_labels", "I"),
+    ("statement_offsets", "I"), ("statements", "I"),
+    ("true_labels", "i"), ("false_labels", "i"), ("conditions", "i"), ("spans", "i"),
+)
+_SHARED_MAGIC = b"CFGM"
+_SHARED_HEADER = "=4sHxxii"
+_SHARED_SECTION = "=QQ"  # Offset and size in bytes
+_SHARED_ALIGNMENT = 8
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _SHARED_ALIGNMENT) * _SHARED_ALIGNMENT
+
+
+class _SharedStrings(Sequence):
+    """String table of an attached store: UTF-8 bytes in shared memory, decoded on first use."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+        self._decoded: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        text = self._decoded[index]
+        if text is None:
+            if index < 0:
+                index += len(self)
+            text = self._decoded[index] = str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+        return text
+
+
+class NodeView:
+    """Read-only CFGNode look-alike backed by a CFGStore position."""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: "CFGStore", index: int):
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NodeView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+    def _view(self, position: int) -> Optional["NodeView"]:
+        return NodeView(self.store, position) if position != NO_NODE else None
+
+    def _string(self, string_id: int) -> Optional[str]:
+        return self.store.strings[string_id] if string_id != NO_NODE else None
+
+    @property
+    def id(self) -> int:
+        return self.store.node_ids[self.index]
+
+    @property
+    def kind(self) -> NodeKind:
+        return NodeKind(self.store.kinds[self.index])
+
+    @property
+    def node_type(self) -> str:
+        name = self.store.type_names[self.index]
+        return self.store.strings[name] if name != NO_NODE else self.kind.type_name
+
+    @property
+    def statements(self) -> List[str]:
+        store, i = self.store, self.index
+        ids = store.statements[store.statement_offsets[i]:store.statement_offsets[i + 1]]
+        return [store.strings[s] for s in ids]
+
+    @property
+    def has_statements(self) -> bool:
+        offsets = self.store.statement_offsets
+        return offsets[self.index + 1] > offsets[self.index]
+
+    @property
+    def next_node(self) -> Optional["NodeView"]:
+        return self._view(self.store.next[self.index])
+
+    @property
+    def branch_node(self) -> Optional["NodeView"]:
+        return self._view(self.store.branch[self.index])
+
+    @property
+    def else_node(self) -> Optional["NodeView"]:
+        return self._view(self.store.else_[self.index])
+
+    @property
+    def case_branches(self) -> List[Tuple[str, Optional["NodeView"]]]:
+        store, i = self.store, self.index
+        start, end = store.case_offsets[i], store.case_offsets[i + 1]
+        return [(store.strings[store.case_labels[k]], self._view(store.case_targets[k])) for k in range(start, end)]
+
+    @property
+    def true_condition_label(self) -> Optional[str]:
+        return self._string(self.store.true_labels[self.index])
+
+    @property
+    def false_condition_label(self) -> Optional[str]:
+        return self._string(self.store.false_labels[self.index])
+
+    @property
+    def condition_ast(self) -> Optional[ast.expr]:
+        source = self._string(self.store.conditions[self.index])
+        return ast.parse(source, mode="eval").body if source is not None else None
+
+    @property
+    def span(self) -> Optional[Tuple[int, int, int, int]]:
+        span = tuple(self.store.spans[4 * self.index:4 * self.index + 4])
+        return span if span[0] != NO_NODE else None
+
+    def __repr__(self) -> str:
+        return f"NodeView(id={self.id}, type='{self.node_type}')"
+
+
+class CFGStore:
+    """One CFG as parallel arrays; see the module docstring for the layout."""
+
+    def __init__(self):
+        for name, typecode in _ARRAYS:
+            setattr(self, name, array(typecode))
+        self.case_offsets.append(0)
+        self.statement_offsets.append(0)
+        self.strings: List[str] = []
+        self._string_ids: Optional[Dict[str, int]] = {}  # Dropped once the store is complete
+        self._nodes: Optional[Dict[int, NodeView]] = None  # Built on first use once the store is complete
+        self.entry: int = NO_NODE
+        self.exit: int = NO_NODE
+        self._shared_memory: Optional[shared_memory.SharedMemory] = None
+        self._shared_views: List[memoryview] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def intern(self, text: str) -> int:
+        if self._string_ids is None:
+            self._string_ids = {value: i for i, value in enumerate(self.strings)}
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def _optional_string(self, text: Optional[str]) -> int:
+        return self.intern(text) if text is not None else NO_NODE
+
+    @classmethod
+    def from_builder(cls, builder: CFGBuilder) -> "CFGStore":
+        store = cls()
+        nodes = list(builder.nodes.values())
+        position = {node.id: i for i, node in enumerate(nodes)}
+
+        def target(node: Optional[CFGNode]) -> int:
+            return position.get(node.id, NO_NODE) if node is not None else NO_NODE
+
+        for node in nodes:
+            store.node_ids.append(node.id)
+            store.kinds.append(node.kind)
+            store.type_names.append(store.intern(node.node_type) if node.kind is NodeKind.OTHER else NO_NODE)
+            store.next.append(target(node.next_node))
+            store.branch.append(target(node.branch_node))
+            store.else_.append(target(node.else_node))
+            for label, case_target in node.case_branches:
+                store.case_targets.append(target(case_target))
+                store.case_labels.append(store.intern(label))
+            store.case_offsets.append(len(store.case_targets))
+            if node.has_statements:
+                store.statements.extend(store.intern(text) for text in node.statements)
+            store.statement_offsets.append(len(store.statements))
+            store.true_labels.append(store._optional_string(node.true_condition_label))
+            store.false_labels.append(store._optional_string(node.false_condition_label))
+            condition = ast.unparse(node.condition_ast) if node.condition_ast is not None else None
+            store.conditions.append(store._optional_string(condition))
+            store.spans.extend(node.span if node.span is not None else (NO_NODE,) * 4)
+        store.entry = target(builder.entry_node)
+        store.exit = target(builder.exit_node)
+        store._shrink()
+        return store
+
+    def _shrink(self):
+        # Appending over-allocates; copies are sized exactly.
+        for name, typecode in _ARRAYS:
+            setattr(self, name, array(typecode, getattr(self, name)))
+        self._string_ids = None
+        self._nodes = None
+
+    def to_builder(self) -> CFGBuilder:
+        """Materializes regular CFGNode objects, e.g. to modify the graph."""
+        builder = CFGBuilder()
+        nodes: List[CFGNode] = []
+        for view in self.iter_views():
+            node = CFGNode(view.id, statements=view.statements, node_type=view.node_type)
+            node.true_condition_label = view.true_condition_label
+            node.false_condition_label = view.false_condition_label
+            node.condition_ast = view.condition_ast
+            node.span = view.span
+            nodes.append(node)
+
+        def node_at(position: int) -> Optional[CFGNode]:
+            return nodes[position] if position != NO_NODE else None
+
+        for i, node in enumerate(nodes):
+            node.next_node = node_at(self.next[i])
+            node.branch_node = node_at(self.branch[i])
+            node.else_node = node_at(self.else_[i])
+            for k in range(self.case_offsets[i], self.case_offsets[i + 1]):
+                node.add_case_branch(self.strings[self.case_labels[k]], node_at(self.case_targets[k]))
+        builder.nodes = {node.id: node for node in nodes}
+        builder.current_id = max(builder.nodes, default=0)
+        builder.entry_node = node_at(self.entry)
+        builder.exit_node = node_at(self.exit)
+        return builder
+
+    # --- Position-based access -------------------------------------------
+
+    def successor_positions(self, position: int) -> List[int]:
+        """Successor positions in CFGBuilder.get_successors order (next, branch, else, cases)."""
+        successors = [t for t in (self.next[position], self.branch[position], self.else_[position]) if t != NO_NODE]
+        successors.extend(t for t in self.case_targets[self.case_offsets[position]:self.case_offsets[position + 1]]
+                          if t != NO_NODE)
+        return successors
+
+    def edge_count(self) -> int:
+        return sum(len(self.successor_positions(i)) for i in range(len(self)))
+
+    # --- CFGBuilder-compatible read-only interface ---------------------------
+
+    def view(self, position: int) -> NodeView:
+        return NodeView(self, position)
+
+    def iter_views(self) -> Iterator[NodeView]:
+        return (NodeView(self, i) for i in range(len(self)))
+
+    @property
+    def nodes(self) -> Dict[int, NodeView]:
+        """Node id -> view; one shared mapping, to be treated as read-only."""
+        if self._nodes is None:
+            self._nodes = {node_id: NodeView(self, i) for i, node_id in enumerate(self.node_ids)}
+        return self._nodes
+
+    @property
+    def entry_node(self) -> Optional[NodeView]:
+        return NodeView(self, self.entry) if self.entry != NO_NODE else None
+
+    @property
+    def exit_node(self) -> Optional[NodeView]:
+        return NodeView(self, self.exit) if self.exit != NO_NODE else None
+
+    def get_successors(self, node: NodeView) -> List[NodeView]:
+        return [NodeView(self, t) for t in self.successor_positions(node.index)]
+
+    def find_prime_paths(self) -> List[List[NodeView]]:
+        from CFG.external_prime_paths import find_prime_paths_external
+        return find_prime_paths_external(self)
+
+    def to_dot(self, show_statement_text: bool = True) -> str:
+        return self.to_builder().to_dot(show_statement_text=show_statement_text)
+
+    # --- Binary form ----------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        swap = sys.byteorder != "little"
+        parts = [_MAGIC, struct.pack("<Hii", _FORMAT_VERSION, self.entry, self.exit)]
+        for name, typecode in _ARRAYS:
+            values = getattr(self, name)
+            if swap:
+                values = array(typecode, values)
+                values.byteswap()
+            parts.append(struct.pack("<I", len(values)))
+            parts.append(values.tobytes())
+        encoded = [text.encode("utf-8") for text in self.strings]
+        lengths = array("I", (len(text) for text in encoded))
+        if swap:
+            lengths.byteswap()
+        parts.append(struct.pack("<I", len(lengths)))
+        parts.append(lengths.tobytes())
+        parts.extend(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CFGStore":
+        if data[:4] != _MAGIC:
+            raise ValueError("Not a serialized CFGStore.")
+        version, entry, exit_position = struct.unpack_from("<Hii", data, 4)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported CFGStore format: {version}")
+        store = cls()
+        store.entry, store.exit = entry, exit_position
+        offset = 4 + struct.calcsize("<Hii")
+        for name, typecode in _ARRAYS:
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            values = array(typecode)
+            size = length * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            offset += size
+            if sys.byteorder != "little":
+                values.byteswap()
+            setattr(store, name, values)
+        (string_count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        lengths = array("I")
+        lengths.frombytes(data[offset:offset + string_count * lengths.itemsize])
+        offset += string_count * lengths.itemsize
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        for length in lengths:
+            store.strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        store._string_ids = None
+        return store
+
+    # --- Shared memory --------------------------------------------------------
+
+    def publish(self, name: Optional[str] = None) -> shared_memory.SharedMemory:
+        """
+        Copies the store into a new shared memory block and returns it; pass
+        `block.name` to workers. The caller closes and unlinks the block once
+        the workers are done with it.
+        """
+        encoded = [text.encode("utf-8") for text in self.strings]
+        string_offsets = array("I", [0])
+        for text in encoded:
+            string_offsets.append(string_offsets[-1] + len(text))
+        sections = [memoryview(getattr(self, name)).cast("B") for name, _ in _ARRAYS]
+        sections.append(memoryview(string_offsets).cast("B"))
+        sections.append(memoryview(b"".join(encoded)))
+        offset = _aligned(struct.calcsize(_SHARED_HEADER) + len(sections) * struct.calcsize(_SHARED_SECTION))
+        layout = []
+        for section in sections:
+            layout.append((offset, section.nbytes))
+            offset = _aligned(offset + section.nbytes)
+
+        block = shared_memory.SharedMemory(name=name, create=True, size=offset)
+        try:
+            struct.pack_into(_SHARED_HEADER, block.buf, 0, _SHARED_MAGIC, _FORMAT_VERSION, self.entry, self.exit)
+            table_offset = struct.calcsize(_SHARED_HEADER)
+            for i, ((start, size), section) in enumerate(zip(layout, sections)):
+                struct.pack_into(_SHARED_SECTION, block.buf, table_offset + i * struct.calcsize(_SHARED_SECTION),
+                                 start, size)
+                block.buf[start:start + size] = section
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+        return block
+
+    @classmethod
+    def attach(cls, name: str) -> "CFGStore":
+        """
+        A store reading the block published under `name` in place. Call
+        close() (or use it as a context manager) to detach; nodes and views
+        obtained from it must not be used afterwards.
+        """
+        block = shared_memory.SharedMemory(name=name)
+        store = cls()
+        store._shared_memory = block
+        try:
+            buffer = block.buf.toreadonly()
+            store._shared_views.append(buffer)
+            magic, version, store.entry, store.exit = struct.unpack_from(_SHARED_HEADER, buffer, 0)
+            if magic != _SHARED_MAGIC:
+                raise ValueError(f"Shared memory block {name!r} does not hold a CFGStore.")
+            if version != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported CFGStore format: {version}")
+
+            def section(index: int, typecode: str) -> memoryview:
+                start, size = struct.unpack_from(
+                    _SHARED_SECTION, buffer,
+                    struct.calcsize(_SHARED_HEADER) + index * struct.calcsize(_SHARED_SECTION))
+                raw = buffer[start:start + size]
+                view = raw.cast(typecode)
+                store._shared_views.extend((raw, view))
+                return view
+
+            for i, (attribute, typecode) in enumerate(_ARRAYS):
+                setattr(store, attribute, section(i, typecode))
+            store.strings = _SharedStrings(section(len(_ARRAYS), "I"), section(len(_ARRAYS) + 1, "B"))
+            store._string_ids = None
+        except BaseException:
+            store.close()
+            raise
+        return store
+
+    def close(self):
+        """Detaches an attached store from its block (it is empty afterwards); no-op for other stores."""
+        if self._shared_memory is None:
+            return
+        for name, typecode in _ARRAYS:
+            setattr(self, name, array(typecode))
+        self.strings = []
+        self.entry = self.exit = NO_NODE
+        self._nodes = None
+        # The block can only be closed once no view into it is left.
+        for view in reversed(self._shared_views):
+            view.release()
+        self._shared_views = []
+        self._shared_memory.close()
+        self._shared_memory = None
+
+    def __enter__(self) -> "CFGStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
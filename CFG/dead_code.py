@@ -0,0 +1,156 @@
+"""
+dead_code.py - Pruning of unreachable nodes, reported as dead-code findings.
+
+A statement after an `if`/`match` whose branches all return, raise, break or
+continue still gets a node, but nothing links to it, and empty merge blocks
+of such statements are left behind the same way. find_prime_paths starts
+paths at every node, so it enumerates paths through code that can never run.
+
+CFGBuilder(prune_unreachable=True) removes every node that cannot be reached
+before ids are renumbered, so analyses never see them, and records the dead
+code in builder.dead_code: one DeadCode per connected run of removed nodes,
+together with the rest of its block, which the builder never turns into
+nodes (nothing reaches it), and one per such unbuilt rest of a block on its
+own (`return x` followed by more statements). Runs that hold no source
+statements, such as empty merge blocks, are removed without a finding.
+find_unreachable reports the unreachable nodes of any built graph without
+changing it.
+
+Exception handlers and finally blocks count as reachable in plain builds,
+which connect a try node to at most one of them and never to a finally block
+after a return (see exception_edges.py); in factored-exception builds they
+are reached through the dispatch node like everything else.
+"""
+
+import ast
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from CFG.cfg_node import CFGNode, NodeKind, SourceText
+
+# Statements whose `break`s belong to themselves, not to an enclosing loop.
+_OWN_SCOPE_TYPES = (ast.For, ast.AsyncFor, ast.While, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Entered by exceptions and returns, which plain builds do not model as edges.
+_EXCEPTIONAL_ENTRY_KINDS = frozenset((NodeKind.EXCEPTION_HANDLER_START, NodeKind.FINALLY_BLOCK_START))
+
+
+class DeadCode:
+    """
+    One piece of unreachable code: connected removed nodes (in creation
+    order, with their pre-renumbering ids) and the statements that follow
+    them in their block without having been built.
+    """
+
+    def __init__(self, nodes: List[CFGNode], unbuilt: Sequence[ast.stmt] = ()):
+        self.nodes = nodes
+        self.unbuilt = list(unbuilt)
+
+    @property
+    def statements(self) -> List[str]:
+        return [text for node in self.nodes for text in node.statements] + \
+               [SourceText("{}", stmt).render() for stmt in self.unbuilt]
+
+    @property
+    def span(self) -> Optional[Tuple[int, int, int, int]]:
+        """From the start of the first statement with a position to the end of the last one."""
+        spans = [node.span for node in self.nodes if node.span is not None]
+        spans.extend(span for span in (SourceText("{}", stmt).span for stmt in self.unbuilt) if span is not None)
+        if not spans:
+            return None
+        return min(spans)[:2] + max(spans, key=lambda s: s[2:])[2:]
+
+    def __repr__(self) -> str:
+        span = self.span
+        where = f"lines {span[0]}-{span[2]}" if span else "no position"
+        return f"DeadCode({where}, {len(self.nodes)} nodes, {len(self.unbuilt)} unbuilt statements)"
+
+
+def find_unreachable(builder) -> List[CFGNode]:
+    """Nodes of the built graph that cannot be reached, in id order."""
+    if not builder.entry_node:
+        return []
+    nodes = builder.nodes
+    roots = [builder.entry_node]
+    if not builder.factored_exceptions:
+        members = builder.block_members
+        roots.extend(node for node_id, node in nodes.items()
+                     if (members[node_id][0] if members is not None else node).kind in _EXCEPTIONAL_ENTRY_KINDS)
+    # Nodes, not ids: edges can still lead through empty blocks that
+    # _optimize_empty_blocks removed, and their ids are stale.
+    reached = set()
+    stack = roots
+    while stack:
+        node = stack.pop()
+        if node in reached:
+            continue
+        reached.add(node)
+        stack.extend(builder.get_successors(node))
+    return [node for _, node in sorted(nodes.items()) if node not in reached]
+
+
+def _group(unreachable: List[CFGNode], builder) -> List[List[CFGNode]]:
+    """Splits nodes into groups connected by edges (in either direction), ordered by first id."""
+    parent: Dict[int, int] = {node.id: node.id for node in unreachable}
+
+    def find(node_id: int) -> int:
+        while parent[node_id] != node_id:
+            parent[node_id] = node_id = parent[parent[node_id]]
+        return node_id
+
+    for node in unreachable:
+        for successor in builder.get_successors(node):
+            if successor.id in parent:
+                a, b = find(node.id), find(successor.id)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+    groups: Dict[int, List[CFGNode]] = {}
+    for node in unreachable:
+        groups.setdefault(find(node.id), []).append(node)
+    return list(groups.values())
+
+
+def _breaks_out_of(loop: ast.AST) -> bool:
+    """Whether the loop body has a `break` of this loop (not of a nested one)."""
+    stack = list(loop.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Break):
+            return True
+        if not isinstance(node, _OWN_SCOPE_TYPES):
+            stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _statement_ast(node: CFGNode) -> Optional[ast.AST]:
+    texts = node._statements
+    return texts[0].parts[0] if texts and isinstance(texts[0], SourceText) else None
+
+
+def prune_unreachable(builder) -> List[DeadCode]:
+    """
+    Removes the unreachable nodes of a freshly built graph (before
+    renumbering) and returns the dead code as findings in source order.
+    """
+    unreachable = find_unreachable(builder)
+    for node in unreachable:
+        del builder.nodes[node.id]
+    if unreachable and builder._graph_listeners:
+        builder._notify_graph_changed("nodes")
+        builder._notify_graph_changed("edges")
+
+    findings = [DeadCode(group) for group in _group(unreachable, builder)]
+    finding_of = {id(_statement_ast(node)): finding for finding in findings for node in finding.nodes}
+    for stmt_list, start in builder._unbuilt_statements:
+        previous = stmt_list[start - 1] if start else None
+        if isinstance(previous, (ast.For, ast.While)) and previous.orelse and _breaks_out_of(previous):
+            # A break skips the loop's else block; the graph has no edge for
+            # that, so the code after such a loop is not known to be dead.
+            continue
+        # The statement before the rest of a block usually is a removed node itself.
+        finding = finding_of.get(id(previous))
+        if finding is None:
+            findings.append(DeadCode([], stmt_list[start:]))
+        else:
+            finding.unbuilt.extend(stmt_list[start:])
+    findings = [finding for finding in findings if finding.span is not None]
+    findings.sort(key=lambda finding: finding.span)
+    return findings
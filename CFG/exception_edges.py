@@ -0,0 +1,122 @@
+"""
+exception_edges.py - Factored exception edges for try statements.
+
+A plain build only connects a `try` node to its handlers, as if exceptions
+could only be raised before the body starts. Connecting every body statement
+to every handler is accurate but multiplies edges (and prime paths) by the
+number of handlers.
+
+CFGBuilder(factored_exceptions=True) factors these edges instead. Every try
+statement gets one "exception_dispatch" node: the try node reaches it through
+branch_node (labelled "exception") and it has one case branch per handler,
+plus "finally" when there is a finally block. The try body is recorded as an
+ExceptionRegion in builder.exception_regions. The graph itself only grows by
+one node per try statement.
+
+Analyses that want exceptions raised partway through a body expand the
+regions lazily with ExceptionalCFG, a read-only view in which every statement
+of a region also has an edge to its innermost region's dispatch node (one
+edge per statement, not one per handler). Dispatch nodes and handlers of a
+nested try are statements of the enclosing region, so unhandled exceptions
+propagate outwards. The view quacks like a built CFGBuilder (`nodes`,
+`entry_node`, `exit_node`, `get_successors`), so external prime paths, path
+sampling and canonical_form accept it.
+"""
+
+from typing import Dict, List, Optional
+
+from CFG.cfg_node import CFGNode, NodeKind
+
+# Nodes that only mark structure and cannot raise.
+_NON_RAISING_KINDS = frozenset((NodeKind.ENTRY, NodeKind.EXIT, NodeKind.PASS_STATEMENT,
+                                NodeKind.BREAK_STATEMENT, NodeKind.CONTINUE_STATEMENT,
+                                NodeKind.TRY_BLOCK_START, NodeKind.FINALLY_BLOCK_START,
+                                NodeKind.ELSE_BLOCK_START, NodeKind.MERGE_POINT))
+_LOOP_EXIT_PREFIX = "exit_point_after_"
+
+
+def can_raise(node: CFGNode) -> bool:
+    """Whether executing the node can raise: it runs source code, not just builder bookkeeping."""
+    if node.kind in _NON_RAISING_KINDS or not node.has_statements:
+        return False
+    return not (node.kind is NodeKind.STATEMENT_BLOCK and node.statements[0].startswith(_LOOP_EXIT_PREFIX))
+
+
+class ExceptionRegion:
+    """The body of one try statement and the dispatch node its exceptions go to."""
+
+    def __init__(self, try_node: CFGNode, dispatch: CFGNode, members: List[CFGNode]):
+        self.try_node = try_node
+        self.dispatch = dispatch
+        self._members = members
+
+    def members(self, builder) -> List[CFGNode]:
+        """Body nodes still in the graph that can raise (blocks, in basic-block builds)."""
+        found: Dict[int, CFGNode] = {}
+        for node in self._members:
+            if not can_raise(node):
+                continue
+            current = _current_node(builder, node)
+            if current is not None:
+                found.setdefault(id(current), current)
+        return list(found.values())
+
+    def __repr__(self) -> str:
+        return f"ExceptionRegion(try={self.try_node.id}, dispatch={self.dispatch.id}, members={len(self._members)})"
+
+
+def _current_node(builder, node: CFGNode) -> Optional[CFGNode]:
+    """`node` as it appears in builder.nodes: itself, its basic block, or None if it was removed."""
+    if builder.block_members is not None:
+        return builder.block_of(node)
+    return node if builder.nodes.get(node.id) is node else None
+
+
+class ExceptionalCFG:
+    """Read-only view of a factored-exception CFG with the exceptional edges expanded."""
+
+    def __init__(self, builder):
+        self.builder = builder
+        self._dispatch_of: Optional[Dict[int, CFGNode]] = None
+
+    @property
+    def nodes(self) -> Dict[int, CFGNode]:
+        return self.builder.nodes
+
+    @property
+    def entry_node(self) -> Optional[CFGNode]:
+        return self.builder.entry_node
+
+    @property
+    def exit_node(self) -> Optional[CFGNode]:
+        return self.builder.exit_node
+
+    def _dispatch_map(self) -> Dict[int, CFGNode]:
+        if self._dispatch_of is None:
+            self._dispatch_of = {}
+            for region in self.builder.exception_regions:  # Innermost first
+                dispatch = _current_node(self.builder, region.dispatch)
+                if dispatch is None:
+                    continue
+                for member in region.members(self.builder):
+                    if member is not dispatch:
+                        self._dispatch_of.setdefault(id(member), dispatch)
+        return self._dispatch_of
+
+    def exceptional_successors(self, node: CFGNode) -> List[CFGNode]:
+        dispatch = self._dispatch_map().get(id(node))
+        return [dispatch] if dispatch is not None else []
+
+    def get_successors(self, node: CFGNode) -> List[CFGNode]:
+        successors = self.builder.get_successors(node)
+        dispatch = self._dispatch_map().get(id(node))
+        if dispatch is not None and dispatch not in successors:
+            successors.append(dispatch)
+        return successors
+
+    def exceptional_edge_count(self) -> int:
+        return len(self._dispatch_map())
+
+    def find_prime_paths(self) -> List[List[CFGNode]]:
+        from CFG.external_prime_paths import find_prime_paths_external
+        return find_prime_paths_external(self)
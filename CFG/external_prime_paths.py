@@ -0,0 +1,184 @@
+"""
+external_prime_paths.py - Prime path computation that spills to disk.
+
+CFGBuilder.find_prime_paths keeps every simple path in memory and compares
+all pairs. For generated state machines the number of simple paths alone can
+exceed RAM. This module computes the same set of prime paths with bounded
+memory:
+
+1. A depth-first search from every node enumerates the right-maximal simple
+   paths (paths whose last node has no successor outside the path). Every
+   prime path is right-maximal.
+2. Each candidate path `p` is written as a record (p, CANDIDATE), and its tail
+   p[1:] as (p[1:], SUFFIX). A right-maximal path is prime exactly when no
+   other candidate extends it by one node on the left, i.e. when no SUFFIX
+   record with the same key exists.
+3. Records are buffered up to the memory limit, sorted, and spilled as runs
+   in a temporary directory. Paths are encoded as fixed-width big-endian node
+   indices, so runs are compact.
+4. A k-way merge of the runs brings equal keys together; candidates without a
+   matching SUFFIX record are the prime paths.
+"""
+
+import heapq
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from CFG.cfg_node import CFGNode
+
+SUFFIX = 0     # Sorts before CANDIDATE for the same key
+CANDIDATE = 1
+
+_RECORD_HEADER = struct.Struct(">IB")  # key length, tag
+_RECORD_OVERHEAD = 120                 # Rough per-record cost of a buffered (bytes, int) tuple
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+MAX_OPEN_RUNS = 64
+
+
+def _encoder(node_count: int):
+    typecode = "H" if node_count < (1 << 16) else "I"
+    swap = sys.byteorder == "little"
+
+    def encode(path: List[int]) -> bytes:
+        packed = array(typecode, path)
+        if swap:
+            packed.byteswap()
+        return packed.tobytes()
+
+    def decode(key: bytes) -> List[int]:
+        packed = array(typecode)
+        packed.frombytes(key)
+        if swap:
+            packed.byteswap()
+        return packed.tolist()
+
+    return encode, decode
+
+
+def _write_run(records: List[Tuple[bytes, int]], directory: str) -> str:
+    records.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb", buffering=1 << 16) as f:
+        for key, tag in records:
+            f.write(_RECORD_HEADER.pack(len(key), tag))
+            f.write(key)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[bytes, int]]:
+    with open(path, "rb", buffering=1 << 16) as f:
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if not header:
+                return
+            length, tag = _RECORD_HEADER.unpack(header)
+            yield f.read(length), tag
+
+
+def _merge_runs(paths: List[str], directory: str) -> str:
+    fd, merged = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb", buffering=1 << 16) as f:
+        for key, tag in heapq.merge(*(_read_run(p) for p in paths)):
+            f.write(_RECORD_HEADER.pack(len(key), tag))
+            f.write(key)
+    for p in paths:
+        os.remove(p)
+    return merged
+
+
+def _right_maximal_paths(successors: List[List[int]], start: int) -> Iterator[List[int]]:
+    """Yields every simple path from `start` that cannot be extended at its end."""
+    path = [start]
+    on_path = {start}
+    iterators = [iter(successors[start])]
+    extended = [False]
+    while iterators:
+        for succ in iterators[-1]:
+            if succ not in on_path:
+                extended[-1] = True
+                path.append(succ)
+                on_path.add(succ)
+                iterators.append(iter(successors[succ]))
+                extended.append(False)
+                break
+        else:
+            if not extended[-1]:
+                yield path
+            iterators.pop()
+            extended.pop()
+            on_path.discard(path.pop())
+
+
+def iter_prime_paths_external(builder, temp_dir: Optional[str] = None,
+                              memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                              stats: Optional[Dict[str, int]] = None) -> Iterator[List[CFGNode]]:
+    """
+    Yields the prime paths of a built CFG, spilling sorted runs under `temp_dir`
+    (system default if None) whenever the record buffer would exceed half of
+    `memory_limit` bytes. If `stats` is given it is filled with counters.
+    """
+    nodes = list(builder.nodes.values())
+    if not builder.entry_node or not nodes:
+        return
+    index_of = {node.id: i for i, node in enumerate(nodes)}
+    successors = [
+        list(dict.fromkeys(index_of[s.id] for s in builder.get_successors(node) if s.id in index_of))
+        for node in nodes
+    ]
+    encode, decode = _encoder(len(nodes))
+    buffer_budget = max(memory_limit // 2, 1)
+    counters = stats if stats is not None else {}
+    counters.update(candidates=0, runs=0, spilled_bytes=0)
+
+    with tempfile.TemporaryDirectory(prefix="prime_paths_", dir=temp_dir) as run_dir:
+        runs: List[str] = []
+        buffer: List[Tuple[bytes, int]] = []
+        buffered_bytes = 0
+        for start in range(len(nodes)):
+            for path in _right_maximal_paths(successors, start):
+                key = encode(path)
+                buffer.append((key, CANDIDATE))
+                buffered_bytes += len(key) + _RECORD_OVERHEAD
+                if len(path) > 1:
+                    buffer.append((key[len(key) // len(path):], SUFFIX))
+                    buffered_bytes += len(key) + _RECORD_OVERHEAD
+                counters["candidates"] += 1
+                if buffered_bytes >= buffer_budget:
+                    runs.append(_write_run(buffer, run_dir))
+                    counters["spilled_bytes"] += buffered_bytes
+                    buffer = []
+                    buffered_bytes = 0
+
+        if runs:
+            if buffer:
+                runs.append(_write_run(buffer, run_dir))
+                buffer = []
+            counters["runs"] = len(runs)
+            while len(runs) > MAX_OPEN_RUNS:
+                runs = [_merge_runs(runs[i:i + MAX_OPEN_RUNS], run_dir)
+                        for i in range(0, len(runs), MAX_OPEN_RUNS)]
+            records = heapq.merge(*(_read_run(p) for p in runs))
+        else:
+            buffer.sort()
+            records = iter(buffer)
+
+        current_key: Optional[bytes] = None
+        current_is_suffix = False
+        for key, tag in records:
+            if key != current_key:
+                current_key = key
+                current_is_suffix = False
+            if tag == SUFFIX:
+                current_is_suffix = True
+            elif not current_is_suffix:
+                yield [nodes[i] for i in decode(key)]
+
+
+def find_prime_paths_external(builder, temp_dir: Optional[str] = None,
+                              memory_limit: int = DEFAULT_MEMORY_LIMIT) -> List[List[CFGNode]]:
+    """Same prime paths as CFGBuilder.find_prime_paths, computed out of core."""
+    return list(iter_prime_paths_external(builder, temp_dir=temp_dir, memory_limit=memory_limit))
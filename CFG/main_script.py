@@ -22,11 +22,13 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from CFG.cfg_builder import CFGBuilder # Changed to absolute import from package CFG
-from for_to_while_converter import convert_for_to_while_code # Added import
 
 
 def main():
-    builder = CFGBuilder()
+    # for loops are rewritten as while loops on the parsed tree while building
+    # (same graph as building convert_for_to_while_code's output, without the
+    # unparse and second parse).
+    builder = CFGBuilder(for_to_while=True)
 
     output_basename = "cfg_output"
     code_to_process = """
@@ -52,15 +54,9 @@ while x < y:
             output_basename = first_arg
             print(f"Using output basename: {output_basename}")
 
-    # --- Modification starts ---
     print("\n--- Original Code ---")
     print(code_to_process)
-    print("--- Converting for loops to while loops ---")
-    code_to_process = convert_for_to_while_code(code_to_process)
-    print("\n--- Code After For-Loop Conversion (Input to CFG) ---")
-    print(code_to_process)
-    print("----------------------------------------------------\n")
-    # --- Modification ends ---
+    print("--- Converting for loops to while loops while building the CFG ---\n")
 
     # The following print statement is now redundant due to the new detailed prints.
     # print(
@@ -0,0 +1,181 @@
+"""
+mcdc.py - MC/DC requirement generation for compound conditions.
+
+A condition node built by CFGBuilder keeps its whole test expression (e.g.
+`a and (b or c)`) in `condition_ast`. This module splits such an expression
+into its atomic conditions and computes, for every atom, the unique-cause
+MC/DC independence pairs: two rows of the truth table that differ only in
+that atom and produce different outcomes.
+
+The truth table is never materialised row by row. Each atom is a column of
+2**n bits packed into one Python int (bit `m` is the atom's value in row
+`m`), so evaluating the expression for all rows is a handful of big-int
+`&`, `|` and `^` operations, and the independence pairs for an atom fall out
+of a single shift-and-xor of the outcome column.
+"""
+
+import ast
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from CFG.ast_utils import negate_condition_ast
+
+# 2**20 rows is ~128 KiB per column; beyond that the table itself gets unwieldy.
+MAX_ATOMS = 20
+
+
+def extract_atomic_conditions(condition: ast.expr) -> List[ast.expr]:
+    """
+    Returns the atomic conditions of a boolean expression, left to right.
+    `and`/`or`/`not` are structural; everything else is an atom. Atoms with
+    identical source text are reported once, since they cannot vary
+    independently.
+    """
+    atoms: List[ast.expr] = []
+    seen = set()
+    stack = [condition]
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, ast.BoolOp):
+            stack.extend(reversed(expr.values))
+        elif isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+            stack.append(expr.operand)
+        else:
+            key = ast.unparse(expr).strip()
+            if key not in seen:
+                seen.add(key)
+                atoms.append(expr)
+    return atoms
+
+
+def _atom_column(index: int, row_count: int) -> int:
+    """Bitset over all rows in which atom `index` is true."""
+    half = 1 << index
+    column = ((1 << half) - 1) << half  # `half` zeros followed by `half` ones
+    width = half << 1
+    while width < row_count:
+        column |= column << width
+        width <<= 1
+    return column
+
+
+class MCDCAnalysis:
+    """
+    Truth table and independence pairs for one condition.
+
+    Rows are integer bitmasks: bit `i` of a row is the value of `atoms[i]`.
+    """
+    def __init__(self, condition: ast.expr, max_atoms: int = MAX_ATOMS):
+        self.condition = condition
+        self.atom_nodes: List[ast.expr] = extract_atomic_conditions(condition)
+        if len(self.atom_nodes) > max_atoms:
+            raise ValueError(f"Condition has {len(self.atom_nodes)} atomic conditions; "
+                             f"at most {max_atoms} are supported.")
+        self.atoms: List[str] = [ast.unparse(atom).strip() for atom in self.atom_nodes]
+        self.row_count: int = 1 << len(self.atoms)
+
+        self._full = (1 << self.row_count) - 1
+        self._columns = [_atom_column(i, self.row_count) for i in range(len(self.atoms))]
+        index_of = {text: i for i, text in enumerate(self.atoms)}
+        self.outcomes: int = self._evaluate(condition, index_of)
+
+        # Bit m set <=> rows m (atom false) and m | 1<<i (atom true) form a pair.
+        self._pair_masks: List[int] = []
+        for i, column in enumerate(self._columns):
+            flipped = self.outcomes >> (1 << i)
+            self._pair_masks.append((self.outcomes ^ flipped) & ~column & self._full)
+
+    def _evaluate(self, root: ast.expr, index_of: Dict[str, int]) -> int:
+        # Post-order evaluation with an explicit stack; deep `and`/`or` nesting is fine.
+        results: Dict[int, int] = {}
+        stack: List[Tuple[ast.expr, bool]] = [(root, False)]
+        while stack:
+            expr, children_done = stack.pop()
+            if isinstance(expr, ast.BoolOp):
+                if not children_done:
+                    stack.append((expr, True))
+                    stack.extend((value, False) for value in expr.values)
+                    continue
+                values = [results.pop(id(value)) for value in expr.values]
+                combined = values[0]
+                for value in values[1:]:
+                    combined = combined & value if isinstance(expr.op, ast.And) else combined | value
+                results[id(expr)] = combined
+            elif isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+                if not children_done:
+                    stack.append((expr, True))
+                    stack.append((expr.operand, False))
+                    continue
+                results[id(expr)] = self._full ^ results.pop(id(expr.operand))
+            else:
+                results[id(expr)] = self._columns[index_of[ast.unparse(expr).strip()]]
+        return results[id(root)]
+
+    def outcome(self, row: int) -> bool:
+        """Value of the whole condition for the given row."""
+        return bool((self.outcomes >> row) & 1)
+
+    def describe_row(self, row: int) -> List[str]:
+        """Human-readable assignment for a row, e.g. ['a', 'not b', 'c >= 1']."""
+        parts = []
+        for i, atom in enumerate(self.atom_nodes):
+            if (row >> i) & 1:
+                parts.append(self.atoms[i])
+            else:
+                parts.append(ast.unparse(negate_condition_ast(atom)).strip())
+        return parts
+
+    def pair_count(self, atom_index: int) -> int:
+        return self._pair_masks[atom_index].bit_count()
+
+    def is_independent(self, atom_index: int) -> bool:
+        """True if the atom can be shown to independently affect the outcome."""
+        return self._pair_masks[atom_index] != 0
+
+    def independence_pairs(self, atom_index: int) -> Iterator[Tuple[int, int]]:
+        """Yields (row_with_atom_false, row_with_atom_true) pairs in row order."""
+        mask = self._pair_masks[atom_index]
+        bit = 1 << atom_index
+        while mask:
+            low = mask & -mask
+            row = low.bit_length() - 1
+            yield row, row | bit
+            mask ^= low
+
+    def requirements(self, max_pairs_per_atom: Optional[int] = None) -> Dict[str, List[Tuple[int, int]]]:
+        """Independence pairs per atom, optionally truncated."""
+        result = {}
+        for i, atom in enumerate(self.atoms):
+            pairs = []
+            for pair in self.independence_pairs(i):
+                if max_pairs_per_atom is not None and len(pairs) >= max_pairs_per_atom:
+                    break
+                pairs.append(pair)
+            result[atom] = pairs
+        return result
+
+    def __repr__(self) -> str:
+        return (f"MCDCAnalysis(atoms={self.atoms}, "
+                f"independent={[self.is_independent(i) for i in range(len(self.atoms))]})")
+
+
+def analyze_condition(condition: ast.expr, max_atoms: int = MAX_ATOMS) -> MCDCAnalysis:
+    return MCDCAnalysis(condition, max_atoms=max_atoms)
+
+
+def attach_mcdc_requirements(builder, max_atoms: int = MAX_ATOMS) -> Dict[int, MCDCAnalysis]:
+    """
+    Analyzes every condition node of a built CFG that carries a test expression
+    and stores the result in `node.mcdc_requirements`. Returns {node_id: analysis}.
+    """
+    analyses = {}
+    for node_id, node in builder.nodes.items():
+        if node.node_type != "condition" or node.condition_ast is None:
+            continue
+        try:
+            analysis = MCDCAnalysis(node.condition_ast, max_atoms=max_atoms)
+        except ValueError as e:
+            print(f"Warning: Skipping MC/DC for node {node_id}: {e}")
+            continue
+        node.mcdc_requirements = analysis
+        analyses[node_id] = analysis
+    return analyses
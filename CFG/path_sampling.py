@@ -0,0 +1,184 @@
+"""
+path_sampling.py - Approximate prime path coverage by random walks.
+
+Exact prime path enumeration (CFGBuilder.find_prime_paths) is exponential in
+the number of branches. For functions where that is hopeless, this module
+draws random walks over the CFG instead. Each walk prefers edges that have
+been sampled rarely so far, its maximal simple subpaths are extended at both
+ends until they cannot grow any further, and every such non-extendable simple
+path is a prime path. Discovery frequencies feed a Chao1 species-richness
+estimate of the total number of prime paths.
+
+Memory use does not grow with the number of walks: one walk buffer, one
+counter per edge, and at most `max_paths` stored prime paths.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from CFG.cfg_node import CFGNode
+
+
+class PrimePathSample:
+    """Result of sample_prime_paths."""
+    def __init__(self, paths: List[List[CFGNode]], discovery_counts: List[int], walks: int,
+                 convergence: List[Tuple[int, int]], estimated_total: float,
+                 saturated: bool, elapsed: float):
+        self.paths = paths                        # Distinct prime paths found
+        self.discovery_counts = discovery_counts  # How often each path was found
+        self.walks = walks                        # Number of walks performed
+        self.convergence = convergence            # (walks done, distinct paths so far)
+        self.estimated_total = estimated_total    # Chao1 estimate of all prime paths
+        self.saturated = saturated                # True if max_paths was reached
+        self.elapsed = elapsed                    # Seconds spent sampling
+
+    @property
+    def estimated_coverage(self) -> float:
+        """Fraction of the estimated prime paths that were found."""
+        if not self.estimated_total:
+            return 1.0
+        return min(1.0, len(self.paths) / self.estimated_total)
+
+    def __repr__(self) -> str:
+        return (f"PrimePathSample(found={len(self.paths)}, estimated_total={self.estimated_total:.1f}, "
+                f"walks={self.walks}, saturated={self.saturated})")
+
+
+def chao1_estimate(discovery_counts: List[int]) -> float:
+    """Bias-corrected Chao1 estimate of the number of distinct items."""
+    observed = len(discovery_counts)
+    singletons = sum(1 for c in discovery_counts if c == 1)
+    doubletons = sum(1 for c in discovery_counts if c == 2)
+    return observed + singletons * (singletons - 1) / (2 * (doubletons + 1))
+
+
+def _pick_least_sampled(rng: random.Random, current: int, candidates: List[int],
+                        edge_counts: Dict[Tuple[int, int], int], forward: bool) -> int:
+    """Chooses among candidate neighbours with probability ~ 1 / (1 + times the edge was used)."""
+    if len(candidates) == 1:
+        return candidates[0]
+    weights = []
+    for other in candidates:
+        edge = (current, other) if forward else (other, current)
+        weights.append(1.0 / (1 + edge_counts.get(edge, 0)))
+    return rng.choices(candidates, weights=weights)[0]
+
+
+def sample_prime_paths(builder, max_walks: int = 1000, max_walk_length: Optional[int] = None,
+                       time_budget: Optional[float] = None, max_paths: int = 10000,
+                       seed: Optional[int] = None) -> PrimePathSample:
+    """
+    Samples prime paths of a built CFG with random walks.
+
+    Args:
+      builder: a CFGBuilder (or anything with `nodes` and `get_successors`).
+      max_walks: upper bound on the number of walks.
+      max_walk_length: nodes per walk; defaults to twice the node count.
+      time_budget: optional wall-clock limit in seconds.
+      max_paths: cap on stored distinct paths; once reached, sampling stops.
+      seed: seed for reproducible sampling.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    nodes_by_id = builder.nodes
+    node_ids = list(nodes_by_id.keys())
+    if not node_ids:
+        return PrimePathSample([], [], 0, [], 0.0, False, 0.0)
+
+    successors: Dict[int, List[int]] = {}
+    predecessors: Dict[int, List[int]] = {node_id: [] for node_id in node_ids}
+    for node_id, node in nodes_by_id.items():
+        succ_ids = list(dict.fromkeys(s.id for s in builder.get_successors(node) if s.id in nodes_by_id))
+        successors[node_id] = succ_ids
+        for succ_id in succ_ids:
+            predecessors[succ_id].append(node_id)
+
+    if max_walk_length is None:
+        max_walk_length = 2 * len(node_ids)
+
+    edge_counts: Dict[Tuple[int, int], int] = {}
+    found: Dict[Tuple[int, ...], int] = {}
+    convergence: List[Tuple[int, int]] = []
+    next_checkpoint = 1
+    walk: List[int] = []
+    saturated = False
+    walks_done = 0
+
+    while walks_done < max_walks and not saturated:
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+
+        # 1. Draw one walk, steering towards rarely used edges.
+        walk.clear()
+        current = rng.choice(node_ids)
+        walk.append(current)
+        while len(walk) < max_walk_length and successors[current]:
+            nxt = _pick_least_sampled(rng, current, successors[current], edge_counts, forward=True)
+            edge_counts[(current, nxt)] = edge_counts.get((current, nxt), 0) + 1
+            walk.append(nxt)
+            current = nxt
+        walks_done += 1
+
+        # 2. Split it into maximal simple windows and grow each into a prime path.
+        window_start = 0
+        last_seen: Dict[int, int] = {}
+        for position in range(len(walk) + 1):
+            at_end = position == len(walk)
+            repeated = not at_end and last_seen.get(walk[position], -1) >= window_start
+            if at_end or repeated:
+                path = _extend_to_prime(rng, walk[window_start:position], successors, predecessors, edge_counts)
+                key = tuple(path)
+                if key in found:
+                    found[key] += 1
+                elif len(found) < max_paths:
+                    found[key] = 1
+                else:
+                    saturated = True
+                if repeated:
+                    window_start = last_seen[walk[position]] + 1
+            if not at_end:
+                last_seen[walk[position]] = position
+
+        if walks_done == next_checkpoint:
+            convergence.append((walks_done, len(found)))
+            next_checkpoint *= 2
+
+    if not convergence or convergence[-1][0] != walks_done:
+        convergence.append((walks_done, len(found)))
+
+    counts = list(found.values())
+    paths = [[nodes_by_id[node_id] for node_id in key] for key in found]
+    return PrimePathSample(paths, counts, walks_done, convergence, chao1_estimate(counts),
+                           saturated, time.perf_counter() - started)
+
+
+def _extend_to_prime(rng: random.Random, path: List[int], successors: Dict[int, List[int]],
+                     predecessors: Dict[int, List[int]],
+                     edge_counts: Dict[Tuple[int, int], int]) -> List[int]:
+    """
+    Grows a simple path at both ends until no neighbour outside the path is left.
+    A simple path that cannot be extended either way is not a subpath of any
+    other simple path, i.e. it is prime.
+    """
+    on_path = set(path)
+    while True:
+        options = [s for s in successors[path[-1]] if s not in on_path]
+        if not options:
+            break
+        nxt = _pick_least_sampled(rng, path[-1], options, edge_counts, forward=True)
+        path.append(nxt)
+        on_path.add(nxt)
+    prefix: List[int] = []
+    head = path[0]
+    while True:
+        options = [p for p in predecessors[head] if p not in on_path]
+        if not options:
+            break
+        head = _pick_least_sampled(rng, head, options, edge_counts, forward=False)
+        prefix.append(head)
+        on_path.add(head)
+    if prefix:
+        prefix.reverse()
+        path = prefix + path
+    return path
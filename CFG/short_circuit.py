@@ -0,0 +1,147 @@
+"""
+short_circuit.py - Expands `and`/`or` conditions into their real branches.
+
+A condition node built from `if a and b or c:` tests the whole expression at
+once, while the interpreter evaluates `a`, then maybe `b`, then maybe `c`.
+expand_short_circuits replaces every such node with a chain of atomic
+condition nodes, one per operand, wired with short-circuit edges:
+
+    a --true--> b --true--> (if body)
+    a --false-> c           b --false-> c
+    c --true--> (if body)   c --false-> (else / next statement)
+
+`not` swaps the two targets of its operand. Each atomic node has
+`condition_ast` set to its operand, branch_node/else_node to its true/false
+targets, and labels taken from the operand and its negation
+(negate_condition_ast). The original node becomes the first atom, so edges
+into the condition (including loop back edges) stay valid; the new nodes are
+numbered right after it.
+
+The expansion runs on a built graph, so plain builds pay nothing for it.
+CFGBuilder(expand_conditions=True) applies it after each build, e.g. to
+every function a CFGForest builds on demand.
+"""
+
+import ast
+from typing import Dict, List, Optional, Tuple
+
+from CFG.ast_utils import negate_condition_ast
+from CFG.cfg_node import CFGNode, NodeKind, SourceText
+
+
+def _is_compound(expr: Optional[ast.expr]) -> bool:
+    while isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+        expr = expr.operand
+    return isinstance(expr, ast.BoolOp)
+
+
+def _atoms(condition: ast.expr) -> List[ast.expr]:
+    """Operands that are neither `and`/`or` nor `not`, left to right (repeats included)."""
+    atoms = []
+    stack = [condition]
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, ast.BoolOp):
+            stack.extend(reversed(expr.values))
+        elif isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+            stack.append(expr.operand)
+        else:
+            atoms.append(expr)
+    return atoms
+
+
+def _leftmost_atom(expr: ast.expr) -> ast.expr:
+    while True:
+        if isinstance(expr, ast.BoolOp):
+            expr = expr.values[0]
+        elif isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+            expr = expr.operand
+        else:
+            return expr
+
+
+def _label_atom(node: CFGNode, atom: ast.expr):
+    node.condition_ast = atom
+    node.mcdc_requirements = None
+    node.true_condition_label = SourceText("{}", atom)
+    negated = negate_condition_ast(atom)
+    node.false_condition_label = SourceText("{}", negated) if negated else SourceText("not ({})", atom)
+
+
+def expand_condition(builder, node: CFGNode) -> List[CFGNode]:
+    """
+    Expands one condition node in place and returns the nodes it added (empty
+    if its condition has no `and`/`or`). Node ids are not renumbered; see
+    expand_short_circuits.
+    """
+    condition = node.condition_ast
+    if node.kind is not NodeKind.CONDITION or not _is_compound(condition):
+        return []
+    true_target = node.branch_node
+    false_target = node.else_node if node.else_node is not None else node.next_node
+
+    atoms = _atoms(condition)
+    # The first atom keeps the statement's keyword, e.g. "if a" / "while a".
+    original = node._statements[0] if node.has_statements else None
+    template = original.template if isinstance(original, SourceText) and len(original.parts) == 1 else "{}"
+    atom_nodes: Dict[int, CFGNode] = {id(atoms[0]): node}
+    node.statements = [SourceText(template, atoms[0])]
+    node.span = node._statements[0].span
+    _label_atom(node, atoms[0])
+    added = []
+    for atom in atoms[1:]:
+        atom_node = builder.new_node(statements=[SourceText("{}", atom)], node_type="condition")
+        _label_atom(atom_node, atom)
+        atom_nodes[id(atom)] = atom_node
+        added.append(atom_node)
+
+    # (expression, target if true, target if false)
+    stack: List[Tuple[ast.expr, Optional[CFGNode], Optional[CFGNode]]] = [(condition, true_target, false_target)]
+    while stack:
+        expr, on_true, on_false = stack.pop()
+        if isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+            stack.append((expr.operand, on_false, on_true))
+        elif isinstance(expr, ast.BoolOp):
+            is_and = isinstance(expr.op, ast.And)
+            for value, following in zip(expr.values, expr.values[1:] + [None]):
+                next_entry = atom_nodes[id(_leftmost_atom(following))] if following is not None else None
+                if is_and:
+                    stack.append((value, next_entry if following is not None else on_true, on_false))
+                else:
+                    stack.append((value, on_true, next_entry if following is not None else on_false))
+        else:
+            atom_node = atom_nodes[id(expr)]
+            atom_node.branch_node, atom_node.else_node, atom_node.next_node = on_true, on_false, None
+    return added
+
+
+def expand_short_circuits(builder) -> int:
+    """
+    Expands every compound condition of a built CFG (see the module docstring)
+    and renumbers the nodes so that each chain's nodes are consecutive.
+    Returns the number of condition nodes that were expanded.
+    """
+    expanded: Dict[int, List[CFGNode]] = {}
+    for node in list(builder.nodes.values()):
+        added = expand_condition(builder, node)
+        if added:
+            expanded[id(node)] = added
+    if not expanded:
+        return 0
+
+    ordered = []
+    added_ids = {id(n) for group in expanded.values() for n in group}
+    for node in sorted(builder.nodes.values(), key=lambda n: n.id):
+        if id(node) in added_ids:
+            continue
+        ordered.append(node)
+        ordered.extend(expanded.get(id(node), ()))
+    builder.nodes = {}
+    for new_id, node in enumerate(ordered, 1):
+        node.id = new_id
+        builder.nodes[new_id] = node
+    builder.current_id = len(ordered)
+    if builder._graph_listeners:
+        builder._notify_graph_changed("nodes")
+        builder._notify_graph_changed("edges")
+    return len(expanded)
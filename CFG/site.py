@@ -21,6 +21,10 @@ from CFG.cfg_node import CFGNode  # If needed for type hints
 
 app = Flask(__name__)
 
+# One builder serves every request, including concurrent ones: build_cfg_result
+# builds in a private scratch copy and never modifies it (see CFG/cfg_result.py).
+cfg_builder = CFGBuilder()
+
 # HTML Template as string (simple form with textarea and image display)
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -68,13 +72,12 @@ def index():
         code = request.form.get('code', '')
         if code.strip():
             try:
-                # Build CFG using the provided CFGBuilder
-                builder = CFGBuilder()
-                entry_node = builder.build_cfg(code)
+                # Build CFG using the shared CFGBuilder
+                result = cfg_builder.build_cfg_result(code)
 
-                if entry_node:
+                if result is not None:
                     # Generate DOT string
-                    dot_output = builder.to_dot(show_statement_text=True)
+                    dot_output = result.to_dot(show_statement_text=True)
 
                     # Use Graphviz to convert DOT to PNG in memory
                     dot_process = subprocess.Popen(
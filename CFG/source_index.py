@@ -0,0 +1,103 @@
+"""
+source_index.py - Interval index from source positions to CFG nodes.
+
+Every node built from source carries `span`, (lineno, col_offset, end_lineno,
+end_col_offset) of the statement, condition or keyword it stands for; only
+nodes with no source of their own (entry, exit, loop exits, empty blocks,
+dispatch nodes, `else`/`finally` markers) have None. A SourceIndex sorts the
+spans once and answers line and range queries in O(log n + k), which is what
+mapping a traceback frame, a coverage record or an editor cursor to nodes
+needs:
+
+    index = builder.get_analysis_manager().get("source_index")
+    index.at_line(12)          # nodes whose span covers line 12
+    index.at(12, 8)            # the innermost node at line 12, column 8
+    index.in_range(10, 20)     # nodes overlapping lines 10-20
+
+Spans can nest (the statement right after an if or match statement is built
+as a single node, so a compound one covers its whole body), so the index is
+an interval tree: an implicit balanced tree over the spans sorted by start,
+where every subtree records the last line any of its spans reaches. In
+basic-block builds the member statements are indexed and reported as their
+blocks.
+"""
+
+from typing import List, Optional, Tuple
+
+from CFG.cfg_node import CFGNode
+
+Span = Tuple[int, int, int, int]
+
+
+class SourceIndex:
+    """Static interval index over the spans of one built CFG."""
+
+    def __init__(self, builder):
+        entries = []
+        statement_nodes = getattr(builder, "statement_nodes", None)
+        if statement_nodes is not None:
+            for node in statement_nodes.values():
+                block = builder.block_of(node)
+                if node.span is not None and block is not None:
+                    entries.append((node.span, node.id, block))
+        else:
+            entries = [(node.span, node.id, node) for node in builder.nodes.values() if node.span is not None]
+        entries.sort(key=lambda entry: entry[:2])
+        self._spans: List[Span] = [entry[0] for entry in entries]
+        self._nodes: List[CFGNode] = [entry[2] for entry in entries]
+        self._starts: List[int] = [span[0] for span in self._spans]
+        self._ends: List[int] = [span[2] for span in self._spans]
+        # _reach[mid]: last line covered by any span of the subtree rooted at mid.
+        self._reach: List[int] = list(self._ends)
+        self._fill_reach(0, len(entries))
+
+    def _fill_reach(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return 0
+        mid = (lo + hi) // 2
+        reach = max(self._ends[mid], self._fill_reach(lo, mid), self._fill_reach(mid + 1, hi))
+        self._reach[mid] = reach
+        return reach
+
+    def _collect(self, lo: int, hi: int, first: int, last: int, found: List[int]):
+        """Appends, in span order, the positions of spans overlapping lines first..last."""
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._reach[mid] < first:
+            return
+        self._collect(lo, mid, first, last, found)
+        if self._starts[mid] <= last:  # Otherwise the spans after mid start after `last` too.
+            if self._ends[mid] >= first:
+                found.append(mid)
+            self._collect(mid + 1, hi, first, last, found)
+
+    def _matching(self, first: int, last: int) -> List[int]:
+        found: List[int] = []
+        self._collect(0, len(self._spans), first, last, found)
+        return found
+
+    def in_range(self, first_line: int, last_line: int) -> List[CFGNode]:
+        """Nodes whose span overlaps lines first_line..last_line (inclusive), in source order."""
+        nodes = dict.fromkeys(self._nodes[i] for i in self._matching(first_line, last_line))
+        return list(nodes)
+
+    def at_line(self, line: int) -> List[CFGNode]:
+        """Nodes whose span covers the line, in source order."""
+        return self.in_range(line, line)
+
+    def at(self, line: int, col: int) -> Optional[CFGNode]:
+        """The innermost node whose span contains the position (col is 0-based, like ast)."""
+        best_key, best_node = None, None
+        for i in self._matching(line, line):
+            start_line, start_col, end_line, end_col = self._spans[i]
+            if (start_line, start_col) <= (line, col) < (end_line, end_col):
+                # Innermost: the latest start, then the earliest end.
+                key = (start_line, start_col, -end_line, -end_col)
+                if best_key is None or key > best_key:
+                    best_key, best_node = key, self._nodes[i]
+        return best_node
+
+    def __len__(self) -> int:
+        """Number of indexed spans."""
+        return len(self._spans)
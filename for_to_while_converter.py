@@ -1,4 +1,5 @@
 import ast
+import copy
 import sys
 
 # Helper to unparse if ast.unparse is not available (e.g. Python < 3.9)
@@ -14,11 +15,54 @@ class ForToWhileTransformer(ast.NodeTransformer):
     """
     Transforms 'for' loops into equivalent 'while' loops.
     Handles 'for x in range(...)' and 'for x in iterable'.
+
+    Copy-on-write: the input tree is never modified. A node with a rewritten
+    descendant is replaced by a shallow copy with new field values, and
+    unchanged subtrees are shared with the input.
     """
     def __init__(self):
         super().__init__()
         self._iterator_count = 0
 
+    def generic_visit(self, node):
+        changes = {}
+        for field, old_value in ast.iter_fields(node):
+            if isinstance(old_value, list):
+                new_values = []
+                changed = False
+                for value in old_value:
+                    if isinstance(value, ast.AST):
+                        new_node = self.visit(value)
+                        changed = changed or new_node is not value
+                        if new_node is None:
+                            continue
+                        if not isinstance(new_node, ast.AST):
+                            new_values.extend(new_node)
+                            continue
+                        value = new_node
+                    new_values.append(value)
+                if changed:
+                    changes[field] = new_values
+            elif isinstance(old_value, ast.AST):
+                new_node = self.visit(old_value)
+                if new_node is not old_value:
+                    changes[field] = new_node
+        if not changes:
+            return node
+        new_node = copy.copy(node)
+        for field, value in changes.items():
+            setattr(new_node, field, value)
+        return new_node
+
+    def _unchanged_loop(self, node, body, orelse):
+        """The loop itself, with its (already transformed) body and else block."""
+        if body == node.body and orelse == node.orelse:
+            return node
+        new_node = copy.copy(node)
+        new_node.body = body
+        new_node.orelse = orelse
+        return new_node
+
     def _generate_iterator_name(self):
         name = f"_iterator_{self._iterator_count}"
         self._iterator_count += 1
@@ -68,16 +112,12 @@ class ForToWhileTransformer(ast.NodeTransformer):
                 end_node = range_args[1]
                 step_node = range_args[2]
             else:
-                node.body = transformed_body
-                node.orelse = transformed_orelse
-                return self.generic_visit(node)
+                return self._unchanged_loop(node, transformed_body, transformed_orelse)
 
             all_arg_nodes_for_check = [start_node, end_node, step_node]
             for arg_node in all_arg_nodes_for_check:
                 if isinstance(arg_node, ast.Name) and arg_node.id == loop_var:
-                    node.body = transformed_body
-                    node.orelse = transformed_orelse
-                    return self.generic_visit(node)
+                    return self._unchanged_loop(node, transformed_body, transformed_orelse)
 
             init_assign = ast.Assign(
                 targets=[ast.Name(id=loop_var, ctx=ast.Store())],
@@ -111,7 +151,7 @@ class ForToWhileTransformer(ast.NodeTransformer):
                 body=transformed_body + [increment_assign],
                 orelse=transformed_orelse
             )
-            return [init_assign, while_loop]
+            return [ast.copy_location(init_assign, node), ast.copy_location(while_loop, node)]
 
         else:
             iterator_var_name = self._generate_iterator_name()
@@ -145,7 +185,21 @@ class ForToWhileTransformer(ast.NodeTransformer):
                 orelse=transformed_orelse
             )
 
-            return [iterator_init, while_true_loop]
+            return [ast.copy_location(iterator_init, node), ast.copy_location(while_true_loop, node)]
+
+def convert_for_to_while_ast(tree: ast.AST) -> ast.AST:
+    """
+    Transforms the for-loops of an AST into while-loops and returns the new
+    root; `tree` itself is left untouched (see ForToWhileTransformer). A bare
+    `for` statement becomes a Module holding its replacement statements. New
+    nodes get the location of the loop they replace; everything else keeps
+    its original position.
+    """
+    transformed_ast = ForToWhileTransformer().visit(tree)
+    if isinstance(transformed_ast, list):
+        transformed_ast = ast.Module(body=transformed_ast, type_ignores=[])
+    ast.fix_missing_locations(transformed_ast)
+    return transformed_ast
 
 # This is the new helper function
 def convert_for_to_while_code(code_string: str) -> str:
@@ -156,9 +210,7 @@ def convert_for_to_while_code(code_string: str) -> str:
     # No need to re-import them here if this function is part of the same file.
     try:
         parsed_ast = ast.parse(code_string)
-        transformer = ForToWhileTransformer()
-        transformed_ast = transformer.visit(parsed_ast)
-        ast.fix_missing_locations(transformed_ast)
+        transformed_ast = convert_for_to_while_ast(parsed_ast)
         # Use the module-level unparse_ast_node for consistency
         return unparse_ast_node(transformed_ast)
     except SyntaxError as e:
@@ -0,0 +1,98 @@
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+
+
+SOURCE = """
+x = 0
+while x < 10:
+    if x > 5:
+        y = 1
+    x = x + 1
+print(x)
+"""
+
+
+class TestAnalysisManager(unittest.TestCase):
+
+    def setUp(self):
+        self.builder = CFGBuilder()
+        self.builder.build_cfg(SOURCE, graph_name="managed")
+        self.manager = self.builder.get_analysis_manager()
+
+    def _node(self, text):
+        for node in self.builder.nodes.values():
+            if node.statements and node.statements[0] == text:
+                return node
+        self.fail(f"node '{text}' not found")
+
+    def test_manager_is_attached_once(self):
+        self.assertIs(self.builder.get_analysis_manager(), self.manager)
+
+    def test_results_are_cached(self):
+        first = self.manager.get("prime_paths")
+        second = self.manager.get("prime_paths")
+        self.assertIs(first, second)
+        self.assertEqual(self.manager.misses, 1)
+        self.assertEqual(self.manager.hits, 1)
+
+    def test_builtin_analyses(self):
+        loop = self._node("while x < 10")
+        increment = self._node("x = x + 1")
+        entry_id = self.builder.entry_node.id
+
+        loop_sccs = [c for c in self.manager.get("sccs") if len(c) > 1]
+        self.assertEqual(len(loop_sccs), 1)
+        self.assertIn(loop.id, loop_sccs[0])
+        self.assertIn(increment.id, loop_sccs[0])
+
+        self.assertEqual(self.manager.get("reachability"), set(self.builder.nodes))
+        idom = self.manager.get("dominators")
+        self.assertEqual(idom[entry_id], entry_id)
+        loop_exit = self.builder.nodes[loop.else_node.id]
+        self.assertEqual(idom[loop_exit.id], loop.id)
+        self.assertEqual(idom[self._node("print(x)").id], loop_exit.id)
+        self.assertEqual(idom[increment.id], self._node("if x > 5").id)
+
+        metrics = self.manager.get("metrics")
+        self.assertEqual(metrics["node_count"], len(self.builder.nodes))
+        self.assertEqual(metrics["decision_points"], 2)
+        self.assertEqual(metrics["cyclomatic_complexity"], 3)
+        self.assertEqual(metrics["loops"], 1)
+
+    def test_edge_change_invalidates_dependents_only(self):
+        self.manager.register("node_count", lambda b, m: len(b.nodes), depends_on=("nodes",))
+        self.manager.get("metrics")
+        self.manager.get("node_count")
+
+        printer = self._node("print(x)")
+        extra = self.builder.new_node(statements=["z = 1"], node_type="assignment")
+        self.assertFalse(self.manager.is_cached("node_count"))
+        self.assertFalse(self.manager.is_cached("metrics"))
+
+        self.manager.get("node_count")
+        self.manager.get("metrics")
+        self.builder._link_predecessor_to_successor(printer, extra)
+        self.assertTrue(self.manager.is_cached("node_count"))
+        self.assertFalse(self.manager.is_cached("successors"))
+        self.assertFalse(self.manager.is_cached("sccs"))
+        self.assertFalse(self.manager.is_cached("metrics"))
+        self.assertIn(extra.id, self.manager.get("reachability"))
+
+    def test_rebuild_invalidates_everything(self):
+        self.manager.get("metrics")
+        self.builder.build_cfg("a = 1", graph_name="other")
+        self.assertEqual(self.manager.cached_analyses(), [])
+        self.assertEqual(self.manager.get("metrics")["node_count"], 2)
+
+    def test_registration_errors(self):
+        with self.assertRaises(ValueError):
+            self.manager.register("broken", lambda b, m: None, depends_on=("missing",))
+        with self.assertRaises(ValueError):
+            self.manager.register("successors", lambda b, m: None, depends_on=("metrics",))
+        with self.assertRaises(KeyError):
+            self.manager.get("missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
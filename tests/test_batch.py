@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+
+from CFG.batch import discover_python_files, main, run_batch
+
+
+FILES = {
+    "pkg/a.py": """
+def f(x):
+    if x:
+        return 1
+    return 2
+
+class C:
+    def m(self):
+        while self.x:
+            self.x -= 1
+""",
+    "pkg/sub/b.py": "y = [lambda v: v + 1]\n",
+    "pkg/broken.py": "def broken(:\n",
+    "pkg/__pycache__/skip.py": "x = 1\n",
+    "pkg/notes.txt": "not python",
+}
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "repo")
+        for relative, content in FILES.items():
+            path = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        self.output = os.path.join(self._tmp.name, "out")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _records(self):
+        with open(os.path.join(self.output, "results.jsonl")) as f:
+            return {(os.path.basename(r["file"]), r["qualname"]): r for r in map(json.loads, f)}
+
+    def test_discovery_skips_caches(self):
+        names = [os.path.relpath(p, self.root) for p in discover_python_files(self.root)]
+        self.assertEqual(names, [os.path.join("pkg", "a.py"), os.path.join("pkg", "broken.py"),
+                                 os.path.join("pkg", "sub", "b.py")])
+
+    def _check_run(self, workers):
+        summary = run_batch(self.root, self.output, workers=workers, include_paths=True)
+        records = self._records()
+        self.assertEqual(set(records), {("a.py", "<module>"), ("a.py", "f"), ("a.py", "C.m"),
+                                        ("b.py", "<module>"), ("b.py", "<lambda>")})
+        self.assertEqual(summary.files, 3)
+        self.assertEqual(summary.functions, 5)
+        self.assertEqual(len(summary.failures), 1)
+        self.assertTrue(summary.failures[0]["file"].endswith("broken.py"))
+        f_record = records[("a.py", "f")]
+        self.assertTrue(f_record["prime_paths_exact"])
+        self.assertEqual(f_record["prime_path_count"], len(f_record["prime_paths"]))
+        self.assertEqual(f_record["metrics"]["decision_points"], 1)
+        self.assertLessEqual(len(summary.slowest), 5)
+        with open(os.path.join(self.output, "summary.json")) as f:
+            self.assertEqual(json.load(f)["functions"], 5)
+        self.assertIn("Slowest functions:", summary.format_report())
+
+    def test_serial_run(self):
+        self._check_run(workers=1)
+
+    def test_process_pool_run(self):
+        self._check_run(workers=2)
+
+    def test_large_functions_are_sampled(self):
+        run_batch(self.root, self.output, workers=1, prime_path_node_limit=2, sampling_budget=0.5)
+        record = self._records()[("a.py", "C.m")]
+        self.assertFalse(record["prime_paths_exact"])
+        self.assertGreater(record["prime_path_count"], 0)
+
+    def test_warm_cache_rerun(self):
+        cache_dir = os.path.join(self._tmp.name, "cache")
+        cold = run_batch(self.root, self.output, workers=1, include_paths=True, cache_dir=cache_dir)
+        cold_records = self._records()
+        self.assertFalse(any(r.get("cached") for r in cold_records.values()))
+        warm = run_batch(self.root, self.output, workers=1, include_paths=True, cache_dir=cache_dir)
+        warm_records = self._records()
+        self.assertTrue(all(r.get("cached") for r in warm_records.values()))
+        self.assertEqual(warm_records[("a.py", "f")]["prime_paths"], cold_records[("a.py", "f")]["prime_paths"])
+        self.assertEqual((warm.functions, len(warm.failures)), (cold.functions, len(cold.failures)))
+
+    def test_functions_of_a_file_share_one_parse(self):
+        from unittest import mock
+        from CFG import batch
+        many = os.path.join(self._tmp.name, "many")
+        os.makedirs(many)
+        for i in range(12):
+            functions = [f"def f{k}(x):\n" + "".join(f"    x += {j}\n" for j in range((i + k) % 5 + 1))
+                         for k in range(4)]
+            with open(os.path.join(many, f"m{i:02}.py"), "w") as f:
+                f.write("\n".join(functions))
+        batch._forest_cache.clear()
+        with mock.patch.object(batch, "CFGForest", wraps=batch.CFGForest) as forest_class:
+            summary = run_batch(many, self.output, workers=1)
+        self.assertEqual(summary.functions, 12 * 5)
+        # At most once while indexing and once for the function tasks, not once per function.
+        self.assertLessEqual(forest_class.call_count, 2 * 12)
+
+    def test_cli_exit_code(self):
+        self.assertEqual(main([self.root, "-o", self.output, "-j", "1"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from CFG.benchmark import load_functions, main, run_benchmark
+from CFG.cfg_builder import CFGBuilder
+
+
+SOURCE = '''
+def f(x):
+    if x:
+        return 1
+    return 2
+
+class C:
+    def m(self):
+        while self.x:
+            self.x -= 1
+'''
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        with open(os.path.join(self.root, "a.py"), "w") as f:
+            f.write(SOURCE)
+        with open(os.path.join(self.root, "broken.py"), "w") as f:
+            f.write("def broken(:\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_counts_and_digest(self):
+        result = run_benchmark(self.root, repeat=2)
+        self.assertEqual((result.files, result.functions), (2, 2))
+        self.assertEqual(len(result.seconds), 2)
+        self.assertGreater(result.functions_per_second, 0)
+        self.assertEqual(result.nodes, sum(len(CFGBuilder().build(fn, graph_name=fn.name))
+                                           for fn in load_functions([os.path.join(self.root, "a.py")])))
+        # The digest only depends on the graphs built.
+        self.assertEqual(run_benchmark(self.root, repeat=1).digest, result.digest)
+
+    def test_command_line(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main([self.root, "--repeat", "1", "--limit", "1"]), 0)
+        self.assertIn("(1 files, 2 functions", output.getvalue())
+        self.assertIn("Output digest:", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
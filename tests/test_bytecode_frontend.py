@@ -0,0 +1,131 @@
+import ast
+import os
+import py_compile
+import tempfile
+import unittest
+
+from CFG.bytecode_frontend import iter_code_objects, load_pyc
+from CFG.cfg_builder import CFGBuilder
+
+
+CROSS_CHECKED = {
+    "classify": '''
+def classify(x):
+    if x > 0:
+        label = "positive"
+    elif x < 0:
+        label = "negative"
+    else:
+        label = "zero"
+    return label
+''',
+    "flatten": '''
+def flatten(rows):
+    out = []
+    for row in rows:
+        for cell in row:
+            if cell:
+                out.append(cell)
+    return out
+''',
+    "describe": '''
+def describe(x):
+    match x:
+        case 1:
+            return "one"
+        case _:
+            return "many"
+''',
+}
+
+MODULE = '''
+def guarded(path):
+    try:
+        handle = open(path)
+    except OSError:
+        return None
+    return handle
+
+class Box:
+    def size(self):
+        return len(self.items)
+'''
+
+
+def _function_code(source, name):
+    namespace = {}
+    exec(compile(source, "<test>", "exec"), namespace)
+    return namespace[name].__code__
+
+
+class TestBytecodeFrontend(unittest.TestCase):
+
+    def test_matches_ast_frontend_shape(self):
+        for name, source in CROSS_CHECKED.items():
+            with self.subTest(name):
+                from_ast = CFGBuilder(basic_blocks=True)
+                from_ast.build(ast.parse(source).body[0], graph_name=name)
+                from_bytecode = CFGBuilder()
+                from_bytecode.build_code(_function_code(source, name), source=source)
+                self.assertEqual(from_bytecode.get_analysis_manager().get("metrics"),
+                                 from_ast.get_analysis_manager().get("metrics"))
+                returns = [[n for n in b.nodes.values() if n.node_type == "return_statement"]
+                           for b in (from_ast, from_bytecode)]
+                self.assertEqual(len(returns[0]), len(returns[1]))
+                self.assertEqual(from_bytecode.entry_node.statements, [f"Entry to {name}"])
+
+    def test_condition_edges_follow_the_tested_value(self):
+        source = CROSS_CHECKED["classify"]
+        builder = CFGBuilder()
+        builder.build_code(_function_code(source, "classify"), source=source)
+        condition = builder.entry_node.next_node
+        self.assertEqual(condition.node_type, "condition")
+        self.assertEqual(condition.statements, ["if x > 0:"])
+        self.assertEqual(condition.span, (3, 7, 3, 8))
+        self.assertEqual(condition.branch_node.statements, ['label = "positive"'])
+        self.assertEqual(condition.else_node.statements, ["elif x < 0:"])
+
+    def test_exception_handlers_get_try_nodes(self):
+        builder = CFGBuilder()
+        builder.build_code(_function_code(MODULE, "guarded"), source=MODULE)
+        try_node = next(n for n in builder.nodes.values() if n.node_type == "try_block_start")
+        self.assertIs(builder.entry_node.next_node, try_node)
+        self.assertEqual(try_node.branch_node.statements, ["handle = open(path)"])
+        self.assertEqual(try_node.else_node.statements[0], "except OSError:")
+        reachable_returns = {n.statements[-1] for n in builder.nodes.values() if n.node_type == "return_statement"}
+        self.assertEqual(reachable_returns, {"return None", "return handle"})
+
+    def test_build_cfg_frontend_option(self):
+        builder = CFGBuilder()
+        self.assertIsNotNone(builder.build_cfg("x = 1\nif x:\n    y = 2\n", frontend="bytecode"))
+        self.assertEqual(builder.entry_node.statements, ["Entry to cfg"])
+        self.assertEqual(builder.entry_node.next_node.statements, ["x = 1", "if x:"])
+        self.assertIsNone(CFGBuilder().build_cfg("def broken(:\n", frontend="bytecode"))
+        with self.assertRaises(ValueError):
+            CFGBuilder().build_cfg("x = 1\n", frontend="tokens")
+
+    def test_pyc_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = os.path.join(tmp, "sample.py")
+            with open(source_path, "w") as f:
+                f.write(MODULE)
+            pyc_path = py_compile.compile(source_path, cfile=os.path.join(tmp, "sample.pyc"))
+            code = load_pyc(pyc_path)
+            names = [name for name, _ in iter_code_objects(code)]
+            self.assertEqual(names, ["<module>", "guarded", "Box", "Box.size"])
+
+            size_code = dict(iter_code_objects(code))["Box.size"]
+            builder = CFGBuilder()
+            builder.build_code(size_code)  # Source lines come from the file through linecache
+            self.assertEqual(builder.entry_node.statements, ["Entry to Box.size"])
+            self.assertEqual(builder.entry_node.next_node.statements, ["return len(self.items)"])
+
+            os.remove(source_path)
+            with open(source_path + "c", "wb") as f:
+                f.write(b"\0\0\0\0" + bytes(12))
+            with self.assertRaises(ValueError):
+                load_pyc(source_path + "c")
+
+
+if __name__ == "__main__":
+    unittest.main()
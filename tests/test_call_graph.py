@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+from CFG.call_graph import CallGraph, count_paths
+
+
+SOURCE = '''
+import os
+
+def helper(x):
+    if x > 0:
+        return x
+    return -x
+
+class Shape:
+    def __init__(self, n):
+        self.n = helper(n)
+
+    def area(self):
+        def inner():
+            return self.scale(2)
+        return inner()
+
+    def scale(self, k):
+        return self.n * k
+
+class Square(Shape):
+    def area(self):
+        return super().area() + self.scale(1)
+
+def main(values):
+    total = 0
+    for v in values:
+        if helper(v) > 2:
+            total += Square(v).area()
+    print(total, os.path.join("a", "b"))
+    return fact(total)
+
+def fact(n):
+    if n <= 1:
+        return 1
+    return n * fact(n - 1)
+'''
+
+PACKAGE = {
+    "__init__.py": "from .util import helper\n",
+    "util.py": "def helper(x):\n    if x:\n        return 1\n    return 2\n",
+    "app.py": ("import pkg.util as u\nfrom . import util\nfrom pkg import helper\n\n"
+               "def main():\n    return u.helper(1) + util.helper(2) + helper(3)\n"),
+}
+
+
+class TestCallGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = CallGraph.from_source(SOURCE, module="app")
+
+    def test_resolution(self):
+        graph = self.graph
+        self.assertEqual(graph.callees("app:main"), ["app:helper", "app:Shape.__init__", "app:fact"])
+        self.assertEqual(graph.callees("app:Shape.area"), ["app:Shape.area.<locals>.inner"])
+        # `self` of the enclosing method, and a method inherited from a base class.
+        self.assertEqual(graph.callees("app:Shape.area.<locals>.inner"), ["app:Shape.scale"])
+        self.assertEqual(graph.callees("app:Square.area"), ["app:Shape.scale"])
+        self.assertEqual(graph.callees("app:fact"), ["app:fact"])
+        self.assertEqual(graph.callers("app:helper"), ["app:Shape.__init__", "app:main"])
+        unresolved = [site for site in graph.call_sites("app:main") if site.callee is None]
+        self.assertEqual(len(unresolved), 3)  # area() of an expression, print, os.path.join
+
+    def test_package_imports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "pkg")
+            os.mkdir(root)
+            for filename, code in PACKAGE.items():
+                with open(os.path.join(root, filename), "w", encoding="utf-8") as f:
+                    f.write(code)
+            graph = CallGraph.from_package(root)
+        self.assertEqual(sorted(graph.forests), ["pkg", "pkg.app", "pkg.util"])
+        self.assertEqual([site.callee for site in graph.call_sites("pkg.app:main")], ["pkg.util:helper"] * 3)
+        self.assertEqual(graph.interprocedural_path_count("pkg.app:main"), 8)
+
+    def test_path_counts(self):
+        graph = self.graph
+        self.assertEqual(count_paths(graph.builder("app:helper")), 2)
+        # The loop body's paths are counted from the entry and from the loop head.
+        self.assertEqual(graph.summary("app:main").path_count, 6)
+        # helper(v), Square(v) and fact(total) have two paths each.
+        self.assertEqual(graph.interprocedural_path_count("app:main"), 16)
+        self.assertEqual(graph.interprocedural_path_count("app:fact"), 2)
+        self.assertEqual(graph.summary("app:fact").exits, 2)
+
+    def test_summaries_survive_unrelated_edits(self):
+        graph = self.graph
+        helper, main = graph.summary("app:helper"), graph.summary("app:main")
+        graph.update_source("app", SOURCE.replace("total = 0", "total = 1"))
+        self.assertIs(graph.summary("app:helper"), helper)
+        self.assertIsNot(graph.summary("app:main"), main)
+        graph.update_source("app", SOURCE.replace("return -x", "return x"))
+        self.assertIsNot(graph.summary("app:helper"), helper)
+
+    def test_interprocedural_cfg(self):
+        graph = self.graph
+        plain = graph.interprocedural_cfg("app:main", depth=0)
+        self.assertEqual(len(plain), len(graph.builder("app:main").nodes))
+        icfg = graph.interprocedural_cfg("app:main")
+        callee_sizes = sum(len(graph.builder(name).nodes) for name in graph.callees("app:main"))
+        self.assertEqual(len(icfg), len(plain) + callee_sizes)
+        self.assertEqual({icfg.origin(node)[0] for node in icfg.nodes.values()},
+                         {"app:main", "app:helper", "app:Shape.__init__", "app:fact"})
+        # fact is inlined once, never into itself, and its exits are main's.
+        self.assertEqual(sum(1 for n in icfg.nodes.values() if icfg.origin(n)[0] == "app:fact"),
+                         len(graph.builder("app:fact").nodes))
+        # Every path through helper's copy returns to the call site's continuation.
+        call_node = next(n for n in icfg.nodes.values() if n.statements == ["if helper(v) > 2"])
+        entry = icfg.get_successors(call_node)[0]
+        self.assertEqual(icfg.origin(entry)[0], "app:helper")
+        self.assertTrue(icfg.find_prime_paths())
+        deeper = graph.interprocedural_cfg("app:main", depth=2)
+        self.assertEqual(len(deeper), len(icfg) + len(graph.builder("app:helper").nodes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -328,5 +328,144 @@ match c:
             node_x_eq_10_pattern = rf'^\s*{node_x_eq_10_id_str}\s*\[.*label="{node_x_eq_10_id_str}".*xlabel="{re.escape("x = 10")}".*shape=circle.*\];$'
             self.assertTrue(re.search(node_x_eq_10_pattern, dot_string, re.MULTILINE))
 
+    def test_statement_text_is_rendered_lazily_with_spans(self):
+        builder = CFGBuilder()
+        builder.build_cfg("for i in range(3):\n    pass\nx = 1\nif x > 0:\n    y = x\n")
+        condition = next(n for n in builder.nodes.values() if n.condition_ast is not None)
+        self.assertFalse(any(isinstance(s, str) for s in condition._statements))
+        self.assertEqual(condition.span, (4, 3, 4, 8))
+        self.assertEqual(condition.statements, ["if x > 0"])
+        self.assertEqual(condition._statements, ["if x > 0"])  # Rendered once, then kept
+        self.assertEqual((condition.true_condition_label, condition.false_condition_label), ("x > 0", "x <= 0"))
+        loop = self._find_node_by_exact_statement(builder.nodes, "for i in range(3)")
+        self.assertIsNotNone(loop)
+        self.assertEqual(loop.span, (1, 4, 1, 17))
+
+    def test_empty_block_elimination_fan_in_and_cycles(self):
+        builder = CFGBuilder()
+        entry = builder.new_node(statements=["Entry"], node_type="entry")
+        dispatch = builder.new_node(statements=["match x"], node_type="match_dispatcher")
+        exit_node = builder.new_node(statements=["Exit"], node_type="exit")
+        chain = [builder.new_node() for _ in range(2000)]
+        for block, successor in zip(chain, chain[1:]):
+            block.next_node = successor
+        chain[-1].next_node = exit_node
+        for i in range(2000):
+            builder.new_node().next_node = chain[0]
+            dispatch.add_case_branch(f"case {i}", builder.nodes[builder.current_id])
+        loop_a, loop_b = builder.new_node(), builder.new_node()
+        loop_a.next_node, loop_b.next_node = loop_b, loop_a
+        dispatch.next_node = loop_a
+        entry.next_node = dispatch
+        builder.entry_node, builder.exit_node = entry, exit_node
+
+        builder._optimize_empty_blocks()
+        self.assertEqual(set(builder.nodes), {entry.id, dispatch.id, exit_node.id})
+        self.assertTrue(all(target is exit_node for _, target in dispatch.case_branches))
+        # A cycle of empty blocks collapses into a removed self-loop, as before.
+        self.assertIs(dispatch.next_node, loop_b)
+        self.assertIs(loop_b.next_node, loop_b)
+
+    def test_basic_block_mode_merges_straight_line_runs(self):
+        source = "def f(a, b):\n" + "".join(f"    x{i} = a + {i}\n" for i in range(40)) + (
+            "    if x3 > b:\n        y = 1\n        z = 2\n    else:\n        y = 2\n    return y\n")
+        function_ast = ast.parse(source).body[0]
+        per_statement = CFGBuilder()
+        per_statement.build(function_ast, graph_name="f")
+        builder = CFGBuilder(basic_blocks=True)
+        builder.build(function_ast, graph_name="f")
+
+        self.assertEqual(len(per_statement.nodes), 46)
+        self.assertEqual(len(builder.nodes), 5)
+        self.assertEqual(len(builder.statement_nodes), 46)
+        head = builder.entry_node.next_node
+        self.assertEqual(len(head.statements), 41)
+        self.assertEqual((head.node_type, head.statements[-1]), ("condition", "if x3 > b"))
+        self.assertEqual(head.span, (2, 4, 2, 14))
+        self.assertEqual((head.true_condition_label, head.false_condition_label), ("x3 > b", "x3 <= b"))
+        self.assertEqual(builder.block_members[builder.entry_node.id], [builder.statement_nodes[1]])
+        for block_id, members in builder.block_members.items():
+            block = builder.nodes[block_id]
+            self.assertEqual(block.statements, [s for m in members for s in m.statements])
+            self.assertTrue(all(builder.block_of(m) is block for m in members))
+            last = members[-1]
+            self.assertEqual([builder.block_of(n) for n in builder.get_successors(last)],
+                             builder.get_successors(block))
+        self.assertEqual(len(builder.find_prime_paths()), 2)
+
+    def test_statement_dispatch_respects_subclass_overrides(self):
+        source = "def f(a):\n    b = a\n    log(b)\n    if b:\n        b += 1\n    return b\n"
+        function_ast = ast.parse(source).body[0]
+
+        class TaggedAssignments(CFGBuilder):
+            def visit_Assign(self, ast_node, source_node):
+                node = self.new_node(statements=["tagged"], node_type="tagged_assignment")
+                self._link_predecessor_to_successor(source_node, node)
+                return [node]
+
+        class CountingNodes(CFGBuilder):
+            def __init__(self):
+                super().__init__()
+                self.created = 0
+
+            def new_node(self, *args, **kwargs):
+                self.created += 1
+                return super().new_node(*args, **kwargs)
+
+        class LoggingVisit(CFGBuilder):
+            def __init__(self):
+                super().__init__()
+                self.visited = []
+
+            def visit(self, stmt_ast, source_node):
+                self.visited.append(type(stmt_ast).__name__)
+                return super().visit(stmt_ast, source_node)
+
+        plain = CFGBuilder()
+        plain.build(function_ast, graph_name="f")
+        tagged = TaggedAssignments()
+        tagged.build(function_ast, graph_name="f")
+        self.assertEqual([n.node_type for n in tagged.nodes.values()].count("tagged_assignment"), 1)
+        self.assertEqual(tagged.entry_node.next_node.statements, ["tagged"])
+        counting = CountingNodes()
+        counting.build(function_ast, graph_name="f")
+        self.assertEqual(counting.created, 7)  # Including the if body placeholder, removed afterwards
+        logging = LoggingVisit()
+        logging.build(function_ast, graph_name="f")
+        self.assertEqual(logging.visited, ["Assign", "Expr", "AugAssign"])
+        for builder in (counting, logging):
+            self.assertEqual(builder.to_dot(), plain.to_dot())
+        self.assertEqual(CFGBuilder().visit(function_ast.body[1], CFGNode(0))[0].node_type, "function_call")
+
+    def test_for_to_while_option_matches_converted_source(self):
+        from unittest import mock
+        from for_to_while_converter import convert_for_to_while_code
+        source = ("def f(rows, n):\n"
+                  "    total = 0\n"
+                  "    for i in range(1, n, 2):\n"
+                  "        for cell in rows[i]:\n"
+                  "            if cell is None:\n"
+                  "                break\n"
+                  "            total += cell\n"
+                  "        else:\n"
+                  "            continue\n"
+                  "    return total\n")
+        converted = CFGBuilder()
+        converted.build_cfg(convert_for_to_while_code(source))
+        fused = CFGBuilder(for_to_while=True)
+        with mock.patch("ast.unparse", side_effect=AssertionError("unparsed while building")):
+            fused.build_cfg(source)
+        self.assertEqual(fused.to_dot(), converted.to_dot())
+
+        function_ast = ast.parse(source).body[0]
+        dumped = ast.dump(function_ast, include_attributes=True)
+        CFGBuilder(for_to_while=True).build(function_ast, graph_name="f")
+        self.assertEqual(ast.dump(function_ast, include_attributes=True), dumped)  # Input left untouched
+        builder = CFGBuilder(for_to_while=True)
+        builder.build(ast.parse(source).body[0], graph_name="f")
+        loops = [n for n in builder.nodes.values() if n.node_type == "condition" and n.statements[0].startswith("while")]
+        # Positions still refer to the original source.
+        self.assertEqual([n.span[0] for n in loops], [3, 4])
+
 if __name__ == "__main__":
     unittest.main()
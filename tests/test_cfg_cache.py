@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_cache import CFGCache, cache_key
+from CFG.cfg_serialization import cfg_from_dict, cfg_to_dict
+
+
+CODE = """
+def f(x):
+    for i in range(x):
+        if i % 2 == 0 and x > 3:
+            continue
+        try:
+            g(i)
+        except ValueError:
+            break
+    match x:
+        case 1:
+            return "one"
+        case _:
+            return "many"
+"""
+
+
+def _build_in_worker(directory):
+    cached = CFGCache(directory).build_cfg(CODE, graph_name="f")
+    return len(cached.prime_paths())
+
+
+class TestCFGSerialization(unittest.TestCase):
+
+    def test_roundtrip_preserves_graph_and_analyses(self):
+        builder = CFGBuilder()
+        self.assertTrue(builder.build_cfg(CODE, graph_name="f"))
+        restored = cfg_from_dict(json.loads(json.dumps(cfg_to_dict(builder))))
+        self.assertEqual(restored.to_dot(), builder.to_dot())
+        ids = lambda paths: sorted(tuple(n.id for n in p) for p in paths)
+        self.assertEqual(ids(restored.find_prime_paths()), ids(builder.find_prime_paths()))
+        conditions = {n.id: n.condition_ast is not None for n in builder.nodes.values()}
+        self.assertEqual({n.id: n.condition_ast is not None for n in restored.nodes.values()}, conditions)
+
+    def test_roundtrip_keeps_spans_and_block_members(self):
+        for options in ({}, {"basic_blocks": True}):
+            builder = CFGBuilder(**options)
+            builder.build_cfg(CODE, graph_name="f")
+            restored = cfg_from_dict(json.loads(json.dumps(cfg_to_dict(builder))))
+            self.assertEqual([n.span for n in restored.nodes.values()], [n.span for n in builder.nodes.values()])
+            if options:
+                self.assertEqual([[m.span for m in run] for run in restored.block_members.values()],
+                                 [[m.span for m in run] for run in builder.block_members.values()])
+                member = next(iter(restored.statement_nodes.values()))
+                self.assertIs(restored.block_of(member), restored.nodes[1])
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cfg_from_dict({"format": 999, "nodes": []})
+
+
+class TestCFGCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_key_depends_on_source_and_options(self):
+        self.assertEqual(cache_key(CODE, {"a": 1}), cache_key(CODE, {"a": 1}))
+        self.assertNotEqual(cache_key(CODE, {"a": 1}), cache_key(CODE, {"a": 2}))
+        self.assertNotEqual(cache_key(CODE), cache_key(CODE + "\n"))
+
+    def test_hit_reuses_cfg_and_stored_analyses(self):
+        first = CFGCache(self.directory).build_cfg(CODE, graph_name="f")
+        self.assertFalse(first.hit)
+        expected = [[n.id for n in p] for p in first.prime_paths()]
+        metrics = first.metrics()
+
+        cache = CFGCache(self.directory)
+        second = cache.build_cfg(CODE, graph_name="f")
+        self.assertTrue(second.hit)
+        self.assertTrue(second.has_analysis("prime_paths"))
+        self.assertEqual(second.metrics(), metrics)
+        self.assertIsNone(second._builder)  # Stored analyses do not need the graph
+        self.assertEqual([[n.id for n in p] for p in second.prime_paths()], expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_cached_graph_has_a_source_index(self):
+        source = "x = 1\nwhile x < 10:\n    if x % 3:\n        x += 2\n    else:\n        break\nprint(x)\n"
+        fresh = CFGBuilder()
+        fresh.build_cfg(source)
+        CFGCache(self.directory).build_cfg(source)
+        cached = CFGCache(self.directory).build_cfg(source)
+        self.assertTrue(cached.hit)
+        expected = fresh.get_analysis_manager().get("source_index")
+        index = cached.builder.get_analysis_manager().get("source_index")
+        self.assertGreater(len(expected), 1)
+        self.assertEqual(len(index), len(expected))
+        for line in range(1, 9):
+            self.assertEqual([(n.id, n.statements) for n in index.at_line(line)],
+                             [(n.id, n.statements) for n in expected.at_line(line)])
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = CFGCache(self.directory)
+        entry = cache.build_cfg(CODE)
+        with open(cache._path(entry.key), "w") as f:
+            f.write("{truncated")
+        self.assertIsNone(cache.get(CODE, {"graph_name": "cfg"}))
+        self.assertFalse(cache.build_cfg(CODE).hit)
+
+    def test_lru_eviction_keeps_recent_entries(self):
+        cache = CFGCache(self.directory, max_bytes=10 ** 9)
+        sources = [f"x = {i}\nif x:\n    y = {i}\n" for i in range(6)]
+        for i, source in enumerate(sources):
+            entry = cache.build_cfg(source)
+            os.utime(cache._path(entry.key), (i, i))
+        entry_size = os.path.getsize(cache._path(entry.key))
+        cache.get(sources[0], {"graph_name": "cfg"})  # Most recently used now
+
+        cache.max_bytes = entry_size * 4
+        cache.build_cfg("z = 1\n")
+        self.assertLessEqual(cache._total_size(), cache.max_bytes)
+        self.assertIsNotNone(cache.get(sources[0], {"graph_name": "cfg"}))
+        self.assertIsNone(cache.get(sources[1], {"graph_name": "cfg"}))
+
+    def test_rewriting_an_entry_counts_its_size_once(self):
+        cache = CFGCache(self.directory, max_bytes=10 ** 9)
+        entry = cache.build_cfg(CODE, graph_name="f")
+        cache.build_cfg("x = 1\n")  # Starts the running total
+        entry.metrics()
+        entry.prime_paths()
+        self.assertEqual(cache._approx_bytes, cache._total_size())
+        cache.max_bytes = cache._total_size() + 1
+        evicted = []
+        cache._evict = lambda: evicted.append(True)
+        cache._write(entry.key, entry._data)  # Same entry again; the directory does not grow
+        self.assertEqual(evicted, [])
+
+    def test_concurrent_workers_share_entries(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            counts = list(pool.map(_build_in_worker, [self.directory] * 8))
+        self.assertEqual(len(set(counts)), 1)
+        self.assertTrue(CFGCache(self.directory).build_cfg(CODE, graph_name="f").hit)
+        leftovers = [name for _, _, files in os.walk(self.directory) for name in files if name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
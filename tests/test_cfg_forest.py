@@ -0,0 +1,153 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_forest import CFGForest, MODULE_SCOPE
+
+
+SOURCE = '''
+import os
+
+def helper(x, key=lambda v: v):
+    def inner(y):
+        return y * 2
+    if x > 0:
+        return inner(x)
+    return 0
+
+class Shape:
+    def area(self):
+        return 0
+
+    class Meta:
+        def describe(self):
+            return "meta"
+
+    async def load(self):
+        await self.area()
+
+handlers = [lambda e: e.a, lambda e: e.b]
+
+def helper(x):
+    return -x
+'''
+
+
+class TestCFGForest(unittest.TestCase):
+
+    def setUp(self):
+        self.forest = CFGForest.from_source(SOURCE)
+
+    def test_qualified_names(self):
+        self.assertEqual(list(self.forest), [
+            MODULE_SCOPE,
+            "helper",
+            "<lambda>",
+            "helper.<locals>.inner",
+            "Shape.area",
+            "Shape.Meta.describe",
+            "Shape.load",
+            "<lambda>#2",
+            "<lambda>#3",
+            "helper#2",
+        ])
+        expected = {
+            MODULE_SCOPE: "module",
+            "helper": "function",
+            "helper.<locals>.inner": "function",
+            "Shape.area": "method",
+            "Shape.Meta.describe": "method",
+            "Shape.load": "method",
+            "<lambda>": "lambda",
+            "<lambda>#2": "lambda",
+            "<lambda>#3": "lambda",
+            "helper#2": "function",
+        }
+        self.assertEqual({name: self.forest.entry(name).kind for name in self.forest}, expected)
+
+    def test_cfgs_are_built_lazily(self):
+        self.assertEqual(self.forest.built_names(), [])
+        builder = self.forest["helper.<locals>.inner"]
+        self.assertIsInstance(builder, CFGBuilder)
+        self.assertEqual(self.forest.built_names(), ["helper.<locals>.inner"])
+        self.assertIs(self.forest.get("helper.<locals>.inner"), builder)
+        statements = [n.statements[0] for n in builder.nodes.values() if n.statements]
+        self.assertEqual(statements, ["Entry to helper.<locals>.inner", "return y * 2"])
+
+    def test_function_cfg_contains_its_own_branches(self):
+        builder = self.forest["helper"]
+        conditions = [n for n in builder.nodes.values() if n.node_type == "condition"]
+        self.assertEqual([n.statements[0] for n in conditions], ["if x > 0"])
+        self.assertIn("def inner(y):\n    return y * 2",
+                      [n.statements[0] for n in builder.nodes.values() if n.statements])
+
+    def test_lambda_cfg(self):
+        builder = self.forest["<lambda>#2"]
+        returns = [n for n in builder.nodes.values() if n.node_type == "return_statement"]
+        self.assertEqual([n.statements[0] for n in returns], ["return e.a"])
+
+    def test_update_rebuilds_only_changed_scopes(self):
+        before = {name: self.forest[name] for name in ("helper", "Shape.area", "Shape.Meta.describe")}
+        area_nodes = list(before["Shape.area"].nodes.values())
+        edited = SOURCE.replace("import os\n", "import os\nimport sys\n\n")
+        edited = edited.replace('return "meta"', 'return "changed"')
+        edited += "\ndef added():\n    pass\n"
+
+        update = self.forest.update_source(edited)
+        self.assertEqual(update.changed, [MODULE_SCOPE, "Shape.Meta.describe"])
+        self.assertEqual(update.added, ["added"])
+        self.assertEqual(update.removed, [])
+        self.assertIn("helper", update.unchanged)
+        self.assertIs(self.forest["helper"], before["helper"])
+        self.assertEqual(list(self.forest["Shape.area"].nodes.values()), area_nodes)
+        self.assertEqual(self.forest.entry("Shape.area").lineno, 14)  # Moved down by the added import
+        self.assertFalse(self.forest.is_built("Shape.Meta.describe"))
+        self.assertIsNot(self.forest["Shape.Meta.describe"], before["Shape.Meta.describe"])
+
+    def test_kept_builders_follow_the_new_positions(self):
+        source = "def f(x):\n    y = x + 1\n    try:\n        pass\n    except:\n        if y:\n            return y\n"
+        forest = CFGForest.from_source(source)
+        builder = forest.get("f")
+        index = builder.get_analysis_manager().get("source_index")
+        self.assertEqual([n.statements for n in index.at_line(2)], [["y = x + 1"]])
+        edited = "a = 1\nb = 2\n\n" + source.replace("y = x + 1", "y = (x +\n         1)")
+        update = forest.update_source(edited)
+        self.assertEqual(update.unchanged, ["f"])
+        self.assertIs(forest.get("f"), builder)
+        self.assertEqual(forest.entry("f").lineno, 4)
+        index = builder.get_analysis_manager().get("source_index")
+        self.assertEqual(index.at_line(2), [])
+        self.assertEqual([n.statements for n in index.at_line(6)], [["y = x + 1"]])
+        spans = {node.statements[0]: node.span for node in builder.nodes.values() if node.span is not None}
+        self.assertEqual(spans["y = x + 1"], (5, 4, 6, 11))
+        self.assertEqual(spans["try"], (7, 4, 7, 7))
+        self.assertEqual(spans["except"], (9, 4, 9, 10))
+        handler_test = forest.module.body[2].body[1].handlers[0].body[0].test
+        condition = next(n for n in builder.nodes.values() if n.condition_ast is not None)
+        self.assertIs(condition.condition_ast, handler_test)
+
+    def test_for_to_while_builds_leave_the_module_untouched(self):
+        source = "def f(items):\n    for item in items:\n        print(item)\n\nfor x in range(3):\n    f(x)\n"
+        forest = CFGForest.from_source(source, builder_factory=lambda: CFGBuilder(for_to_while=True))
+        for name in forest:
+            forest.get(name)
+        self.assertFalse(any(isinstance(node, ast.While) for node in ast.walk(forest.module)))
+        update = forest.update_source(source)
+        self.assertEqual(update.changed, [])
+        self.assertEqual(update.unchanged, [MODULE_SCOPE, "f"])
+
+    def test_update_reports_removed_scopes_and_keeps_forest_on_syntax_error(self):
+        update = self.forest.update_source(SOURCE.replace("def helper(x):\n    return -x\n", ""))
+        self.assertEqual(update.removed, ["helper#2"])
+        self.assertNotIn("helper#2", self.forest)
+        self.assertIsNone(self.forest.update_source("def broken(:\n"))
+        self.assertIn("helper", self.forest)
+
+    def test_unknown_name_and_syntax_error(self):
+        with self.assertRaises(KeyError):
+            self.forest.get("missing")
+        self.assertIsNone(CFGForest.from_source("def broken(:\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
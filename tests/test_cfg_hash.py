@@ -0,0 +1,85 @@
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_hash import CFGAnalysisMemo, canonical_form, structural_hash
+
+
+VALIDATE_NAME = """
+if not name:
+    raise ValueError("empty")
+result = name.strip()
+"""
+
+VALIDATE_AGE = """
+if age < 0:
+    raise ValueError("negative age")
+value = int(age)
+"""
+
+LOOP = """
+total = 0
+while total < 10:
+    total += 1
+"""
+
+
+def _build(source):
+    builder = CFGBuilder()
+    builder.build_cfg(source)
+    return builder
+
+
+def _id_paths(paths):
+    return sorted(tuple(n.id for n in p) for p in paths)
+
+
+class TestCFGHash(unittest.TestCase):
+
+    def test_same_shape_same_hash(self):
+        self.assertEqual(structural_hash(_build(VALIDATE_NAME)), structural_hash(_build(VALIDATE_AGE)))
+
+    def test_different_shape_different_hash(self):
+        self.assertNotEqual(structural_hash(_build(VALIDATE_NAME)), structural_hash(_build(LOOP)))
+        # Same kinds, different edge slot: if-without-else vs. while.
+        self.assertNotEqual(structural_hash(_build("if a:\n    b = 1\n")), structural_hash(_build("while a:\n    b = 1\n")))
+
+    def test_canonical_order_starts_at_entry(self):
+        builder = _build(LOOP)
+        digest, order = canonical_form(builder)
+        self.assertIs(order[0], builder.entry_node)
+        self.assertEqual(len(order), len(builder.nodes))
+        self.assertEqual(len(digest), 64)
+
+    def test_memo_remaps_prime_paths(self):
+        memo = CFGAnalysisMemo()
+        first, second = _build(VALIDATE_NAME), _build(VALIDATE_AGE)
+        first_paths = memo.prime_paths(first)
+        second_paths = memo.prime_paths(second)
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+        for path in second_paths:
+            for node in path:
+                self.assertIs(second.nodes[node.id], node)
+        self.assertEqual(_id_paths(second_paths), _id_paths(second.find_prime_paths()))
+        self.assertEqual(_id_paths(first_paths), _id_paths(first.find_prime_paths()))
+
+    def test_memo_lru_eviction(self):
+        memo = CFGAnalysisMemo(max_entries=1)
+        memo.prime_paths(_build(VALIDATE_NAME))
+        memo.prime_paths(_build(LOOP))
+        self.assertEqual(len(memo), 1)
+        memo.prime_paths(_build(VALIDATE_AGE))
+        self.assertEqual(memo.misses, 3)
+
+    def test_analysis_manager_uses_memo(self):
+        memo = CFGAnalysisMemo()
+        first, second = _build(LOOP), _build(LOOP.replace("total", "count"))
+        first_metrics = first.get_analysis_manager(memo=memo).get("metrics")
+        manager = second.get_analysis_manager(memo=memo)
+        self.assertEqual(manager.get("metrics"), first_metrics)
+        self.assertEqual(sorted(map(sorted, manager.get("sccs"))),
+                         sorted(map(sorted, first.get_analysis_manager().get("sccs"))))
+        self.assertGreaterEqual(memo.hits, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
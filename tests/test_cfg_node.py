@@ -0,0 +1,54 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import CFGNode, NodeKind, SourceText
+
+
+class TestCFGNode(unittest.TestCase):
+
+    def test_node_type_strings_map_to_kinds(self):
+        node = CFGNode(1, node_type="condition")
+        self.assertIs(node.kind, NodeKind.CONDITION)
+        self.assertEqual(node.node_type, "condition")
+        node.node_type = NodeKind.RETURN_STATEMENT
+        self.assertEqual(node.node_type, "return_statement")
+        self.assertEqual(NodeKind.from_type_name("merge_point"), NodeKind.MERGE_POINT)
+        self.assertEqual(NodeKind.ENTRY.type_name, "entry")
+
+    def test_unknown_node_type_is_preserved(self):
+        node = CFGNode(1, node_type="custom_marker")
+        self.assertIs(node.kind, NodeKind.OTHER)
+        self.assertEqual(node.node_type, "custom_marker")
+
+    def test_slots_and_lazy_containers(self):
+        node = CFGNode(1)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.unexpected_attribute = True
+        self.assertIsNone(node._case_branches)
+        self.assertEqual(node.case_branches, ())
+        self.assertFalse(node.has_statements)
+        self.assertEqual(node.statements, [])
+        target = CFGNode(2)
+        node.add_case_branch("case: 1", target)
+        self.assertEqual(node.case_branches, [("case: 1", target)])
+
+    def test_labels_are_declared_fields(self):
+        node = CFGNode(1, statements=[SourceText("if {}", ast.parse("a and b", mode="eval").body)])
+        self.assertIsNone(node.true_condition_label)
+        node.true_condition_label = "a and b"
+        self.assertEqual(node.true_condition_label, "a and b")
+        self.assertEqual(node.statements, ["if a and b"])
+
+    def test_builder_match_cases(self):
+        builder = CFGBuilder()
+        builder.build_cfg("match x:\n    case 1:\n        y = 1\n    case _:\n        y = 2\n")
+        dispatcher = next(n for n in builder.nodes.values() if n.kind is NodeKind.MATCH_DISPATCHER)
+        self.assertEqual([label for label, _ in dispatcher.case_branches], ["case: 1", "case: _"])
+        others = [n for n in builder.nodes.values() if n is not dispatcher]
+        self.assertTrue(all(n._case_branches is None for n in others))
+
+
+if __name__ == "__main__":
+    unittest.main()
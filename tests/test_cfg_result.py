@@ -0,0 +1,86 @@
+import ast
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_hash import CFGAnalysisMemo
+from CFG.cfg_serialization import cfg_to_dict
+from CFG.exception_edges import ExceptionalCFG
+from CFG.external_prime_paths import find_prime_paths_external
+
+
+def _source(i):
+    return (f"def f{i}(x):\n"
+            f"    for item in range({i % 5}):\n"
+            f"        if item > x:\n"
+            f"            try:\n"
+            f"                x = item // {i}\n"
+            f"            except ZeroDivisionError:\n"
+            f"                break\n"
+            f"    return x\n")
+
+
+class TestCFGResult(unittest.TestCase):
+
+    def test_shared_builder_across_threads(self):
+        shared = CFGBuilder(basic_blocks=True)
+        sources = [_source(i) for i in range(1, 200)]
+
+        def build(source):
+            result = shared.build_result(ast.parse(source).body[0], graph_name="f")
+            return result.to_dot()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            concurrent = list(pool.map(build, sources))
+        expected = []
+        for source in sources:
+            builder = CFGBuilder(basic_blocks=True)
+            builder.build(ast.parse(source).body[0], graph_name="f")
+            expected.append(builder.to_dot())
+        self.assertEqual(concurrent, expected)
+        self.assertEqual(shared.nodes, {})  # The shared builder itself never builds
+        self.assertIsNone(shared.entry_node)
+
+    def test_results_are_independent_and_read_only(self):
+        builder = CFGBuilder(factored_exceptions=True)
+        first = builder.build_cfg_result(_source(1))
+        second = builder.build_cfg_result("x = 1\n", graph_name="other")
+        self.assertEqual((first.graph_name, len(second)), ("cfg", 2))
+        self.assertEqual(second.entry_node.statements, ["Entry to other"])
+        self.assertIsNot(first.entry_node, second.entry_node)
+        with self.assertRaises(TypeError):
+            first.nodes[99] = first.entry_node
+        self.assertEqual(first.options["factored_exceptions"], True)
+        self.assertIsNone(builder.build_cfg_result("def broken(:\n"))
+
+    def test_results_work_with_analyses(self):
+        builder = CFGBuilder(factored_exceptions=True)
+        function_ast = ast.parse(_source(3)).body[0]
+        result = builder.build_result(function_ast, graph_name="f3")
+        plain = CFGBuilder(factored_exceptions=True)
+        plain.build(function_ast, graph_name="f3")
+        self.assertEqual(len(result.exception_regions), 1)
+        self.assertEqual(len(find_prime_paths_external(result)), len(find_prime_paths_external(plain)))
+        self.assertEqual(ExceptionalCFG(result).exceptional_edge_count(),
+                         ExceptionalCFG(plain).exceptional_edge_count())
+        self.assertEqual(cfg_to_dict(result), cfg_to_dict(plain))
+        self.assertEqual(result.get_analysis_manager().get("metrics"),
+                         plain.get_analysis_manager().get("metrics"))
+
+    def test_shared_memo_across_threads(self):
+        memo = CFGAnalysisMemo(max_entries=4)
+        builder = CFGBuilder()
+
+        def prime_path_count(i):
+            result = builder.build_cfg_result(_source(i % 10 + 1))
+            return len(result.get_analysis_manager(memo).get("prime_paths"))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            counts = list(pool.map(prime_path_count, range(300)))
+        self.assertEqual(counts[:10], counts[10:20])
+        self.assertEqual(memo.hits + memo.misses, 300)
+        self.assertLessEqual(len(memo), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
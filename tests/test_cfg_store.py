@@ -0,0 +1,120 @@
+import ast
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_hash import canonical_form
+from CFG.cfg_node import NodeKind
+from CFG.cfg_store import CFGStore, NodeView
+from CFG.external_prime_paths import find_prime_paths_external
+
+
+CODE = """
+def f(x):
+    while x > 0:
+        if x % 2 == 0 and x > 10:
+            x -= 3
+        else:
+            x -= 1
+    match x:
+        case 0:
+            return "zero"
+        case _:
+            return "other"
+"""
+
+
+def _path_ids(paths):
+    return sorted(tuple(node.id for node in path) for path in paths)
+
+
+def _shared_prime_paths(name):
+    with CFGStore.attach(name) as store:
+        return _path_ids(store.find_prime_paths())
+
+
+class TestCFGStore(unittest.TestCase):
+
+    def setUp(self):
+        self.builder = CFGBuilder()
+        self.builder.build(ast.parse(CODE).body[0], graph_name="f")
+        self.store = CFGStore.from_builder(self.builder)
+
+    def test_views_mirror_nodes(self):
+        self.assertEqual(len(self.store), len(self.builder.nodes))
+        for node_id, node in self.builder.nodes.items():
+            view = self.store.nodes[node_id]
+            self.assertIsInstance(view, NodeView)
+            self.assertEqual((view.id, view.node_type, view.kind, view.statements),
+                             (node.id, node.node_type, node.kind, node.statements))
+            self.assertEqual([s.id for s in self.store.get_successors(view)],
+                             [s.id for s in self.builder.get_successors(node)])
+            self.assertEqual([(label, target.id) for label, target in view.case_branches],
+                             [(label, target.id) for label, target in node.case_branches])
+            self.assertEqual(view.true_condition_label, node.true_condition_label)
+            self.assertEqual(view.span, node.span)
+        condition = next(v for v in self.store.iter_views() if v.condition_ast is not None)
+        self.assertIs(condition.kind, NodeKind.CONDITION)
+
+    def test_node_mapping_is_built_once(self):
+        self.assertIs(self.store.nodes, self.store.nodes)
+        self.assertEqual(list(self.store.nodes), list(self.builder.nodes))
+        restored = CFGStore.from_bytes(self.store.to_bytes())
+        self.assertIs(restored.nodes, restored.nodes)
+
+    def test_analyses_run_on_the_store(self):
+        self.assertEqual(canonical_form(self.store)[0], canonical_form(self.builder)[0])
+        self.assertEqual(_path_ids(self.store.find_prime_paths()), _path_ids(self.builder.find_prime_paths()))
+        self.assertEqual(self.store.to_dot(), self.builder.to_dot())
+
+    def test_binary_roundtrip(self):
+        data = self.store.to_bytes()
+        restored = CFGStore.from_bytes(data)
+        self.assertEqual(restored.to_bytes(), data)
+        self.assertEqual(restored.to_builder().to_dot(), self.builder.to_dot())
+        self.assertEqual(_path_ids(find_prime_paths_external(restored)),
+                         _path_ids(self.builder.find_prime_paths()))
+        with self.assertRaises(ValueError):
+            CFGStore.from_bytes(b"nope")
+
+    def test_custom_node_type_and_interning(self):
+        builder = CFGBuilder()
+        builder.build_cfg("x = 1\nx = 1\n")
+        builder.nodes[2].node_type = "custom_marker"
+        store = CFGStore.from_builder(builder)
+        self.assertEqual(store.view(1).node_type, "custom_marker")
+        self.assertEqual(store.strings.count("x = 1"), 1)
+
+    def test_shared_memory(self):
+        block = self.store.publish()
+        try:
+            with CFGStore.attach(block.name) as attached:
+                self.assertIsInstance(attached.kinds, memoryview)
+                self.assertEqual(attached.to_bytes(), self.store.to_bytes())
+                self.assertEqual(attached.to_dot(), self.builder.to_dot())
+                self.assertEqual([view.statements for view in attached.iter_views()],
+                                 [node.statements for node in self.builder.nodes.values()])
+                with self.assertRaises(TypeError):
+                    attached.next[0] = 0
+            self.assertEqual(len(attached), 0)
+            attached.close()
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(_shared_prime_paths, block.name).result(),
+                                 _path_ids(self.builder.find_prime_paths()))
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_shared_memory_rejects_other_blocks(self):
+        from multiprocessing import shared_memory
+        block = shared_memory.SharedMemory(create=True, size=64)
+        try:
+            with self.assertRaises(ValueError):
+                CFGStore.attach(block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()
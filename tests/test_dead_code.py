@@ -0,0 +1,86 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.dead_code import find_unreachable
+
+
+SOURCE = '''
+def f(x):
+    for item in x:
+        if item:
+            break
+            log(item)
+        continue
+    if x:
+        return 1
+    else:
+        raise ValueError(x)
+    y = 2
+    return y
+'''
+
+LOOP_ELSE = '''
+def g(x):
+    for item in x:
+        if item:
+            break
+    else:
+        return None
+    return item
+'''
+
+
+def _build(source, **options):
+    builder = CFGBuilder(**options)
+    builder.build(ast.parse(source).body[0], graph_name="f")
+    return builder
+
+
+class TestDeadCode(unittest.TestCase):
+
+    def test_pruning_removes_unreachable_nodes(self):
+        plain, pruned = _build(SOURCE), _build(SOURCE, prune_unreachable=True)
+        orphans = find_unreachable(plain)
+        self.assertEqual([n.statements for n in orphans], [["y = 2"]])
+        self.assertEqual(len(pruned.nodes), len(plain.nodes) - 1)
+        self.assertEqual(list(pruned.nodes), list(range(1, len(pruned.nodes) + 1)))
+        self.assertEqual(find_unreachable(pruned), [])
+        self.assertNotIn("y = 2", pruned.to_dot())
+        self.assertLess(len(pruned.find_prime_paths()), len(plain.find_prime_paths()))
+        self.assertEqual(plain.dead_code, [])
+
+    def test_findings_cover_unbuilt_statements(self):
+        builder = _build(SOURCE, prune_unreachable=True)
+        first, second = builder.dead_code
+        self.assertEqual((first.statements, first.span), (["log(item)"], (6, 12, 6, 21)))
+        self.assertEqual(first.nodes, [])
+        # The orphaned node and the rest of its block form one finding.
+        self.assertEqual(second.statements, ["y = 2", "return y"])
+        self.assertEqual(second.span, (12, 4, 13, 12))
+        self.assertEqual(repr(second), "DeadCode(lines 12-13, 1 nodes, 1 unbuilt statements)")
+
+    def test_no_findings_for_unmodelled_control_flow(self):
+        # A break skips the else block, and a plain build links the try node
+        # to only one handler; neither is dead code.
+        source = ("def h(x):\n    try:\n        x()\n    except A:\n        return 1\n"
+                  "    except B:\n        return 2\n    return 3\n")
+        for options in ({}, {"factored_exceptions": True}, {"basic_blocks": True}):
+            self.assertEqual(_build(LOOP_ELSE, prune_unreachable=True, **options).dead_code, [])
+            builder = _build(source, prune_unreachable=True, **options)
+            self.assertEqual(builder.dead_code, [])
+            self.assertIn("except A", builder.to_dot())
+
+    def test_results_and_rebuilds(self):
+        builder = CFGBuilder(prune_unreachable=True)
+        result = builder.build_result(ast.parse(SOURCE).body[0], graph_name="f")
+        self.assertEqual(len(result.dead_code), 2)
+        self.assertTrue(result.options["prune_unreachable"])
+        self.assertEqual(builder.dead_code, [])
+        builder.build(ast.parse(SOURCE).body[0])
+        builder.build(ast.parse(LOOP_ELSE).body[0])
+        self.assertEqual(builder.dead_code, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
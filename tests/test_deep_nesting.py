@@ -0,0 +1,89 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_node import NodeKind
+
+
+def _at(node, line):
+    # ast.fix_missing_locations recurses, so generated trees get positions here.
+    node.lineno, node.col_offset, node.end_lineno, node.end_col_offset = line, 0, line, 1
+    return node
+
+
+def _assign(value, line):
+    return _at(ast.Assign(targets=[_at(ast.Name("y", ast.Store()), line)], value=_at(ast.Constant(value), line)), line)
+
+
+def elif_chain_ast(depth):
+    """if x == 0: y = 0 / elif x == 1: y = 1 / ... / else: y = -1, then print(y); built directly as an AST."""
+    orelse = [_assign(-1, 2 * depth + 2)]
+    for i in reversed(range(depth)):
+        line = 2 * i + 1
+        test = _at(ast.Compare(left=_at(ast.Name("x", ast.Load()), line), ops=[ast.Eq()],
+                               comparators=[_at(ast.Constant(i), line)]), line)
+        orelse = [_at(ast.If(test=test, body=[_assign(i, line + 1)], orelse=orelse), line)]
+    call = _at(ast.Call(func=_at(ast.Name("print", ast.Load()), 2 * depth + 3),
+                        args=[_at(ast.Name("y", ast.Load()), 2 * depth + 3)], keywords=[]), 2 * depth + 3)
+    return ast.Module(body=orelse + [_at(ast.Expr(call), 2 * depth + 3)], type_ignores=[])
+
+
+def elif_chain_source(depth):
+    lines = ["if x == 0:", "    y = 0"]
+    for i in range(1, depth):
+        lines += [f"elif x == {i}:", f"    y = {i}"]
+    return "\n".join(lines + ["else:", "    y = -1", "print(y)"]) + "\n"
+
+
+def nested_loops_ast(depth):
+    body = [_at(ast.Break(), depth + 1)]
+    for i in reversed(range(depth)):
+        test = _at(ast.Name(f"c{i}", ast.Load()), i + 1)
+        body = [_at(ast.While(test=test, body=body, orelse=[]), i + 1)]
+    return ast.Module(body=body, type_ignores=[])
+
+
+class TestDeepNesting(unittest.TestCase):
+
+    def test_ten_thousand_deep_elif_chain(self):
+        depth = 10000
+        builder = CFGBuilder()
+        builder.build(elif_chain_ast(depth))
+        conditions = [n for n in builder.nodes.values() if n.kind is NodeKind.CONDITION]
+        self.assertEqual(len(conditions), depth)
+        # entry, one condition and one assignment per level, the else assignment, print(y)
+        self.assertEqual(len(builder.nodes), 2 * depth + 3)
+
+        node = builder.entry_node.next_node
+        for i in range(depth):
+            self.assertEqual(node.statements, [f"if x == {i}"])
+            self.assertEqual(node.branch_node.statements, [f"y = {i}"])
+            node = node.else_node
+        self.assertEqual(node.statements, ["y = -1"])
+        print_node = node.next_node
+        self.assertEqual(print_node.statements, ["print(y)"])
+        self.assertTrue(all(c.branch_node.next_node is print_node for c in conditions))
+
+    def test_deep_elif_chain_from_source_matches_generated_ast(self):
+        # CPython's own parser gives up somewhere below 3,000 levels; 2,000 still parses.
+        depth = 2000
+        from_source = CFGBuilder()
+        self.assertIsNotNone(from_source.build_cfg(elif_chain_source(depth)))
+        from_ast = CFGBuilder()
+        from_ast.build(elif_chain_ast(depth))
+        self.assertEqual(from_source.to_dot(), from_ast.to_dot())
+
+    def test_deeply_nested_loops(self):
+        depth = 5000
+        builder = CFGBuilder()
+        builder.build(nested_loops_ast(depth))
+        loops = [n for n in builder.nodes.values() if n.kind is NodeKind.CONDITION]
+        self.assertEqual(len(loops), depth)
+        innermost = loops[-1]
+        self.assertEqual(innermost.branch_node.node_type, "break_statement")
+        for outer, inner in zip(loops, loops[1:]):
+            self.assertIs(outer.branch_node, inner)
+
+
+if __name__ == "__main__":
+    unittest.main()
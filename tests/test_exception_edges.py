@@ -0,0 +1,83 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.exception_edges import ExceptionalCFG
+from CFG.external_prime_paths import find_prime_paths_external
+
+
+SOURCE = '''
+def load(path):
+    try:
+        handle = open(path)
+        data = handle.read()
+        try:
+            value = int(data)
+        except ValueError:
+            value = 0
+    except OSError:
+        return None
+    except Exception as e:
+        log(e)
+    finally:
+        cleanup()
+    return value
+'''
+
+
+def _build(**options):
+    builder = CFGBuilder(**options)
+    builder.build(ast.parse(SOURCE).body[0], graph_name="load")
+    return builder
+
+
+def _node(builder, statement):
+    return next(n for n in builder.nodes.values() if n.statements and n.statements[0] == statement)
+
+
+class TestFactoredExceptionEdges(unittest.TestCase):
+
+    def test_dispatch_node_reaches_every_handler(self):
+        plain, factored = _build(), _build(factored_exceptions=True)
+        self.assertEqual(len(factored.nodes), len(plain.nodes) + 2)  # One dispatch per try
+        outer_try = factored.entry_node.next_node
+        dispatch = outer_try.branch_node
+        self.assertEqual(dispatch.node_type, "exception_dispatch")
+        self.assertEqual([label for label, _ in dispatch.case_branches],
+                         ["finally", "except OSError", "except Exception as e"])
+        self.assertIn('-> %d [label="except OSError"]' % _node(factored, "except OSError").id, factored.to_dot())
+        self.assertEqual(plain.exception_regions, [])
+
+    def test_view_adds_one_edge_per_statement(self):
+        builder = _build(factored_exceptions=True)
+        inner, outer = builder.exception_regions
+        self.assertEqual([n.statements[0] for n in inner.members(builder)], ["value = int(data)"])
+        view = ExceptionalCFG(builder)
+        self.assertEqual(view.exceptional_successors(_node(builder, "value = int(data)")), [inner.dispatch])
+        self.assertEqual(view.exceptional_successors(_node(builder, "handle = open(path)")), [outer.dispatch])
+        # Unhandled exceptions of the inner try propagate to the outer dispatch.
+        self.assertEqual(view.exceptional_successors(inner.dispatch), [outer.dispatch])
+        self.assertEqual(view.exceptional_successors(_node(builder, "return value")), [])
+        self.assertEqual(view.exceptional_edge_count(), 6)
+        self.assertEqual(builder.get_successors(_node(builder, "data = handle.read()")), [inner.try_node])
+
+    def test_prime_paths_only_expand_on_request(self):
+        builder = _build(factored_exceptions=True)
+        compact = find_prime_paths_external(builder)
+        expanded = ExceptionalCFG(builder).find_prime_paths()
+        self.assertGreater(len(expanded), len(compact))
+        raising = _node(builder, "data = handle.read()")
+        dispatch = builder.exception_regions[1].dispatch
+        self.assertTrue(any(raising in path and dispatch in path for path in expanded))
+
+    def test_basic_block_builds_map_members_to_blocks(self):
+        builder = _build(factored_exceptions=True, basic_blocks=True)
+        view = ExceptionalCFG(builder)
+        outer = builder.exception_regions[1]
+        block = builder.block_of(outer._members[0])
+        self.assertEqual(block.statements, ["handle = open(path)", "data = handle.read()", "try"])
+        self.assertEqual(view.exceptional_successors(block), [builder.block_of(outer.dispatch)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.external_prime_paths import find_prime_paths_external, iter_prime_paths_external
+
+
+PROGRAMS = {
+    "sequence": "a = 1\nb = 2\nc = a + b\n",
+    "nested_loops": """
+i = 0
+while i < 3:
+    j = 0
+    while j < i:
+        if j % 2:
+            print(j)
+        j += 1
+    i += 1
+print(i)
+""",
+    "try_match": """
+try:
+    v = int(s)
+except ValueError:
+    v = 0
+match v:
+    case 0:
+        print("zero")
+    case _:
+        print("other")
+""",
+}
+
+
+def _as_ids(paths):
+    return sorted(tuple(n.id for n in p) for p in paths)
+
+
+class TestExternalPrimePaths(unittest.TestCase):
+
+    def test_matches_in_memory_result(self):
+        for name, source in PROGRAMS.items():
+            with self.subTest(name):
+                builder = CFGBuilder()
+                builder.build_cfg(source, graph_name=name)
+                self.assertEqual(_as_ids(find_prime_paths_external(builder)),
+                                 _as_ids(builder.find_prime_paths()))
+
+    def test_spilling_runs_to_disk(self):
+        builder = CFGBuilder()
+        builder.build_cfg(PROGRAMS["nested_loops"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats = {}
+            paths = list(iter_prime_paths_external(builder, temp_dir=temp_dir, memory_limit=2048, stats=stats))
+            self.assertGreater(stats["runs"], 1)
+            self.assertEqual(_as_ids(paths), _as_ids(builder.find_prime_paths()))
+            self.assertEqual(os.listdir(temp_dir), [], "run files should be cleaned up")
+
+    def test_multi_pass_merge(self):
+        builder = CFGBuilder()
+        builder.build_cfg(PROGRAMS["nested_loops"] + PROGRAMS["try_match"])
+        stats = {}
+        paths = list(iter_prime_paths_external(builder, memory_limit=1, stats=stats))
+        self.assertGreater(stats["runs"], 64)
+        self.assertEqual(_as_ids(paths), _as_ids(builder.find_prime_paths()))
+
+    def test_single_node_graph(self):
+        builder = CFGBuilder()
+        builder.build_cfg("")
+        self.assertEqual(_as_ids(find_prime_paths_external(builder)), [(1,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
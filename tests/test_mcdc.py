@@ -0,0 +1,82 @@
+import unittest
+import ast
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.mcdc import analyze_condition, attach_mcdc_requirements, extract_atomic_conditions
+
+
+def _expr(text: str) -> ast.expr:
+    return ast.parse(text, mode="eval").body
+
+
+class TestMCDC(unittest.TestCase):
+
+    def test_atomic_conditions_are_split_and_deduplicated(self):
+        atoms = extract_atomic_conditions(_expr("a and (b or not c) and a"))
+        self.assertEqual([ast.unparse(a) for a in atoms], ["a", "b", "c"])
+
+    def test_truth_table_matches_python_evaluation(self):
+        analysis = analyze_condition(_expr("a and (b or not c)"))
+        for row in range(analysis.row_count):
+            a, b, c = [bool((row >> i) & 1) for i in range(3)]
+            self.assertEqual(analysis.outcome(row), a and (b or not c), f"row {row}")
+
+    def test_independence_pairs_for_and_or(self):
+        analysis = analyze_condition(_expr("a and (b or c)"))
+        requirements = analysis.requirements()
+        # a toggles the outcome whenever (b or c) holds.
+        self.assertEqual(requirements["a"], [(0b010, 0b011), (0b100, 0b101), (0b110, 0b111)])
+        self.assertEqual(requirements["b"], [(0b001, 0b011)])
+        self.assertEqual(requirements["c"], [(0b001, 0b101)])
+        for i in range(3):
+            for false_row, true_row in analysis.independence_pairs(i):
+                self.assertNotEqual(analysis.outcome(false_row), analysis.outcome(true_row))
+
+    def test_masked_atom_has_no_pairs(self):
+        analysis = analyze_condition(_expr("a or (a and b)"))
+        self.assertTrue(analysis.is_independent(0))
+        self.assertFalse(analysis.is_independent(1))
+
+    def test_describe_row_uses_negated_atoms(self):
+        analysis = analyze_condition(_expr("x > 0 and y"))
+        self.assertEqual(analysis.describe_row(0b01), ["x > 0", "not y"])
+        self.assertEqual(analysis.describe_row(0b10), ["x <= 0", "y"])
+
+    def test_many_atoms_agree_with_brute_force(self):
+        names = [f"c{i}" for i in range(12)]
+        text = " or ".join(f"({names[i]} and {names[i + 1]})" for i in range(0, 12, 2))
+        analysis = analyze_condition(_expr(text))
+        self.assertEqual(analysis.row_count, 1 << 12)
+        for i in range(12):
+            expected = 0
+            for row in range(analysis.row_count):
+                if not (row >> i) & 1 and analysis.outcome(row) != analysis.outcome(row | (1 << i)):
+                    expected += 1
+            self.assertEqual(analysis.pair_count(i), expected)
+
+    def test_too_many_atoms_rejected(self):
+        text = " and ".join(f"v{i}" for i in range(5))
+        with self.assertRaises(ValueError):
+            analyze_condition(_expr(text), max_atoms=4)
+
+    def test_requirements_attached_to_condition_nodes(self):
+        source_code = """
+if a and (b or c):
+    x = 1
+i = 0
+while i < n or done:
+    i += 1
+"""
+        builder = CFGBuilder()
+        builder.build_cfg(source_code)
+        analyses = attach_mcdc_requirements(builder)
+        self.assertEqual(len(analyses), 2)
+        by_text = {builder.nodes[node_id].statements[0]: a for node_id, a in analyses.items()}
+        self.assertEqual(by_text["if a and (b or c)"].atoms, ["a", "b", "c"])
+        self.assertEqual(by_text["while i < n or done"].atoms, ["i < n", "done"])
+        for node_id, analysis in analyses.items():
+            self.assertIs(builder.nodes[node_id].mcdc_requirements, analysis)
+
+
+if __name__ == "__main__":
+    unittest.main()
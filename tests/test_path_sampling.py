@@ -0,0 +1,61 @@
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.path_sampling import chao1_estimate, sample_prime_paths
+
+
+SOURCE = """
+x = 0
+while x < 10:
+    if x % 2 == 0:
+        y = x
+    else:
+        y = -x
+    x = x + 1
+print(y)
+"""
+
+
+class TestPathSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.builder = CFGBuilder()
+        self.builder.build_cfg(SOURCE, graph_name="sampling")
+        self.exact = {tuple(n.id for n in p) for p in self.builder.find_prime_paths()}
+
+    def test_sampled_paths_are_prime(self):
+        sample = sample_prime_paths(self.builder, max_walks=50, seed=1)
+        self.assertGreater(len(sample.paths), 0)
+        for path in sample.paths:
+            self.assertIn(tuple(n.id for n in path), self.exact)
+
+    def test_enough_walks_find_every_prime_path(self):
+        sample = sample_prime_paths(self.builder, max_walks=2000, seed=7)
+        found = {tuple(n.id for n in p) for p in sample.paths}
+        self.assertEqual(found, self.exact)
+        self.assertGreaterEqual(sample.estimated_total, len(self.exact))
+        self.assertEqual(sample.estimated_coverage, 1.0)
+
+    def test_convergence_curve_is_monotonic(self):
+        sample = sample_prime_paths(self.builder, max_walks=100, seed=3)
+        walks = [w for w, _ in sample.convergence]
+        distinct = [d for _, d in sample.convergence]
+        self.assertEqual(walks[-1], sample.walks)
+        self.assertEqual(walks, sorted(walks))
+        self.assertEqual(distinct, sorted(distinct))
+        self.assertEqual(distinct[-1], len(sample.paths))
+
+    def test_time_budget_and_path_cap(self):
+        sample = sample_prime_paths(self.builder, max_walks=10**9, time_budget=0.0, seed=0)
+        self.assertEqual(sample.walks, 0)
+        capped = sample_prime_paths(self.builder, max_walks=10**9, max_paths=2, seed=0)
+        self.assertTrue(capped.saturated)
+        self.assertEqual(len(capped.paths), 2)
+
+    def test_chao1(self):
+        self.assertEqual(chao1_estimate([3, 3, 2]), 3)
+        self.assertEqual(chao1_estimate([1, 1, 1, 2]), 4 + 3 * 2 / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.cfg_forest import CFGForest
+from CFG.short_circuit import expand_short_circuits
+
+
+def _by_statement(builder):
+    return {n.statements[0]: n for n in builder.nodes.values() if n.statements}
+
+
+class TestShortCircuitExpansion(unittest.TestCase):
+
+    def test_and_or_not_chain(self):
+        builder = CFGBuilder(expand_conditions=True)
+        builder.build_cfg("if a and b or not c:\n    x = 1\nelse:\n    x = 2\n")
+        nodes = _by_statement(builder)
+        a, b, c = nodes["if a"], nodes["b"], nodes["c"]
+        then, otherwise = nodes["x = 1"], nodes["x = 2"]
+        self.assertEqual([a.id, b.id, c.id], [2, 3, 4])
+        self.assertEqual((a.branch_node, a.else_node), (b, c))
+        self.assertEqual((b.branch_node, b.else_node), (then, c))
+        self.assertEqual((c.branch_node, c.else_node), (otherwise, then))  # `not c`
+        self.assertEqual((b.true_condition_label, b.false_condition_label), ("b", "not b"))
+        self.assertTrue(all(n.node_type == "condition" and n.next_node is None for n in (a, b, c)))
+        self.assertEqual(builder.get_analysis_manager().get("metrics")["decision_points"], 3)
+
+    def test_loop_condition_and_if_without_else(self):
+        source = "def f(n, limit):\n    while n > 0 and n < limit:\n        if n % 2 or n % 3:\n            n -= 1\n        n -= 1\n    return n\n"
+        plain = CFGForest.from_source(source)["f"]
+        builder = CFGForest.from_source(source, builder_factory=lambda: CFGBuilder(expand_conditions=True))["f"]
+        self.assertEqual(len(builder.nodes), len(plain.nodes) + 2)
+        nodes = _by_statement(builder)
+        first, second = nodes["while n > 0"], nodes["n < limit"]
+        self.assertEqual((first.true_condition_label, first.false_condition_label), ("n > 0", "n <= 0"))
+        self.assertIs(first.branch_node, second)
+        self.assertIs(first.else_node, second.else_node)
+        # The loop's back edge still enters the chain at its first atom.
+        decrement = [n for n in builder.nodes.values() if n.statements == ["n -= 1"]][-1]
+        self.assertIs(decrement.next_node, first)
+        # The false edge of an `if` without `else` moves from next_node to else_node.
+        inner = nodes["if n % 2"]
+        self.assertIs(inner.else_node, nodes["n % 3"])
+        self.assertIs(nodes["n % 3"].else_node, decrement)
+
+    def test_plain_conditions_are_untouched(self):
+        builder = CFGBuilder()
+        builder.build_cfg("if a:\n    x = 1\nx = 2\n")
+        before = builder.to_dot()
+        self.assertEqual(expand_short_circuits(builder), 0)
+        self.assertEqual(builder.to_dot(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
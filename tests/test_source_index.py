@@ -0,0 +1,72 @@
+import ast
+import unittest
+
+from CFG.cfg_builder import CFGBuilder
+from CFG.source_index import SourceIndex
+
+
+SOURCE = '''
+def f(items):
+    total = 0
+    for item in items:
+        try:
+            if item is None:
+                continue
+            total += item
+        except:
+            break
+    if total:
+        pass
+    if total > 10:
+        return total
+    return 0
+'''
+
+
+def _build(**options):
+    builder = CFGBuilder(**options)
+    builder.build(ast.parse(SOURCE).body[0], graph_name="f")
+    return builder
+
+
+def _texts(nodes):
+    return [node.statements[0] for node in nodes]
+
+
+class TestSourceIndex(unittest.TestCase):
+
+    def test_keyword_statements_have_spans(self):
+        builder = _build()
+        spans = {node.statements[0]: node.span for node in builder.nodes.values() if node.statements}
+        self.assertEqual(spans["try"], (5, 8, 5, 11))
+        self.assertEqual(spans["continue"], (7, 16, 7, 24))
+        self.assertEqual(spans["except"], (9, 8, 9, 14))
+        self.assertEqual(spans["break"], (10, 12, 10, 17))
+        self.assertEqual(spans["pass"], (12, 8, 12, 12))
+
+    def test_line_and_range_lookups(self):
+        builder = _build()
+        index = builder.get_analysis_manager().get("source_index")
+        self.assertEqual(len(index), len([n for n in builder.nodes.values() if n.span is not None]))
+        self.assertEqual(_texts(index.at_line(8)), ["total += item"])
+        self.assertEqual(_texts(index.at_line(1)), [])
+        self.assertEqual(_texts(index.in_range(6, 8)), ["if item is None", "continue", "total += item"])
+        # The statement after an if statement is one node covering its whole body.
+        self.assertEqual(_texts(index.at_line(14)), ["if total > 10:\n    return total"])
+        self.assertEqual(index.at(6, 15).statements, ["if item is None"])
+        self.assertIsNone(index.at(6, 4))
+        self.assertIs(builder.get_analysis_manager().get("source_index"), index)
+
+    def test_basic_blocks_report_blocks(self):
+        builder = _build(basic_blocks=True)
+        index = SourceIndex(builder)
+        block = index.at(3, 4)
+        self.assertEqual(block.statements[0], "total = 0")
+        loop = index.at(4, 8)
+        self.assertEqual(loop.statements, ["for item in items"])  # Loop heads start their own block.
+        self.assertEqual(index.in_range(3, 4), [block, loop])
+        self.assertTrue(all(builder.nodes[node.id] is node for node in index.in_range(1, 15)))
+
+
+if __name__ == "__main__":
+    unittest.main()